@@ -0,0 +1,48 @@
+import os, sys, time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from vibe2gml_bench import generate_project
+from vibe2gml_core import scan_project
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    """Keeps scan/export caches out of the user's cache folder."""
+    path = tmp_path / "cache"; monkeypatch.setenv("VIBE2GML_CACHE_DIR", str(path))
+    return path
+
+@pytest.fixture
+def project(tmp_path):
+    """A small generated GMS2 project: (root, scanned GML details)."""
+    root = str(tmp_path / "project")
+    generate_project(root, objects=12, events=3, rooms=2, instances=20, scripts=6, sprites=3, lines=12, seed=1)
+    return root, scan_project(root)
+
+@pytest.fixture(scope="session")
+def qapp():
+    """An offscreen QApplication for GUI tests, which are skipped when PyQt6 isn't installed."""
+    pytest.importorskip("PyQt6.QtWidgets"); os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt6.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
+
+@pytest.fixture
+def qt_wait(qapp):
+    """qt_wait(condition, timeout=5): processes Qt events until condition() is true; returns its last value."""
+    def wait(condition, timeout=5.0):
+        end = time.monotonic() + timeout
+        while not condition() and time.monotonic() < end: qapp.processEvents(); time.sleep(0.005)
+        return condition()
+    return wait
+
+@pytest.fixture
+def viewer(project, qt_wait, monkeypatch):
+    """The main window with the `project` fixture loaded and its background scan, search index and asset graph done."""
+    import vibe2gml_01_alpha as gui
+    for name in ("information", "warning", "critical"): monkeypatch.setattr(gui.QMessageBox, name, lambda *args, **kwargs: None)
+    window = gui.GmlViewerApp(); window.project_root_path = project[0]; window.scan_project(project[0])
+    assert qt_wait(lambda: window._scan_worker is None and window._search_worker is None and window._graph_worker is None and window.asset_graph is not None)
+    yield window
+    window.close(); window.deleteLater()
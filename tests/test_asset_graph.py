@@ -0,0 +1,62 @@
+import json, os
+
+from vibe2gml_core import AssetGraph, find_assets, load_yy, yy_cache
+
+
+def _ref(folder, name):
+    return {"name": name, "path": f"{folder}/{name}/{name}.yy"}
+
+def _write_yy(root, folder, name, data):
+    path = os.path.join(root, folder, name, f"{name}.yy"); os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f: json.dump(data, f)
+    return path
+
+def _built(root):
+    graph = AssetGraph(root); graph.build()
+    return graph
+
+def test_build_reads_through_the_yy_cache_without_filling_it(project):
+    root, _ = project; yy_cache.clear()
+    kept = next(yy_path for kind, _, yy_path in find_assets(root) if kind == "Rooms"); load_yy(kept)
+    hits = yy_cache.hits
+    AssetGraph(root).build()
+    assert yy_cache.hits == hits + 1 and list(yy_cache._entries) == [kept]
+    yy_cache.clear()
+
+def test_parents_and_users_match_the_yy_files(project):
+    root, _ = project; graph = _built(root); objects = {name: load_yy(yy_path) for kind, name, yy_path in find_assets(root, ("Objects",))}
+    parents = {name: (data["parentObjectId"] or {}).get("name") for name, data in objects.items()}
+    assert any(parents.values()) and {name: graph.assets[name].parent for name in objects} == parents
+    for name, parent in parents.items():
+        if parent: assert name in graph.children[parent] and graph.inheritance_chain(name)[:2] == [name, parent]
+    sprite = objects["obj_bench_0"]["spriteId"]["name"]
+    assert graph.users_of(sprite) == sorted(name for name, data in objects.items() if data["spriteId"]["name"] == sprite)
+    rooms = {name: json.dumps(load_yy(yy_path)) for _, name, yy_path in find_assets(root, ("Rooms",))}
+    for name in objects: assert graph.users_of(name, "Rooms") == sorted(room for room, text in rooms.items() if f'"objects/{name}/{name}.yy"' in text)
+
+def test_unused_skips_entry_kinds_and_referenced_names(project):
+    root, _ = project
+    _write_yy(root, "sprites", "spr_orphan", {"name": "spr_orphan", "frames": []})
+    unused = _built(root).unused()
+    assert ("Sprites", "spr_orphan") in unused and not [kind for kind, _ in unused if kind in ("Rooms", "Scripts")]
+    assert ("Sprites", "spr_orphan") not in _built(root).unused(referenced={"spr_orphan"})
+
+def test_updated_and_removed_assets_change_users_and_children(project):
+    root, _ = project
+    _write_yy(root, "sprites", "spr_orphan", {"name": "spr_orphan", "frames": []})
+    graph = _built(root); yy_path = graph.assets["obj_bench_5"].yy_path; old_refs = graph.assets["obj_bench_5"].refs
+    assert graph.update_asset("Objects", "obj_bench_5", yy_path) is False # Unchanged .yy: not read again
+    _write_yy(root, "objects", "obj_bench_5", {"name": "obj_bench_5", "parentObjectId": _ref("objects", "obj_bench_1"), "spriteId": _ref("sprites", "spr_orphan")})
+    assert graph.update_asset("Objects", "obj_bench_5", yy_path) is True
+    assert graph.assets["obj_bench_5"].refs == ("obj_bench_1", "spr_orphan") and graph.inheritance_chain("obj_bench_5")[:2] == ["obj_bench_5", "obj_bench_1"]
+    assert "obj_bench_5" in graph.children["obj_bench_1"] and graph.users_of("spr_orphan") == ["obj_bench_5"] and ("Sprites", "spr_orphan") not in graph.unused()
+    assert all("obj_bench_5" not in graph.users.get(ref, ()) for ref in old_refs if ref not in ("obj_bench_1", "spr_orphan"))
+    os.remove(yy_path); assert graph.update_asset("Objects", "obj_bench_5", yy_path) is True
+    assert "obj_bench_5" not in graph.assets and "obj_bench_5" not in graph.children["obj_bench_1"] and ("Sprites", "spr_orphan") in graph.unused()
+
+def test_saved_graph_parses_only_changed_files(project):
+    root, _ = project
+    _built(root).save()
+    _write_yy(root, "sprites", "spr_orphan", {"name": "spr_orphan", "frames": []})
+    graph = AssetGraph(root); graph.load(); graph.build()
+    assert graph.parsed == 1 and ("Sprites", "spr_orphan") in graph.unused()
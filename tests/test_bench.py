@@ -0,0 +1,53 @@
+import json, os
+
+import pytest
+
+from vibe2gml_bench import BENCH_PHASES, compare_results, generate_project, run_benchmarks
+from vibe2gml_core import find_assets, load_yy, scan_project
+
+
+def _files(root):
+    files = {}
+    for folder, _, names in os.walk(root):
+        for name in names:
+            with open(os.path.join(folder, name), 'rb') as f: files[os.path.relpath(os.path.join(folder, name), root)] = f.read()
+    return files
+
+def test_generated_project_matches_its_settings(tmp_path):
+    root = str(tmp_path / "bench"); project = generate_project(root, objects=7, events=2, rooms=3, instances=15, scripts=4, sprites=2, lines=5, seed=3)
+    kinds = [kind for kind, _, _ in find_assets(root)]
+    assert (kinds.count("Objects"), kinds.count("Rooms"), kinds.count("Scripts"), kinds.count("Sprites")) == (7, 3, 4, 2)
+    assert len(scan_project(root)) == project["gml_files"] and os.path.isfile(os.path.join(root, "bench.yyp"))
+    room = next(yy_path for kind, _, yy_path in find_assets(root, ("Rooms",)))
+    with open(room, 'rb') as f: text = f.read()
+    with pytest.raises(ValueError): json.loads(text) # GMS-style trailing commas, as the tolerant parser has to handle
+    assert len(load_yy(room)["layers"][0]["instances"]) == 15
+
+def test_same_seed_generates_the_same_project(tmp_path):
+    settings = dict(objects=5, events=2, rooms=2, instances=10, scripts=3, sprites=2, lines=5, seed=7)
+    generate_project(str(tmp_path / "a" / "bench"), **settings); generate_project(str(tmp_path / "b" / "bench"), **settings)
+    assert _files(str(tmp_path / "a" / "bench")) == _files(str(tmp_path / "b" / "bench"))
+
+def test_every_phase_reports_timings_and_file_counts(project, cache_dir):
+    root, details = project; before = _files(str(cache_dir))
+    phases = run_benchmarks(root, repeat=2, phases=BENCH_PHASES)
+    assert list(phases) == list(BENCH_PHASES) and all(len(result["runs_s"]) == 2 and result["best_s"] == min(result["runs_s"]) for result in phases.values())
+    assert phases["scan_cold"]["files"] == phases["export"]["files"] == len(details) and phases["rooms"]["files"] == 2
+    assert os.environ["VIBE2GML_CACHE_DIR"] == str(cache_dir) and _files(str(cache_dir)) == before # The runner's caches went to its own work folder
+
+def test_slower_phases_beyond_the_threshold_are_regressions():
+    baseline = {"project": {"gml_files": 10}, "phases": {"scan_cold": {"best_s": 1.0}, "export": {"best_s": 1.0}, "rooms": {"best_s": 1.0}}}
+    results = {"project": {"gml_files": 10}, "phases": {"scan_cold": {"best_s": 1.05}, "export": {"best_s": 1.2}, "rooms": {"best_s": 0.5}, "yy_parse": {"best_s": 9.0}}}
+    lines, regressions = compare_results(baseline, results)
+    assert regressions == ["export"] and len(lines) == 4 # Header plus the phases both runs have
+    assert compare_results(baseline, results, threshold=0.01)[1] == ["scan_cold", "export"]
+
+def test_compact_export_phase_records_output_size(project):
+    root, _ = project
+    phases = run_benchmarks(root, repeat=1, phases=("export", "export_compact"))
+    assert 0 < phases["export_compact"]["output_bytes"] < phases["export"]["output_bytes"]
+
+def test_larger_output_counts_as_a_regression():
+    baseline = {"project": {}, "phases": {"export_compact": {"best_s": 1.0, "output_bytes": 1000}}}
+    results = {"project": {}, "phases": {"export_compact": {"best_s": 1.0, "output_bytes": 1500}}}
+    assert compare_results(baseline, results)[1] == ["export_compact size"]
@@ -0,0 +1,19 @@
+import json, os
+
+from vibe2gml_core import compact_yy, compact_yy_file_text, load_yy
+
+
+def _room_path(root):
+    rooms = os.path.join(root, "rooms"); room = sorted(os.listdir(rooms))[0]
+    return os.path.join(rooms, room, f"{room}.yy")
+
+def test_invisible_views_are_dropped(project):
+    root, _ = project; path = _room_path(root)
+    assert len(load_yy(path)["views"]) == 8 # Generated like current GMS2: no resourceType or $GMRView on the views
+    compact = json.loads(compact_yy_file_text(path))
+    assert "views" not in compact and "instanceCounts" in json.dumps(compact)
+
+def test_kept_views_keep_their_slot_number():
+    hidden = {"inherit": False, "visible": False, "xview": 0, "wview": 1366, "objectId": None}
+    room = {"$GMRoom": "v1", "name": "rm_test", "views": [hidden] * 3 + [{"inherit": False, "visible": True, "xview": 0, "wview": 640, "objectId": None}] + [hidden] * 4}
+    assert compact_yy(room)["views"] == [{"index": 3, "visible": True, "wview": 640}]
@@ -0,0 +1,57 @@
+import os
+
+import pytest
+
+pytest.importorskip("PyQt6.QtWidgets")
+import vibe2gml_01_alpha as gui
+from vibe2gml_01_alpha import GmlDocument, GmlDocumentCache
+
+
+def _formats(gml_doc, block_number):
+    """{text: colour name} of the coloured spans in one block."""
+    block = gml_doc.document.findBlockByNumber(block_number); text = block.text()
+    return {text[fmt.start:fmt.start + fmt.length]: fmt.format.foreground().color().name() for fmt in block.layout().formats()}
+
+def test_small_file_is_loaded_and_coloured_at_once(qapp):
+    gml_doc = GmlDocument('var hp = 10; // start\nif (hp > 0) show_debug_message("alive");\n/* a\nb */ x = MAX_HP;\n'); qapp.processEvents() # Qt colours a new document in a deferred pass
+    assert gml_doc.loaded and gml_doc.document.isUndoRedoEnabled() and not gml_doc.document.isModified()
+    formats = gml_doc.highlighter.formats; color = lambda kind: formats[kind].foreground().color().name()
+    assert _formats(gml_doc, 0) == {"var": color('keyword'), "10": color('number'), "// start": color('comment')}
+    assert _formats(gml_doc, 1) == {"if": color('keyword'), "0": color('number'), "show_debug_message": color('call'), '"alive"': color('string')}
+    assert _formats(gml_doc, 2) == {"/* a": color('comment')} and _formats(gml_doc, 3) == {"b */": color('comment'), "MAX_HP": color('upper')} # Across lines
+
+def test_large_file_loads_in_whole_lines(qapp, monkeypatch):
+    monkeypatch.setattr(gui, "EDITOR_LAZY_LOAD_CHARS", 1000); monkeypatch.setattr(gui, "EDITOR_LOAD_CHUNK_CHARS", 300)
+    text = "".join(f"line_{i} = {i};\n" for i in range(200)); gml_doc = GmlDocument(text)
+    first = gml_doc.document.toPlainText()
+    assert not gml_doc.loaded and len(first) <= 300 and first.endswith(";") and text.startswith(first + "\n")
+    assert not gml_doc.document.isUndoRedoEnabled() # Read-only until loaded, and loading is not undoable
+    chunks = 1
+    while not gml_doc.load_more(): chunks += 1
+    assert gml_doc.document.toPlainText() == text and chunks > 3 and gml_doc.document.isUndoRedoEnabled() and not gml_doc.document.isModified()
+
+def test_highlighting_past_the_limit_waits_for_extend(qapp, monkeypatch):
+    monkeypatch.setattr(gui, "EDITOR_HIGHLIGHT_BATCH_BLOCKS", 5)
+    gml_doc = GmlDocument("var a;\n" * 50); qapp.processEvents(); last = gml_doc.highlighter.highlight_limit
+    assert last == 19 and _formats(gml_doc, last) and not _formats(gml_doc, last + 1)
+    while gml_doc.highlighter.extend(): pass
+    assert _formats(gml_doc, 49)
+
+def test_document_cache_checks_the_file_and_evicts_the_oldest(qapp):
+    cache = GmlDocumentCache(max_documents=2, max_chars=100); docs = [GmlDocument("x;\n" * 10) for _ in range(4)] # 31 characters each
+    cache.put("a", docs[0], 1, 30); cache.put("b", docs[1], 1, 30)
+    assert cache.get("a", 1, 30) is docs[0] and cache.get("a", 2, 30) is None and cache.get("a", 1, 30) is None # A new mtime drops it
+    cache.put("a", docs[0], 1, 30); cache.put("c", docs[2], 1, 30) # b is the least recently used
+    assert cache.get("b", 1, 30) is None and cache.get("c", 1, 30) is docs[2]
+    cache.update("c", 5, 40); assert cache.get("c", 5, 40) is docs[2]
+    cache.max_chars = 40; cache.put("d", docs[3], 1, 30) # Over the character budget: only the newest stays
+    assert [cache.get(path, 1, 30) for path in ("a", "d")] == [None, docs[3]]
+
+def test_switching_back_to_an_unchanged_file_reuses_its_document(viewer, project):
+    root, details = project; first, second = details[0][1], details[1][1]
+    viewer.open_gml_document(first); document = viewer.text_edit.document()
+    viewer.open_gml_document(second); viewer.open_gml_document(first)
+    assert viewer.text_edit.document() is document
+    with open(first, 'a', encoding='utf-8') as f: f.write("// changed on disk\n")
+    viewer.open_gml_document(first)
+    assert viewer.text_edit.document() is not document and viewer.text_edit.toPlainText().endswith("// changed on disk\n")
@@ -0,0 +1,92 @@
+import json, os, sqlite3
+
+import pytest
+
+import vibe2gml_core
+from vibe2gml_core import EXPORT_BYTES_PER_TOKEN, ExportCache, ExportCancelled, estimate_tokens, export_project
+
+
+def _read(path):
+    with open(path, 'rb') as f: return f.read()
+
+def _cached_export(root, details, path, **kwargs):
+    cache = ExportCache(root); cache.open()
+    try: return export_project(root, details, path, cache=cache, **kwargs)
+    finally: cache.close()
+
+def test_cached_export_matches_plain_export(project, tmp_path):
+    root, details = project; plain, cold, warm = (str(tmp_path / name) for name in ("plain.txt", "cold.txt", "warm.txt"))
+    export_project(root, details, plain)
+    _cached_export(root, details, cold); _cached_export(root, details, warm)
+    assert _read(cold) == _read(plain) and _read(warm) == _read(plain)
+
+def test_cached_export_rereads_changed_files(project, tmp_path):
+    root, details = project; plain, cached = str(tmp_path / "plain.txt"), str(tmp_path / "cached.txt")
+    _cached_export(root, details, cached)
+    with open(details[0][1], 'a', encoding='utf-8') as f: f.write("// edited\n")
+    result = _cached_export(root, details, cached); export_project(root, details, plain)
+    assert _read(cached) == _read(plain) and b"// edited\n" in _read(cached)
+    assert result.changed == 1
+
+def test_export_cache_stores_no_bodies(project, tmp_path):
+    root, details = project
+    _cached_export(root, details, str(tmp_path / "export.txt"))
+    with sqlite3.connect(ExportCache(root).path) as db: columns = [row[1] for row in db.execute("PRAGMA table_info(sections)")]
+    assert columns == ["path", "kind", "header", "footer", "mtime_ns", "size", "sha1"]
+
+def test_delta_export_lists_only_changes(project, tmp_path):
+    root, details = project; delta = str(tmp_path / "delta.txt")
+    _cached_export(root, details, str(tmp_path / "export.txt"))
+    with open(details[1][1], 'a', encoding='utf-8') as f: f.write("// edited\n")
+    result = _cached_export(root, details, delta, delta=True)
+    assert result.changed == 1 and result.added == 0 and details[1][2].replace(os.sep, '/') in _read(delta).decode('utf-8')
+
+def test_chunks_fit_their_token_budget(project, tmp_path):
+    root, details = project; max_tokens = 1500
+    result = export_project(root, details, str(tmp_path / "export.txt"), chunk_tokens=max_tokens)
+    with open(result.files[-1], encoding='utf-8') as f: manifest = json.load(f)
+    assert len(manifest["chunks"]) > 2
+    for chunk, path in zip(manifest["chunks"], result.files):
+        size = os.path.getsize(path)
+        assert chunk["bytes"] == size and chunk["tokens"] == estimate_tokens(size)
+        if len(chunk["assets"]) > 1: assert size <= max_tokens * EXPORT_BYTES_PER_TOKEN # Only a lone oversized asset may exceed it
+
+def test_file_failing_to_decode_midway_leaves_only_the_error_marker(project, tmp_path, monkeypatch):
+    root, details = project; path = str(tmp_path / "export.txt"); bad = details[0]
+    monkeypatch.setattr(vibe2gml_core, "EXPORT_STREAM_THRESHOLD", 1024); monkeypatch.setattr(vibe2gml_core, "EXPORT_CHUNK_SIZE", 256) # Stream it
+    with open(bad[1], 'wb') as f: f.write(b"// streamed line\n" * 4000 + b"\xff\n")
+    export_project(root, details, path)
+    text = _read(path).decode('utf-8')
+    assert "// streamed line" not in text and f"ERROR READING GML FILE: {bad[2]} *****" in text
+    start = text.index(f"// ----- GML Path: {bad[2]} -----\n\n"); assert text[start:].split("\n")[2].startswith("// ***** ERROR READING")
+
+def test_unchanged_unreadable_file_is_left_out_of_deltas(project, tmp_path):
+    root, details = project; full, delta = str(tmp_path / "export.txt"), str(tmp_path / "delta.txt"); bad = details[0]
+    with open(bad[1], 'wb') as f: f.write(b"\xff not UTF-8\n")
+    _cached_export(root, details, full); _cached_export(root, details, full) # A full export read from the cache still reports the error
+    assert f"ERROR READING GML FILE: {bad[2]} *****" in _read(full).decode('utf-8')
+    result = _cached_export(root, details, delta, delta=True)
+    assert result.sections == 0 and "ERROR READING" not in _read(delta).decode('utf-8')
+    with open(bad[1], 'wb') as f: f.write(b"\xff still not UTF-8\n")
+    result = _cached_export(root, details, delta, delta=True)
+    assert result.sections == 1 and f"ERROR READING GML FILE: {bad[2]} *****" in _read(delta).decode('utf-8')
+
+def test_streamed_files_export_like_files_read_whole(project, tmp_path, monkeypatch):
+    root, details = project; whole, streamed = str(tmp_path / "whole.txt"), str(tmp_path / "streamed.txt")
+    with open(details[0][1], 'a', encoding='utf-8') as f: f.write("// ünïcode line\n" * 400)
+    export_project(root, details, whole)
+    monkeypatch.setattr(vibe2gml_core, "EXPORT_STREAM_THRESHOLD", 64); monkeypatch.setattr(vibe2gml_core, "EXPORT_CHUNK_SIZE", 100)
+    export_project(root, details, streamed); _cached_export(root, details, str(tmp_path / "cached.txt"))
+    assert _read(streamed) == _read(whole) and _read(str(tmp_path / "cached.txt")) == _read(whole)
+
+def test_cancelled_export_keeps_the_previous_file(project, tmp_path):
+    root, details = project; path = str(tmp_path / "export.txt"); done = []
+    with open(path, 'w', encoding='utf-8') as f: f.write("previous export\n")
+    with pytest.raises(ExportCancelled): export_project(root, details, path, progress=lambda i, total: done.append(i), is_cancelled=lambda: len(done) >= 3)
+    assert len(done) == 3 and _read(path) == b"previous export\n" and not [name for name in os.listdir(tmp_path) if name.endswith((".part", ".part2"))]
+
+def test_export_cancelled_while_streaming_leaves_no_part_files(project, tmp_path, monkeypatch):
+    root, details = project; path = str(tmp_path / "export.txt"); checks = []
+    monkeypatch.setattr(vibe2gml_core, "EXPORT_STREAM_THRESHOLD", 64); monkeypatch.setattr(vibe2gml_core, "EXPORT_CHUNK_SIZE", 16)
+    with pytest.raises(ExportCancelled): export_project(root, details, path, chunk_tokens=500, is_cancelled=lambda: checks.append(1) or len(checks) > 5)
+    assert not [name for name in os.listdir(tmp_path) if name.startswith("export")]
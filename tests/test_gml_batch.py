@@ -0,0 +1,45 @@
+import os
+
+import pytest
+
+from vibe2gml_core import apply_gml_batch, export_project, parse_gml_blocks, plan_gml_batch
+
+
+def test_error_marker_sections_are_rejected(project, tmp_path):
+    root, details = project; export_path = str(tmp_path / "export.txt"); bad_path = details[0][1]
+    with open(bad_path, 'wb') as f: f.write(b"\xff\xfe not UTF-8\n") # The export writes an error marker instead of this section's code
+    export_project(root, details, export_path)
+    with open(export_path, encoding='utf-8') as f: blob = f.read()
+    assert "// ***** ERROR READING GML FILE: " in blob
+    changes, unchanged, errors = plan_gml_batch(root, parse_gml_blocks(blob))
+    assert changes == [] and len(unchanged) == len(details) - 1
+    assert len(errors) == 1 and "export read error" in errors[0]
+
+def test_edited_section_is_planned(project):
+    root, details = project; _, path, relative_path, _ = details[1]
+    blob = f"Here you go:\n// ----- Start GML: Test -----\n// ----- GML Path: {relative_path} -----\n\nshow_debug_message(\"hi\");\n"
+    changes, unchanged, errors = plan_gml_batch(root, parse_gml_blocks(blob))
+    assert errors == [] and unchanged == [] and [(c.file_path, c.new_text) for c in changes] == [(path, 'show_debug_message("hi");\n')]
+
+def test_failed_rename_rolls_back_to_the_original_bytes(project, monkeypatch):
+    root, details = project; first, second = details[0], details[1]
+    original = b"// Saved with CRLF\r\nvar x = \"\xe9\";\r\n" # Not UTF-8 either: a text round trip would change it
+    with open(first[1], 'wb') as f: f.write(original)
+    blob = "".join(f"// ----- Start GML: {name} -----\n// ----- GML Path: {relative_path} -----\n\nx = {n};\n" for n, (name, _, relative_path, _) in enumerate((first, second)))
+    new_path = os.path.join(os.path.dirname(second[1]), "Step_1.gml")
+    blob += f"// ----- Start GML: New -----\n// ----- GML Path: {os.path.relpath(new_path, root)} -----\n\ny = 1;\n"
+    changes, _, errors = plan_gml_batch(root, parse_gml_blocks(blob))
+    assert errors == [] and [change.file_path for change in changes] == [first[1], second[1], new_path]
+    with open(second[1], 'rb') as f: second_original = f.read()
+    real_replace = os.replace; calls = []
+    def replace(src, dst):
+        calls.append(dst)
+        if len(calls) == 2: raise PermissionError(13, "Permission denied", dst) # The second target cannot be replaced
+        real_replace(src, dst)
+    monkeypatch.setattr(os, "replace", replace)
+    with pytest.raises(PermissionError): apply_gml_batch(changes)
+    monkeypatch.undo()
+    with open(first[1], 'rb') as f: assert f.read() == original
+    with open(second[1], 'rb') as f: assert f.read() == second_original
+    assert not os.path.exists(new_path)
+    assert not [name for folder in {os.path.dirname(c.file_path) for c in changes} for name in os.listdir(folder) if name.endswith('.tmp')]
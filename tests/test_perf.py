@@ -0,0 +1,37 @@
+import json, threading
+
+from vibe2gml_core import PerfTrace, export_project, perf
+
+
+def test_disabled_trace_records_nothing():
+    trace = PerfTrace(); calls = []
+    traced = trace.traced("work")(lambda n: calls.append(n) or n * 2)
+    with trace.span("block", size=1) as first, trace.span("other") as second: trace.count("files", 3)
+    assert first is second and traced(4) == 8 and calls == [4] # One shared no-op span
+    assert not trace.events and trace.phases == {} and trace.counters == {} and trace.format_summary() == "Recording is off."
+
+def test_chrome_trace_has_an_event_per_span_on_each_thread(tmp_path):
+    trace = PerfTrace(); trace.enable(); path = str(tmp_path / "trace.json")
+    traced = trace.traced("scan.folder")(lambda: None)
+    with trace.span("export.section", path="a.gml"): traced()
+    worker = threading.Thread(target=traced, name="worker"); worker.start(); worker.join()
+    trace.count("export.sections", 2); trace.save_chrome_trace(path)
+    with open(path, encoding='utf-8') as f: document = json.load(f)
+    events = document["traceEvents"]; spans = [event for event in events if event["ph"] == "X"]
+    assert document["displayTimeUnit"] == "ms" and document["otherData"]["dropped_events"] == 0
+    assert sorted(event["args"]["name"] for event in events if event["ph"] == "M") == sorted([threading.current_thread().name, "worker"])
+    assert [(event["name"], event["cat"]) for event in spans] == [("scan.folder", "scan"), ("export.section", "export"), ("scan.folder", "scan")]
+    assert spans[1]["args"] == {"path": "a.gml"} and len({event["tid"] for event in spans}) == 2
+    assert all(event["ts"] >= 0 and event["dur"] >= 0 for event in spans) and spans[1]["ts"] <= spans[0]["ts"] and spans[1]["dur"] >= spans[0]["dur"]
+    assert [event["args"] for event in events if event["ph"] == "C"] == [{"export.sections": 2}]
+
+def test_event_list_is_bounded_but_phase_totals_are_not():
+    trace = PerfTrace(max_events=2); trace.enable()
+    for _ in range(3): trace.record("yy.json", 1.0, 1.5)
+    assert len(trace.events) == 2 and trace.dropped == 1 and trace.phases["yy.json"] == [3, 1.5, 0.5]
+
+def test_export_is_traced_while_recording(project, tmp_path, monkeypatch):
+    root, details = project; monkeypatch.setattr(perf, "enabled", True); perf.clear()
+    export_project(root, details, str(tmp_path / "export.txt"))
+    phases, counters = perf.summary(); perf.clear()
+    assert "export" in [phase.name for phase in phases] and counters["export.sections"] > len(details)
@@ -0,0 +1,35 @@
+import pytest
+
+from vibe2gml_bench import synthetic_room
+from vibe2gml_core import HAVE_NUMPY, RoomInstanceTable, analyze_rooms, find_room_files, load_room_table
+
+needs_numpy = pytest.mark.skipif(not HAVE_NUMPY, reason="NumPy is not installed")
+
+
+def _instance(obj, x, y):
+    return {"objId": {"name": obj, "path": f"objects/{obj}/{obj}.yy"}, "x": x, "y": y}
+
+def _room():
+    return {"name": "rm_test", "roomSettings": {"Width": 512, "Height": 256}, "layers": [
+        {"name": "Instances", "instances": [_instance("obj_a", 10, 10), _instance("obj_a", 10, 10), _instance("obj_a", 10, 10), _instance("obj_b", 10, 10),
+                                            _instance("obj_a", -1, 10), _instance("obj_b", 300, 256)]},
+        {"name": "Group", "layers": [{"name": "Nested", "instances": [_instance("obj_a", 10, 10), _instance("obj_b", 300.5, 20)]}]}]}
+
+@pytest.mark.parametrize("vectorized", [pytest.param(True, marks=needs_numpy, id="numpy"), pytest.param(False, id="python")])
+def test_room_counts(vectorized):
+    table = RoomInstanceTable(); table.add_room(_room(), "rooms/rm_test/rm_test.yy")
+    stats, = analyze_rooms(table, vectorized=vectorized)
+    assert stats.instances == 8 and stats.layer_counts == {"Instances": 6, "Nested": 2} and stats.object_counts == {"obj_a": 5, "obj_b": 3}
+    assert stats.out_of_bounds == 2 # x < 0, and y == Height
+    assert stats.stacked == 2 # Two extra obj_a at (10, 10) on Instances; the obj_b there and the Nested copy are not stacked on them
+    assert stats.cell == 256 and stats.density == [[5, 1]] and stats.peak == (5, 0, 0)
+
+@needs_numpy
+def test_numpy_and_python_paths_agree(project):
+    root, _ = project
+    table, errors = load_room_table(find_room_files(root)); assert not errors
+    for seed, size in enumerate((5000, 20000)): table.add_room(synthetic_room(f"rm_synthetic_{seed}", size, width=size // 4, height=1024, seed=seed))
+    for _ in range(2): # Whole-pixel positions, then with fractional ones that the NumPy path can't pack into one sort key
+        vectorized, python = analyze_rooms(table, vectorized=True), analyze_rooms(table, vectorized=False)
+        assert vectorized == python and sum(stats.out_of_bounds for stats in python) > 0 and sum(stats.stacked for stats in python) > 0
+        table.add_room(_room())
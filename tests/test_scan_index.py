@@ -0,0 +1,31 @@
+import os, time
+
+from vibe2gml_core import ScanIndex, scan_project
+
+
+def _age_folders(root, seconds=100):
+    """Backdates every folder's mtime, so the index doesn't treat them as racy (just modified) and trusts them."""
+    then = time.time() - seconds
+    for folder, _, _ in os.walk(root): os.utime(folder, (then, then))
+
+def test_unchanged_folders_are_not_listed_again(project):
+    root, details = project; _age_folders(root)
+    index = ScanIndex(root); index.clear(); assert scan_project(root, index) == details
+    index.save(); listings = index.hits + index.misses
+    index = ScanIndex(root); index.load()
+    assert scan_project(root, index) == details and index.misses == 0 and index.hits == listings
+
+def test_folder_with_a_new_mtime_is_listed_again(project):
+    root, details = project; _age_folders(root)
+    index = ScanIndex(root); scan_project(root, index); index.save()
+    asset_folder = os.path.dirname(details[0][1]); new_file = os.path.join(asset_folder, "Other_99.gml")
+    with open(new_file, 'w', encoding='utf-8') as f: f.write("// new\n")
+    then = time.time() - 50; os.utime(asset_folder, (then, then)) # Still old enough to be trusted, but a different mtime
+    index = ScanIndex(root); index.load(); rescanned = scan_project(root, index)
+    assert index.misses == 1 and new_file in [detail[1] for detail in rescanned] and len(rescanned) == len(details) + 1
+
+def test_racy_folders_are_never_trusted(project):
+    root, _ = project
+    index = ScanIndex(root); scan_project(root, index); index.save() # Just generated: every folder is racy
+    index = ScanIndex(root); index.load(); scan_project(root, index)
+    assert index.hits == 0
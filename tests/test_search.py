@@ -0,0 +1,40 @@
+import os
+
+from vibe2gml_core import GmlSearchIndex
+
+
+def _write(path, text):
+    with open(path, 'w', encoding='utf-8') as f: f.write(text)
+
+def _built(root, details):
+    index = GmlSearchIndex(root); index.build(details)
+    return index
+
+def test_identifier_search_matches_whole_names_only(project):
+    root, details = project; file_path, relative_path = details[0][1], details[0][2]
+    _write(file_path, "var mana = 1;\nmax_mana = mana + 2;\nmana_bar = 0;\n")
+    hits = _built(root, details).search("mana", identifier=True)
+    assert [(hit.relative_path, hit.line, hit.column, hit.text) for hit in hits] == [(relative_path, 1, 4, "var mana = 1;"), (relative_path, 2, 11, "max_mana = mana + 2;")]
+
+def test_substring_search_ignores_case(project):
+    root, details = project; file_path = details[2][1]
+    _write(file_path, "// nothing here\nshow_debug_message(\"Needle found\");\n")
+    hits = _built(root, details).search("NEEDLE")
+    assert [(hit.file_path, hit.line, hit.column) for hit in hits] == [(file_path, 2, 20)]
+
+def test_update_file_reindexes_a_saved_file(project):
+    root, details = project; file_path, relative_path = details[1][1], details[1][2]
+    _write(file_path, "old_name = 1;\n"); index = _built(root, details)
+    _write(file_path, "new_name = 2;\n"); index.update_file(file_path, relative_path)
+    assert index.search("old_name", identifier=True) == [] and "old_name" not in index.postings
+    assert [hit.file_path for hit in index.search("new_name", identifier=True)] == [file_path]
+    assert [hit.file_path for hit in index.search("new_name")] == [file_path]
+    os.remove(file_path); index.update_file(file_path, relative_path)
+    assert file_path not in index.files and index.search("new_name") == []
+
+def test_saved_index_reuses_unchanged_files(project):
+    root, details = project
+    _built(root, details).save()
+    with open(details[0][1], 'a', encoding='utf-8') as f: f.write("appended_name = 3;\n")
+    index = GmlSearchIndex(root); index.load(); index.build(details)
+    assert index.reused == len(details) - 1 and [hit.file_path for hit in index.search("appended_name", identifier=True)] == [details[0][1]]
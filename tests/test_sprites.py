@@ -0,0 +1,73 @@
+import json, os, threading
+
+import pytest
+
+from vibe2gml_core import SPRITE_DEFAULT_FPS, SPRITE_GAME_SPEED, sprite_frames
+
+
+def _sprite_folder(project):
+    root, _ = project; folder = os.path.join(root, "sprites", "spr_bench_0")
+    with open(os.path.join(folder, "spr_bench_0.yy"), encoding='utf-8') as f: assert '"frame_3"' in f.read() # The generator lists frame_0..frame_3
+    return folder
+
+def _write_pngs(folder, names, size=(64, 32)):
+    from PyQt6.QtGui import QColor, QImage
+    for i, name in enumerate(names):
+        image = QImage(*size, QImage.Format.Format_ARGB32); image.fill(QColor(40 * i, 0, 0)); assert image.save(os.path.join(folder, f"{name}.png"))
+
+def _write_png_bytes(folder, names):
+    for name in names:
+        with open(os.path.join(folder, f"{name}.png"), 'wb') as f: f.write(b"\x89PNG\r\n\x1a\n")
+
+def test_frames_follow_the_yy_frame_list(project):
+    folder = _sprite_folder(project); _write_png_bytes(folder, ["frame_3", "frame_1", "frame_0", "frame_2", "unused"])
+    with open(os.path.join(folder, "spr_bench_0.yy"), 'w', encoding='utf-8') as f:
+        json.dump({"frames": [{"name": "frame_2"}, {"%Name": "frame_0"}, {"name": "missing"}, {"name": "frame_1"}], "sequence": {"playbackSpeed": 0.5, "playbackSpeedType": 1}}, f)
+    paths, fps = sprite_frames(folder, "spr_bench_0")
+    assert [os.path.basename(path) for path in paths] == ["frame_2.png", "frame_0.png", "frame_1.png"] and fps == 0.5 * SPRITE_GAME_SPEED
+
+def test_frames_without_a_readable_yy_are_in_name_order(project):
+    folder = _sprite_folder(project); _write_png_bytes(folder, ["b", "a", "c"])
+    with open(os.path.join(folder, "spr_bench_0.yy"), 'w', encoding='utf-8') as f: f.write("{ not json")
+    paths, fps = sprite_frames(folder, "spr_bench_0")
+    assert [os.path.basename(path) for path in paths] == ["a.png", "b.png", "c.png"] and fps == SPRITE_DEFAULT_FPS
+    with pytest.raises(OSError): sprite_frames(os.path.join(folder, "gone"), "gone")
+
+
+@pytest.fixture
+def loader(qapp):
+    from vibe2gml_01_alpha import SpriteImageLoader
+    from PyQt6.QtCore import QSize
+    loader = SpriteImageLoader(); loader.begin(QSize(32, 32))
+    yield loader
+    loader.shutdown(); loader.deleteLater()
+
+def test_frames_are_decoded_scaled_and_cached_off_the_gui_thread(project, loader, qt_wait):
+    folder = _sprite_folder(project); _write_pngs(folder, ["frame_0", "frame_1", "frame_2", "frame_3"]); _write_png_bytes(folder, ["broken"])
+    listed = []; loader.frames_ready.connect(lambda *args: listed.append(args))
+    loader.request_frames(folder, "spr_bench_0", first_frame=True)
+    assert qt_wait(lambda: listed) and listed[0][3] == "" and [os.path.basename(path) for path in listed[0][1]] == [f"frame_{i}.png" for i in range(4)]
+    first = listed[0][1][0]; assert qt_wait(lambda: loader.cached(first) is not None)
+    image, source_size = loader.cached(first)
+    assert (image.width(), image.height()) == (32, 16) and (source_size.width(), source_size.height()) == (64, 32) # Fitted to the viewer, aspect kept
+    broken = os.path.join(folder, "broken.png"); loader.request(broken)
+    assert qt_wait(lambda: loader.failed(broken)) and loader.cached(broken) is None
+    loader.invalidate(folder)
+    assert loader.cached(first) is None and loader.frames(folder) is None and not loader.failed(broken)
+
+def test_cache_keeps_the_most_recent_frames_within_its_budget(project, loader, qt_wait):
+    folder = _sprite_folder(project); names = [f"frame_{i}" for i in range(4)]; _write_pngs(folder, names, size=(32, 32))
+    paths = [os.path.join(folder, f"{name}.png") for name in names]; loader.max_bytes = 2 * 32 * 32 * 4 # Two decoded frames
+    for path in paths:
+        loader.request(path); assert qt_wait(lambda: loader.cached(path) is not None)
+    assert [loader.cached(path) is not None for path in paths] == [False, False, True, True] and loader._bytes <= loader.max_bytes
+
+def test_requests_from_an_earlier_selection_are_dropped(project, loader, qt_wait):
+    from PyQt6.QtCore import QSize
+    from vibe2gml_01_alpha import SPRITE_DECODE_WORKERS
+    folder = _sprite_folder(project); _write_pngs(folder, ["frame_0"]); path = os.path.join(folder, "frame_0.png"); busy = threading.Event()
+    for _ in range(SPRITE_DECODE_WORKERS): loader._pool.submit(busy.wait, 5) # Keeps the decode below queued while the selection changes
+    loader.request(path); loader.begin(QSize(32, 32)); busy.set()
+    assert qt_wait(lambda: not loader._pending)
+    assert loader.cached(path) is None and not loader._pending
+    loader.request(path); assert qt_wait(lambda: loader.cached(path) is not None) # Requested again for the new selection
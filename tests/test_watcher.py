@@ -0,0 +1,64 @@
+import os, shutil, time
+
+import pytest
+
+pytest.importorskip("PyQt6.QtWidgets")
+import vibe2gml_01_alpha as gui
+
+
+@pytest.fixture(params=[False, True], ids=["os", "polling"])
+def watcher(request, qapp, monkeypatch):
+    """A ProjectWatcher with short timers, using OS watches or polling, and the lists its signals are collected in."""
+    monkeypatch.setattr(gui, "WATCH_DEBOUNCE_MS", 20); monkeypatch.setattr(gui, "WATCH_POLL_INTERVAL_MS", 20)
+    if request.param: monkeypatch.setattr(gui, "WATCH_MAX_FOLDERS", 0)
+    watcher = gui.ProjectWatcher(); folders, files = [], []
+    watcher.folders_changed.connect(folders.extend); watcher.file_changed.connect(files.append)
+    yield watcher, folders, files
+    watcher.stop(); watcher.deleteLater()
+
+def _backdate(*paths, seconds=100):
+    """Polling compares mtimes; a write in the same clock tick as generating the project would leave them equal."""
+    then = time.time() - seconds
+    for path in paths: os.utime(path, (then, then))
+
+def _write(path, text):
+    with open(path, 'w', encoding='utf-8') as f: f.write(text)
+
+def _settle(qt_wait, seconds=0.3):
+    qt_wait(lambda: False, seconds)
+
+def test_changed_folders_are_reported_once_settled(project, watcher, qt_wait):
+    root, details = project; watcher, folders, _ = watcher; changed, quiet = os.path.dirname(details[0][1]), os.path.dirname(details[-1][1])
+    _backdate(changed, quiet); watcher.watch_folders([changed, quiet]); assert watcher.polling == (gui.WATCH_MAX_FOLDERS == 0)
+    _write(os.path.join(changed, "Other_77.gml"), "x = 1;\n"); _write(os.path.join(changed, "Other_78.gml"), "y = 2;\n")
+    assert qt_wait(lambda: folders); _settle(qt_wait)
+    assert set(folders) == {changed}
+
+def test_own_writes_are_not_reported(project, watcher, qt_wait):
+    root, details = project; watcher, folders, _ = watcher; folder = os.path.dirname(details[0][1])
+    _backdate(folder); watcher.watch_folders([folder])
+    own = os.path.join(folder, "Other_77.gml"); _write(own, "x = 1;\n"); watcher.note_own_writes([own])
+    _settle(qt_wait); assert folders == []
+    _write(os.path.join(folder, "Other_78.gml"), "y = 2;\n") # Someone else's write afterwards still counts
+    assert qt_wait(lambda: folders) and set(folders) == {folder}
+
+def test_open_file_is_reported_when_modified_or_replaced(project, watcher, qt_wait):
+    root, details = project; watcher, _, files = watcher; path = details[0][1]
+    _backdate(path); watcher.watch_folders([]); watcher.watch_file(path)
+    with open(path, 'a', encoding='utf-8') as f: f.write("// from GMS2\n")
+    assert qt_wait(lambda: files == [path])
+    _write(f"{path}.new", "replaced = true;\n"); os.replace(f"{path}.new", path) # How GMS2 and most editors save
+    assert qt_wait(lambda: len(files) == 2)
+    with open(path, 'a', encoding='utf-8') as f: f.write("// again\n") # Still watched after the replace
+    assert qt_wait(lambda: len(files) == 3) and set(files) == {path}
+
+def test_folder_changes_patch_the_tree_and_gml_details(viewer, project):
+    root, details = project; viewer.start_watching()
+    asset_folder = os.path.dirname(details[0][1]); added = os.path.join(asset_folder, "Other_77.gml"); _write(added, "x = 1;\n")
+    removed_folder = os.path.join(root, "objects", "obj_bench_11"); shutil.rmtree(removed_folder)
+    viewer.on_project_folders_changed(sorted([asset_folder, os.path.dirname(removed_folder)]))
+    paths = [detail[1] for detail in viewer.project_gml_files_details]
+    assert added in paths and not [path for path in paths if path.startswith(removed_folder + os.sep)]
+    assert paths == sorted(paths) and len(paths) == len(details) + 1 - sum(detail[1].startswith(removed_folder + os.sep) for detail in details)
+    assert [node.path for node in viewer._scan_asset_nodes[asset_folder].children].count(added) == 1 and removed_folder not in viewer._scan_asset_nodes
+    assert [hit.file_path for hit in viewer.search_index.search("x", identifier=True) if hit.file_path == added] == [added]
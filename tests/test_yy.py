@@ -0,0 +1,37 @@
+import os
+
+from vibe2gml_core import YyCache, parse_yy
+
+
+def test_trailing_commas_are_stripped_outside_strings_only():
+    source = b'{"name": "x, }", "tags": ["a, ]", "b",], "nested": {"code": "if (a) { b(1, ]", "n": 1,},}'
+    assert parse_yy(source) == {"name": "x, }", "tags": ["a, ]", "b"], "nested": {"code": "if (a) { b(1, ]", "n": 1}}
+
+def test_trailing_commas_next_to_escaped_quotes():
+    assert parse_yy(b'{"a": "say \\", }\\" twice", "b": [1,\n  ],\n}') == {"a": 'say ", }" twice', "b": [1]}
+
+def test_valid_json_and_bom_parse_as_is():
+    assert parse_yy(b'\xef\xbb\xbf{"a": [1, 2]}') == {"a": [1, 2]}
+
+def _write(path, text, mtime_ns):
+    with open(path, 'w', encoding='utf-8') as f: f.write(text)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+def test_cache_is_invalidated_by_mtime_or_size(tmp_path):
+    cache = YyCache(); path = str(tmp_path / "a.yy")
+    _write(path, '{"v": 1,}', 10**18)
+    first = cache.load(path); assert cache.load(path) is first and (cache.hits, cache.misses) == (1, 1)
+    _write(path, '{"v": 2,}', 10**18 + 1) # Same size, new mtime
+    assert cache.load(path) == {"v": 2}
+    _write(path, '{"v": 33,}', 10**18 + 1) # Same mtime, new size
+    assert cache.load(path) == {"v": 33} and cache.misses == 3
+
+def test_cache_evicts_least_recently_used_by_count_and_bytes(tmp_path):
+    paths = [str(tmp_path / f"{i}.yy") for i in range(4)]
+    for i, path in enumerate(paths): _write(path, '{"v": %d}' % i, 10**18)
+    cache = YyCache(max_entries=2)
+    cache.load(paths[0]); cache.load(paths[1]); cache.load(paths[0]); cache.load(paths[2]) # paths[1] is the least recently used
+    assert list(cache._entries) == [paths[0], paths[2]]
+    cache = YyCache(max_bytes=os.path.getsize(paths[0]) * 2)
+    for path in paths: cache.load(path)
+    assert list(cache._entries) == paths[2:] and cache._total_bytes == sum(os.path.getsize(path) for path in paths[2:])
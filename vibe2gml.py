@@ -0,0 +1,278 @@
+# vibe2gml command line: scan and export GMS2 projects without starting the GUI.
+# PyQt6 is only imported for the 'gui' command, so headless exports start fast and run without Qt installed.
+#
+#   python vibe2gml.py export <project> [<project> ...] [-o out.txt | -o out_dir] [--changes] [--chunk-tokens N] [--compact-yy] [--asset NAME ...]
+#   python vibe2gml.py scan <project> [--json] [--rescan]
+#   python vibe2gml.py search <project> <text> [--identifier]
+#   python vibe2gml.py deps <project> [<asset>] [--json]
+#   python vibe2gml.py apply <project> <sections.txt | -> [--dry-run]
+#   python vibe2gml.py rooms <project> [--json] [--top N]
+#   python vibe2gml.py bench-rooms [--instances N] [--rooms N]
+#   python vibe2gml.py bench [--objects N] [--events N] [--rooms N] [--instances N] [--project <project>] [-o results.json] [--compare baseline.json]
+#   python vibe2gml.py [gui]
+#   python vibe2gml.py --trace trace.json <command> ...   (any command: save per-phase timings as a Chrome trace)
+import sys
+import os
+import json
+import time
+import argparse
+
+from vibe2gml_core import (ScanIndex, ExportCache, GmlSearchIndex, scan_project, export_project, SEARCH_MAX_RESULTS, RoomInstanceTable, find_room_files,
+                           load_room_table, analyze_rooms, format_room_report, parse_yy, HAVE_NUMPY, AssetGraph,
+                           read_text, parse_gml_blocks, plan_gml_batch, apply_gml_batch, format_gml_batch_diff, perf)
+from vibe2gml_bench import BENCH_PHASES, BENCH_REGRESSION_THRESHOLD, benchmark, format_results, compare_results, synthetic_room
+
+
+def default_export_name(project_root, delta=False):
+    """Same file name the GUI suggests for an export."""
+    return f"{os.path.basename(os.path.normpath(project_root))}_{'changes' if delta else 'export'}.txt"
+
+def load_project(project_root, rescan=False):
+    """Scans project_root (through its scan index) and returns its sorted GML details."""
+    index = ScanIndex(project_root)
+    if rescan: index.clear()
+    else: index.load()
+    return scan_project(project_root, index)
+
+def load_asset_graph(project_root, rescan=False):
+    """Builds project_root's AssetGraph, parsing only the .yy files that changed since the stored one."""
+    graph = AssetGraph(project_root)
+    if rescan: graph.clear()
+    else: graph.load()
+    graph.build(); graph.save()
+    return graph
+
+def export_one(project_root, save_path, args):
+    details = load_project(project_root, args.rescan); asset_order = None
+    if args.asset: # Only these assets and everything they depend on, dependencies first
+        graph = load_asset_graph(project_root, args.rescan)
+        missing = [name for name in args.asset if name not in graph.assets]
+        if missing: print(f"{project_root}: unknown asset(s): {', '.join(missing)}", file=sys.stderr); return False
+        asset_order = [graph.assets[name].yy_path for name in graph.dependency_order(graph.dependencies(args.asset))]
+        wanted = set(asset_order); details = [detail for detail in details if detail[3] in wanted]
+    elif not details: print(f"{project_root}: no GML files found, nothing exported", file=sys.stderr); return False
+    cache = ExportCache(project_root) if not args.no_cache else None
+    start = time.perf_counter()
+    try:
+        if cache: cache.open()
+        result = export_project(project_root, details, save_path, cache=cache, delta=args.changes, chunk_tokens=args.chunk_tokens, yy_compact=args.compact_yy,
+                                update_cache=not args.asset, asset_order=asset_order)
+    except (OSError, ValueError) as e: print(f"{project_root}: export failed: {e}", file=sys.stderr); return False
+    finally:
+        if cache: cache.close()
+    if not args.quiet:
+        elapsed = time.perf_counter() - start
+        if args.changes: print(f"{project_root}: {result.added} added, {result.changed} changed, {result.removed} removed -> {save_path} ({elapsed:.2f}s)")
+        elif asset_order: print(f"{project_root}: {len(asset_order)} assets, {len(details)} GML files -> {', '.join(result.files)} ({elapsed:.2f}s)")
+        else: print(f"{project_root}: {len(details)} GML files, {result.reused} reused from cache -> {', '.join(result.files)} ({elapsed:.2f}s)")
+    return True
+
+def cmd_export(args):
+    projects = [os.path.abspath(p) for p in args.projects]
+    for project_root in projects:
+        if not os.path.isdir(project_root): print(f"Not a folder: {project_root}", file=sys.stderr); return 2
+    out = args.output
+    if len(projects) > 1 and out and not os.path.isdir(out): print("With several projects, -o must be an existing folder", file=sys.stderr); return 2
+    ok = True
+    for project_root in projects:
+        save_path = out or default_export_name(project_root, args.changes)
+        if os.path.isdir(save_path): save_path = os.path.join(save_path, default_export_name(project_root, args.changes))
+        ok = export_one(project_root, save_path, args) and ok
+    return 0 if ok else 1
+
+def cmd_scan(args):
+    project_root = os.path.abspath(args.project)
+    if not os.path.isdir(project_root): print(f"Not a folder: {project_root}", file=sys.stderr); return 2
+    details = load_project(project_root, args.rescan)
+    if args.json: json.dump([{'name': name, 'path': path, 'relative_path': rel, 'yy_path': yy} for name, path, rel, yy in details], sys.stdout, indent=2); print()
+    else:
+        for name, path, rel, yy in details: print(f"{name}\t{rel}")
+        print(f"{len(details)} GML files", file=sys.stderr)
+    return 0
+
+def cmd_search(args):
+    project_root = os.path.abspath(args.project)
+    if not os.path.isdir(project_root): print(f"Not a folder: {project_root}", file=sys.stderr); return 2
+    index = GmlSearchIndex(project_root)
+    if args.rescan: index.clear()
+    else: index.load()
+    index.build(load_project(project_root, args.rescan)); index.save()
+    hits = index.search(args.query, args.identifier, args.limit)
+    for hit in hits: print(f"{hit.relative_path}:{hit.line}:{hit.column + 1}: {hit.text.strip()}")
+    return 0 if hits else 1
+
+def cmd_deps(args):
+    project_root = os.path.abspath(args.project)
+    if not os.path.isdir(project_root): print(f"Not a folder: {project_root}", file=sys.stderr); return 2
+    graph = load_asset_graph(project_root, args.rescan)
+    if args.asset is None: # Unused assets; names used as identifiers in GML count as used
+        index = GmlSearchIndex(project_root)
+        if args.rescan: index.clear()
+        else: index.load()
+        index.build(load_project(project_root, args.rescan)); index.save()
+        unused = graph.unused(index.postings)
+        if args.json: json.dump([{'kind': kind, 'name': name} for kind, name in unused], sys.stdout, indent=2); print()
+        else:
+            for kind, name in unused: print(f"{kind}\t{name}")
+            print(f"{len(unused)} unused assets of {len(graph.assets)}", file=sys.stderr)
+        return 0
+    info = graph.assets.get(args.asset)
+    if info is None: print(f"Unknown asset: {args.asset}", file=sys.stderr); return 1
+    report = {'name': info.name, 'kind': info.kind, 'yy_path': os.path.relpath(info.yy_path, project_root), 'inheritance': graph.inheritance_chain(info.name),
+              'children': sorted(graph.children.get(info.name, ())), 'references': list(info.refs), 'used_by': graph.users_of(info.name),
+              'rooms': graph.users_of(info.name, "Rooms"), 'depends_on': graph.dependency_order(graph.dependencies([info.name]) - {info.name})}
+    if args.json: json.dump(report, sys.stdout, indent=2); print(); return 0
+    print(f"{info.name} ({info.kind}) {report['yy_path']}")
+    print(f"Inheritance: {' -> '.join(report['inheritance'])}")
+    for label, key in (("Children", 'children'), ("References", 'references'), ("Used by", 'used_by'), ("Rooms using it", 'rooms'), ("Depends on (all)", 'depends_on')):
+        print(f"{label}: {', '.join(report[key]) or '(none)'}")
+    return 0
+
+def cmd_apply(args):
+    project_root = os.path.abspath(args.project)
+    if not os.path.isdir(project_root): print(f"Not a folder: {project_root}", file=sys.stderr); return 2
+    try: blob = sys.stdin.read() if args.sections == '-' else read_text(args.sections, errors='replace')
+    except OSError as e: print(f"Could not read {args.sections}: {e}", file=sys.stderr); return 2
+    blocks = parse_gml_blocks(blob)
+    if not blocks: print("No GML sections found", file=sys.stderr); return 1
+    changes, unchanged, errors = plan_gml_batch(project_root, blocks)
+    sys.stdout.write(format_gml_batch_diff(changes, unchanged, errors))
+    if changes and not args.dry_run:
+        try: apply_gml_batch(changes)
+        except (OSError, ValueError) as e: print(f"Batch not applied, no files were changed: {e}", file=sys.stderr); return 1
+        print(f"Applied {len(changes)} files", file=sys.stderr)
+    return 1 if errors else 0
+
+def cmd_rooms(args):
+    project_root = os.path.abspath(args.project)
+    if not os.path.isdir(project_root): print(f"Not a folder: {project_root}", file=sys.stderr); return 2
+    start = time.perf_counter(); table, errors = load_room_table(find_room_files(project_root))
+    room_stats = analyze_rooms(table); elapsed = time.perf_counter() - start
+    if args.json: json.dump([stats._asdict() for stats in room_stats], sys.stdout, indent=2); print()
+    else: sys.stdout.write(format_room_report(room_stats, errors, elapsed, args.top))
+    for path, error in errors if args.json else (): print(f"Could not read {path}: {error}", file=sys.stderr)
+    return 1 if errors else 0
+
+def cmd_bench_rooms(args):
+    # Synthetic rooms go through the same JSON parse, table load and analysis as project rooms
+    sources = [json.dumps(synthetic_room(f"rm_bench_{i}", args.instances, seed=i)).encode() for i in range(args.rooms)]
+    start = time.perf_counter(); rooms = [parse_yy(source) for source in sources]; parsed = time.perf_counter()
+    table = RoomInstanceTable()
+    for room in rooms: table.add_room(room)
+    timings = {'instances': len(table), 'rooms': args.rooms, 'parse_ms': (parsed - start) * 1000, 'table_ms': (time.perf_counter() - parsed) * 1000}
+    for vectorized in ((True, False) if HAVE_NUMPY else (False,)):
+        start = time.perf_counter(); analyze_rooms(table, vectorized); timings['numpy_ms' if vectorized else 'python_ms'] = (time.perf_counter() - start) * 1000
+    if args.json: json.dump(timings, sys.stdout, indent=2); print(); return 0
+    print(f"{timings['instances']} instances in {args.rooms} room(s): parse {timings['parse_ms']:.0f} ms, table {timings['table_ms']:.0f} ms, "
+          + ", ".join(f"{key[:-3]} analysis {timings[key]:.0f} ms" for key in ('numpy_ms', 'python_ms') if key in timings))
+    if not HAVE_NUMPY: print("(NumPy is not installed; only the pure-Python path was timed)")
+    return 0
+
+def cmd_bench(args):
+    phases = args.phases.split(",") if args.phases else BENCH_PHASES
+    unknown = [phase for phase in phases if phase not in BENCH_PHASES]
+    if unknown: print(f"Unknown phase(s): {', '.join(unknown)} (choose from {', '.join(BENCH_PHASES)})", file=sys.stderr); return 2
+    if args.project and not os.path.isdir(args.project): print(f"Not a folder: {args.project}", file=sys.stderr); return 2
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f: baseline = json.load(f)
+    progress = None if args.quiet else (lambda phase: print(f"  {phase}...", file=sys.stderr))
+    if args.project: results = benchmark(args.project, args.repeat, phases, progress=progress)
+    else:
+        results = benchmark(None, args.repeat, phases, keep_dir=args.keep, progress=progress, objects=args.objects, events=args.events, rooms=args.rooms,
+                            instances=args.instances, scripts=args.scripts, sprites=args.sprites, lines=args.lines, seed=args.seed)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f: json.dump(results, f, indent=2)
+    if args.json: json.dump(results, sys.stdout, indent=2); print()
+    else: print(format_results(results))
+    if baseline is None: return 0
+    lines, regressions = compare_results(baseline, results, args.threshold)
+    print(f"\nCompared with {args.compare} ({baseline.get('created', 'unknown date')}):", file=sys.stderr if args.json else sys.stdout)
+    print("\n".join(lines), file=sys.stderr if args.json else sys.stdout)
+    return 1 if regressions else 0
+
+def cmd_gui(args):
+    from vibe2gml_01_alpha import main as gui_main # Deferred: the only place PyQt6 gets imported
+    sys.argv = sys.argv[:1]
+    gui_main()
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="vibe2gml", description="Export GameMaker Studio 2 project GML and YY data for LLMs.")
+    parser.add_argument("--trace", metavar="FILE", help="Record performance timings and save them as a Chrome trace (chrome://tracing, ui.perfetto.dev)")
+    sub = parser.add_subparsers(dest="command")
+    export_p = sub.add_parser("export", help="Export all GML and YY data of one or more projects")
+    export_p.add_argument("projects", nargs="+", metavar="project", help="GMS2 project folder(s)")
+    export_p.add_argument("-o", "--output", help="Output .txt file, or a folder (default: <project>_export.txt in the current folder)")
+    export_p.add_argument("--changes", action="store_true", help="Only export sections added, changed or removed since the last export")
+    export_p.add_argument("--chunk-tokens", type=int, metavar="N", help="Split the export into files of at most ~N tokens")
+    export_p.add_argument("--compact-yy", action="store_true", help="Write .yy data as compact JSON without GMS2 defaults")
+    export_p.add_argument("--asset", action="append", metavar="NAME", help="Only export this asset and everything it depends on, dependencies first (repeatable)")
+    export_p.add_argument("--no-cache", action="store_true", help="Don't read or update the export cache")
+    export_p.add_argument("--rescan", action="store_true", help="Ignore the cached scan index")
+    export_p.add_argument("-q", "--quiet", action="store_true")
+    export_p.set_defaults(func=cmd_export)
+    scan_p = sub.add_parser("scan", help="List the GML files of a project")
+    scan_p.add_argument("project")
+    scan_p.add_argument("--json", action="store_true", help="Print the GML details as JSON")
+    scan_p.add_argument("--rescan", action="store_true", help="Ignore the cached scan index")
+    scan_p.set_defaults(func=cmd_scan)
+    search_p = sub.add_parser("search", help="Find text or identifiers in a project's GML")
+    search_p.add_argument("project"); search_p.add_argument("query")
+    search_p.add_argument("--identifier", action="store_true", help="Match whole identifiers only (case-sensitive)")
+    search_p.add_argument("--limit", type=int, default=SEARCH_MAX_RESULTS)
+    search_p.add_argument("--rescan", action="store_true", help="Ignore the cached scan and search indexes")
+    search_p.set_defaults(func=cmd_search)
+    deps_p = sub.add_parser("deps", help="Dependencies of an asset, or the project's unused assets")
+    deps_p.add_argument("project"); deps_p.add_argument("asset", nargs="?", help="Asset name (default: list unused assets)")
+    deps_p.add_argument("--json", action="store_true")
+    deps_p.add_argument("--rescan", action="store_true", help="Ignore the cached scan, search and dependency data")
+    deps_p.set_defaults(func=cmd_deps)
+    apply_p = sub.add_parser("apply", help="Write GML sections framed like an export (e.g. an LLM answer) as one atomic batch")
+    apply_p.add_argument("project"); apply_p.add_argument("sections", help="Text file with the sections, or - for stdin")
+    apply_p.add_argument("--dry-run", action="store_true", help="Only print the diff")
+    apply_p.set_defaults(func=cmd_apply)
+    rooms_p = sub.add_parser("rooms", help="Instance statistics of every room, heaviest rooms first")
+    rooms_p.add_argument("project")
+    rooms_p.add_argument("--json", action="store_true", help="Print the statistics as JSON")
+    rooms_p.add_argument("--top", type=int, metavar="N", help="Only show the N heaviest rooms")
+    rooms_p.set_defaults(func=cmd_rooms)
+    bench_rooms_p = sub.add_parser("bench-rooms", help="Time the room analytics on synthetic rooms")
+    bench_rooms_p.add_argument("--instances", type=int, default=50000, help="Instances per room (default: 50000)")
+    bench_rooms_p.add_argument("--rooms", type=int, default=1)
+    bench_rooms_p.add_argument("--json", action="store_true", help="Print the timings as JSON")
+    bench_rooms_p.set_defaults(func=cmd_bench_rooms)
+    bench_p = sub.add_parser("bench", help="Time scanning, .yy parsing and export on a generated (or existing) project")
+    bench_p.add_argument("--project", help="Benchmark this project instead of a generated one (it is only read)")
+    bench_p.add_argument("--objects", type=int, default=200, help="Generated objects (default: 200)")
+    bench_p.add_argument("--events", type=int, default=4, help="Events per object (default: 4)")
+    bench_p.add_argument("--rooms", type=int, default=10, help="Generated rooms (default: 10)")
+    bench_p.add_argument("--instances", type=int, default=500, help="Instances per room (default: 500)")
+    bench_p.add_argument("--scripts", type=int, default=50); bench_p.add_argument("--sprites", type=int, default=20)
+    bench_p.add_argument("--lines", type=int, default=40, help="GML lines per event (default: 40)")
+    bench_p.add_argument("--seed", type=int, default=0)
+    bench_p.add_argument("--keep", metavar="DIR", help="Generate the project into DIR and keep it")
+    bench_p.add_argument("--phases", help=f"Comma-separated phases to run (default: all of {','.join(BENCH_PHASES)})")
+    bench_p.add_argument("--repeat", type=int, default=3, help="Timed runs per phase; the best is reported (default: 3)")
+    bench_p.add_argument("-o", "--output", help="Save the results as JSON")
+    bench_p.add_argument("--compare", metavar="BASELINE", help="Results JSON of an earlier run; exits with 1 if a phase regressed")
+    bench_p.add_argument("--threshold", type=float, default=BENCH_REGRESSION_THRESHOLD, help="Slowdown counted as a regression (default: 0.10)")
+    bench_p.add_argument("--json", action="store_true", help="Print the results as JSON")
+    bench_p.add_argument("-q", "--quiet", action="store_true")
+    bench_p.set_defaults(func=cmd_bench)
+    sub.add_parser("gui", help="Start the GUI (default)").set_defaults(func=cmd_gui)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if getattr(args, 'changes', False) and args.no_cache: print("--changes needs the export cache", file=sys.stderr); return 2
+    if getattr(args, 'changes', False) and args.asset: print("--changes can't be combined with --asset", file=sys.stderr); return 2
+    if args.trace: perf.enable()
+    try: return cmd_gui(args) if args.command is None else args.func(args)
+    finally:
+        if args.trace:
+            perf.save_chrome_trace(args.trace)
+            print(f"{perf.format_summary()}\nTrace saved to {args.trace}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
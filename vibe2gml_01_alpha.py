@@ -1,30 +1,689 @@
 import sys
 import os
 import json # Used for Room/Object parsing
-import re # Used for cleaning JSON
-from collections import Counter # Used for Room instance counting
+import re # Used for GML highlighting
+import time
+from collections import OrderedDict # Used for the sprite image and document caches
+from concurrent.futures import ThreadPoolExecutor
 
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QPushButton, QTextEdit, QFileDialog, QTreeView, QMessageBox,
-    QSplitter, QSizePolicy, QInputDialog, QMenu, QLabel, QStackedWidget
+    QPushButton, QPlainTextEdit, QFileDialog, QTreeView, QMessageBox,
+    QSplitter, QSizePolicy, QInputDialog, QMenu, QLabel, QStackedWidget, QSlider,
+    QLineEdit, QCheckBox, QListWidget, QListWidgetItem, QPlainTextDocumentLayout, QDialog, QDialogButtonBox, QDockWidget
+)
+from PyQt6.QtGui import (
+    QAction, QFont, QIcon, QPixmap, QImage, QImageReader, QTextCursor, QTextDocument,
+    QSyntaxHighlighter, QTextCharFormat, QColor
+)
+from PyQt6.QtCore import Qt, QModelIndex, QPoint, QSize, QObject, QThread, pyqtSignal, QAbstractItemModel, QFileSystemWatcher, QTimer
+
+from vibe2gml_core import (
+    ASSET_CATEGORIES, ScanIndex, scan_project, get_asset_kind, load_yy, yy_ref_name, count_room_instances, sprite_frames, GmlSearchIndex, read_text,
+    ExportCache, ExportCancelled, build_export_plan, estimate_tokens, measure_export_plan, export_project, SEARCH_MAX_RESULTS,
+    find_room_files, load_room_table, analyze_rooms, format_room_report, AssetGraph,
+    parse_gml_blocks, plan_gml_batch, apply_gml_batch, format_gml_batch_diff, write_text_atomic, perf
 )
-from PyQt6.QtGui import QStandardItemModel, QStandardItem, QAction, QFont, QIcon, QPixmap
-from PyQt6.QtCore import Qt, QModelIndex, QPoint, QSize
 
 # Define custom roles for storing data with tree items
 GML_FILE_PATH_ROLE = Qt.ItemDataRole.UserRole
 ASSET_FOLDER_PATH_ROLE = Qt.ItemDataRole.UserRole + 1
-ITEM_TYPE_ROLE = Qt.ItemDataRole.UserRole + 2 # 'file', 'folder', 'room_folder', 'sprite_folder', 'object_folder' <<<< ADDED object_folder
+ITEM_TYPE_ROLE = Qt.ItemDataRole.UserRole + 2 # 'file', 'folder', 'room_folder', 'sprite_folder', 'object_folder'
+
+WATCH_MAX_FOLDERS = 1000 # Above this, poll folder mtimes instead of using OS watches (inotify/kqueue limits)
+WATCH_POLL_INTERVAL_MS = 2000
+EXPORT_PROGRESS_INTERVAL = 0.1 # Seconds between export progress signals
+DEFAULT_CHUNK_TOKENS = 100000
+WATCH_DEBOUNCE_MS = 400 # GMS2 saves touch several files at once; wait for the burst to settle
+SPRITE_CACHE_MAX_BYTES = 64 * 1024 * 1024 # Decoded, viewer-sized sprite frames kept in memory
+SPRITE_DECODE_WORKERS = 2
+SPRITE_PREFETCH_NEIGHBOURS = 2 # Sprites above and below the selected one whose first frame is decoded ahead
+SPRITE_PLAY_AHEAD = 8 # Frames decoded ahead of the one on screen
+SEARCH_DEBOUNCE_MS = 150 # Search as you type, once typing pauses
+EDITOR_DOC_CACHE_SIZE = 16 # Recently opened GML documents kept laid out and highlighted
+EDITOR_DOC_CACHE_MAX_CHARS = 32 * 1024 * 1024
+EDITOR_LAZY_LOAD_CHARS = 512 * 1024 # Bigger files are shown from their first lines and filled in from a timer
+EDITOR_LOAD_CHUNK_CHARS = 64 * 1024 # Per timer tick, cut at a line break
+EDITOR_HIGHLIGHT_BATCH_BLOCKS = 500 # Lines coloured per timer tick; smaller files are coloured at once
+PERF_REFRESH_MS = 1000 # Performance panel / status readout refresh while recording
+PERF_STATUS_CATEGORIES = ("click", "scan", "export", "image") # Latest span of each shown in the status bar
+
+
+# <<<< ---- Lazy Project Tree Model ---- >>>>
+class ProjectTreeNode:
+    """One row of the project tree. Kept small on purpose: a large project has tens of thousands of them."""
+    __slots__ = ('text', 'item_type', 'path', 'parent', 'row', 'children', 'fetched')
+
+    def __init__(self, text, item_type, path, parent):
+        self.text = text; self.item_type = item_type # item_type is None for category rows
+        self.path = path # GML file path for 'file' rows, asset folder path for folder rows
+        self.parent = parent; self.row = len(parent.children) if parent is not None and parent.children else 0
+        self.children = None # Created on first child; leaves stay list-free
+        self.fetched = None # Children exposed to the view; None until the view first expands this node
+
+class ProjectTreeModel(QAbstractItemModel):
+    """Read-only project tree that only exposes a node's children once the view expands it (canFetchMore/fetchMore).
+
+    Serves the same roles QStandardItem used to store: DisplayRole, ToolTipRole (project-relative path),
+    GML_FILE_PATH_ROLE, ASSET_FOLDER_PATH_ROLE and ITEM_TYPE_ROLE.
+
+    The scan still creates every node record up front, because watcher patches, selection exports, search
+    reveal and file creation all work on them. fetchMore defers the view side instead: the rows, indexes
+    and layout a collapsed category never needs. A record is a few slots, so 55k rows cost about 6 MB and
+    70 ms to build.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.project_root = None; self._bold_font = QFont(); self._bold_font.setBold(True)
+        self._root = ProjectTreeNode("", None, None, None); self._root.fetched = 0
+        self._indicators_stale = False
+
+    def clear(self, project_root=None):
+        self.beginResetModel()
+        self.project_root = project_root; self._root = ProjectTreeNode("", None, None, None); self._root.fetched = 0
+        self.endResetModel()
+
+    @property
+    def root(self):
+        return self._root
+
+    def add_child(self, parent_node, text, item_type=None, path=None, row=None):
+        """Appends (or inserts at row) a node. Visible straight away if the parent is expanded, otherwise held until fetchMore."""
+        node = ProjectTreeNode(text, item_type, path, parent_node)
+        if parent_node.children is None: parent_node.children = []
+        children = parent_node.children
+        if row is None or row >= len(children): row = len(children)
+        if parent_node.fetched is not None and row <= parent_node.fetched:
+            self.beginInsertRows(self.index_for_node(parent_node), row, row)
+            children.insert(row, node); parent_node.fetched += 1; self._renumber(parent_node, row)
+            self.endInsertRows()
+        else:
+            children.insert(row, node); self._renumber(parent_node, row)
+            if len(children) == 1: self._indicators_stale = True # View has cached this row as childless
+        return node
+
+    def remove_child(self, node):
+        parent_node = node.parent; row = node.row
+        if parent_node.fetched is not None and row < parent_node.fetched:
+            self.beginRemoveRows(self.index_for_node(parent_node), row, row)
+            del parent_node.children[row]; parent_node.fetched -= 1; self._renumber(parent_node, row)
+            self.endRemoveRows()
+        else:
+            del parent_node.children[row]; self._renumber(parent_node, row)
+
+    @staticmethod
+    def _renumber(parent_node, start):
+        children = parent_node.children
+        for row in range(start, len(children)): children[row].row = row
+
+    def refresh_child_indicators(self):
+        """Lets the view re-query hasChildren() for rows that gained their first (still unfetched) child."""
+        if not self._indicators_stale: return
+        self._indicators_stale = False
+        self.layoutAboutToBeChanged.emit(); self.layoutChanged.emit()
+
+    def node_from_index(self, index):
+        return index.internalPointer() if index.isValid() else self._root
+
+    def index_for_node(self, node):
+        if node is self._root or node is None: return QModelIndex()
+        parent = node.parent
+        if parent.fetched is None or node.row >= parent.fetched: return QModelIndex() # Not exposed to the view yet
+        return self.createIndex(node.row, 0, node)
+
+    # --- QAbstractItemModel interface ---
+    def index(self, row, column, parent=QModelIndex()):
+        node = self.node_from_index(parent)
+        if column != 0 or row < 0 or row >= (node.fetched or 0): return QModelIndex()
+        return self.createIndex(row, 0, node.children[row])
+
+    def parent(self, index=None):
+        if index is None: return super().parent() # QObject.parent()
+        if not index.isValid(): return QModelIndex()
+        return self.index_for_node(index.internalPointer().parent)
+
+    def rowCount(self, parent=QModelIndex()):
+        return self.node_from_index(parent).fetched or 0
+
+    def columnCount(self, parent=QModelIndex()):
+        return 1
+
+    def hasChildren(self, parent=QModelIndex()):
+        return bool(self.node_from_index(parent).children)
+
+    def canFetchMore(self, parent):
+        node = self.node_from_index(parent)
+        return bool(node.children) and (node.fetched or 0) < len(node.children)
+
+    def fetchMore(self, parent):
+        node = self.node_from_index(parent); start = node.fetched or 0; end = len(node.children or ())
+        if end <= start: return
+        self.beginInsertRows(parent, start, end - 1); node.fetched = end; self.endInsertRows()
+
+    def flags(self, index):
+        return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable if index.isValid() else Qt.ItemFlag.NoItemFlags
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid(): return None
+        node = index.internalPointer()
+        if role == Qt.ItemDataRole.DisplayRole: return node.text
+        if role == ITEM_TYPE_ROLE: return node.item_type
+        if role == GML_FILE_PATH_ROLE: return node.path if node.item_type == "file" else None
+        if role == ASSET_FOLDER_PATH_ROLE: return node.path if node.item_type not in (None, "file") else None
+        if role == Qt.ItemDataRole.ToolTipRole: return os.path.relpath(node.path, self.project_root) if node.path and self.project_root else None
+        if role == Qt.ItemDataRole.FontRole and node.item_type is None: return self._bold_font
+        return None
+# <<<< ---- END Lazy Project Tree Model ---- >>>>
+
+
+# <<<< ---- Project Watcher ---- >>>>
+class ProjectWatcher(QObject):
+    """Reports changed project folders, debounced, plus changes to the one GML file open in the editor.
+
+    Uses QFileSystemWatcher, or polls folder mtimes when there are more folders than OS watch limits allow.
+    """
+    folders_changed = pyqtSignal(list) # Folder paths whose entries changed
+    file_changed = pyqtSignal(str) # The watched file was modified, replaced or deleted
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.polling = False; self._folders = {} # {folder_path: mtime_ns} (mtimes only used when polling)
+        self._file_path = None; self._file_mtime = None
+        self._pending_folders = set(); self._pending_file = False
+        self._own_writes = {} # {folder_path: set of entry names} right after the app itself wrote into the folder
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.directoryChanged.connect(self._on_folder_changed); self._watcher.fileChanged.connect(self._on_file_changed)
+        self._poll_timer = QTimer(self); self._poll_timer.setInterval(WATCH_POLL_INTERVAL_MS); self._poll_timer.timeout.connect(self._poll)
+        self._debounce_timer = QTimer(self); self._debounce_timer.setSingleShot(True); self._debounce_timer.setInterval(WATCH_DEBOUNCE_MS); self._debounce_timer.timeout.connect(self._flush)
+
+    def stop(self):
+        self._poll_timer.stop(); self._debounce_timer.stop()
+        watched = self._watcher.directories() + self._watcher.files()
+        if watched: self._watcher.removePaths(watched)
+        self._folders.clear(); self._pending_folders.clear(); self._pending_file = False; self._file_path = None; self._own_writes.clear()
+
+    def watch_folders(self, folder_paths):
+        """Replaces the watched folder set, choosing OS watches or polling based on its size."""
+        file_path = self._file_path; self.stop()
+        self.polling = len(folder_paths) > WATCH_MAX_FOLDERS
+        if not self.polling:
+            failed = self._watcher.addPaths(folder_paths)
+            if failed: self._watcher.removePaths(self._watcher.directories()); self.polling = True # Hit the OS limit anyway
+        self._folders = {path: self._stat_mtime(path) for path in folder_paths} if self.polling else dict.fromkeys(folder_paths)
+        if self.polling: self._poll_timer.start()
+        self.watch_file(file_path)
+
+    def add_folder(self, folder_path):
+        if folder_path in self._folders: return
+        if self.polling: self._folders[folder_path] = self._stat_mtime(folder_path)
+        else: self._folders[folder_path] = None; self._watcher.addPath(folder_path)
+
+    def remove_folder(self, folder_path):
+        if folder_path not in self._folders: return
+        del self._folders[folder_path]
+        if not self.polling: self._watcher.removePath(folder_path)
+
+    def watch_file(self, file_path):
+        if self._file_path and not self.polling and self._file_path in self._watcher.files(): self._watcher.removePath(self._file_path)
+        self._file_path = file_path; self._file_mtime = self._stat_mtime(file_path) if file_path else None
+        if file_path and not self.polling and os.path.isfile(file_path): self._watcher.addPath(file_path)
+
+    def note_own_writes(self, file_paths):
+        """Call after the app writes files itself: their folders' change events then aren't reported, unless their entries changed again since."""
+        for folder_path in {os.path.dirname(path) for path in file_paths}: self._own_writes[folder_path] = self._list_entries(folder_path)
+
+    @staticmethod
+    def _list_entries(folder_path):
+        # Entries, not mtimes: coarse mtimes can't tell our write from another one in the same tick
+        try: return set(os.listdir(folder_path))
+        except OSError: return None
+
+    @staticmethod
+    def _stat_mtime(path):
+        try: return os.stat(path).st_mtime_ns
+        except OSError: return None
+
+    def _on_folder_changed(self, folder_path):
+        self._pending_folders.add(folder_path); self._debounce_timer.start()
+
+    def _on_file_changed(self, file_path):
+        if file_path == self._file_path: self._pending_file = True; self._debounce_timer.start()
+
+    def _poll(self):
+        changed = False # Only new changes restart the debounce, or a poll interval under it would postpone the flush forever
+        for folder_path, mtime in self._folders.items():
+            new_mtime = self._stat_mtime(folder_path)
+            if new_mtime != mtime: self._folders[folder_path] = new_mtime; self._pending_folders.add(folder_path); changed = True
+        if self._file_path and not self._pending_file and self._stat_mtime(self._file_path) != self._file_mtime: self._pending_file = True; changed = True
+        if changed: self._debounce_timer.start()
+
+    def _flush(self):
+        for folder_path in [path for path in self._pending_folders if path in self._own_writes]:
+            if self._own_writes.pop(folder_path) == self._list_entries(folder_path): self._pending_folders.discard(folder_path) # Only our own write since
+        if self._pending_folders:
+            folders = sorted(self._pending_folders); self._pending_folders.clear() # Parents sort before their children
+            self.folders_changed.emit(folders)
+        if self._pending_file:
+            self._pending_file = False; file_path = self._file_path
+            self._file_mtime = self._stat_mtime(file_path)
+            # Editors and GMS2 often save by replacing the file, which drops the OS watch; re-add it
+            if not self.polling and file_path and os.path.isfile(file_path) and file_path not in self._watcher.files(): self._watcher.addPath(file_path)
+            self.file_changed.emit(file_path)
+# <<<< ---- END Project Watcher ---- >>>>
+
+
+# <<<< ---- Background Export ---- >>>>
+class ExportWorker(QObject):
+    """Runs export_project on a QThread, reporting progress at most every EXPORT_PROGRESS_INTERVAL seconds."""
+    progress = pyqtSignal(int, int) # sections written, total sections
+    finished = pyqtSignal(str, str, bool) # save_path, error message ('' on success), cancelled
+
+    def __init__(self, project_root, gml_details, save_path, delta=False, chunk_tokens=None, partial=False, yy_compact=False, asset_order=None):
+        super().__init__()
+        self.yy_compact = yy_compact; self.asset_order = asset_order
+        self.project_root = project_root; self.gml_details = gml_details; self.save_path = save_path; self.delta = delta
+        self.chunk_tokens = chunk_tokens; self.partial = partial # Partial (selection) exports don't move the delta baseline
+        self.result = None; self._cancelled = False; self._last_progress = 0.0
+
+    def cancel(self):
+        self._cancelled = True
+
+    def _report(self, done, total):
+        now = time.monotonic()
+        if done == total or now - self._last_progress >= EXPORT_PROGRESS_INTERVAL: self._last_progress = now; self.progress.emit(done, total)
+
+    def run(self):
+        cache = ExportCache(self.project_root) # Opened here: the SQLite connection must stay on this thread
+        try:
+            cache.open()
+            self.result = export_project(self.project_root, self.gml_details, self.save_path, progress=self._report, is_cancelled=lambda: self._cancelled, cache=cache, delta=self.delta, chunk_tokens=self.chunk_tokens, update_cache=not self.partial, yy_compact=self.yy_compact, asset_order=self.asset_order)
+            self.finished.emit(self.save_path, "", False)
+        except ExportCancelled: self.finished.emit(self.save_path, "", True)
+        except Exception as write_err: self.finished.emit(self.save_path, str(write_err), False)
+        finally: cache.close()
+# <<<< ---- END Background Export ---- >>>>
+
+
+# <<<< ---- Background Project Scanner ---- >>>>
+class ProjectScanWorker(QObject):
+    """Runs scan_project on a QThread and streams assets and GML files back in batches."""
+    assets_found = pyqtSignal(int, str, list) # scan_id, category display name, [(asset_display_name, asset_folder_path, item_type)]
+    gml_batch_found = pyqtSignal(int, list) # scan_id, [(parent_dir or None, gml_display_name, file_path, relative_path, asset_yy_path)]
+    progress = pyqtSignal(int, int, int) # scan_id, folders scanned, GML files found
+    finished = pyqtSignal(int, bool) # scan_id, cancelled
+
+    def __init__(self, scan_id, folder_path, index=None):
+        super().__init__()
+        self.scan_id = scan_id; self.folder_path = folder_path
+        self.index = index # ScanIndex; loaded from disk inside run() when not supplied
+        self.details = None # Sorted GML details once the scan completes
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True # Checked between directories, so cancellation is near-immediate
+
+    def run(self):
+        if self.index is None: self.index = ScanIndex(self.folder_path); self.index.load()
+        self.details = scan_project(self.folder_path, self.index, on_assets=lambda display_name, assets: self.assets_found.emit(self.scan_id, display_name, assets),
+                                    on_gml_batch=lambda batch: self.gml_batch_found.emit(self.scan_id, batch),
+                                    on_progress=lambda dirs_scanned, gml_found: self.progress.emit(self.scan_id, dirs_scanned, gml_found),
+                                    is_cancelled=lambda: self._cancelled)
+        self.finished.emit(self.scan_id, self.details is None)
+# <<<< ---- END Background Project Scanner ---- >>>>
+
+
+# <<<< ---- Background Search Indexing ---- >>>>
+class SearchIndexWorker(QObject):
+    """Builds a GmlSearchIndex on a QThread, reusing the texts it kept on disk for unchanged files."""
+    finished = pyqtSignal(int, bool) # scan_id, cancelled
+
+    def __init__(self, scan_id, project_root, gml_details):
+        super().__init__()
+        self.scan_id = scan_id; self.index = GmlSearchIndex(project_root); self.gml_details = gml_details
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def run(self):
+        self.index.load()
+        if not self.index.build(self.gml_details, is_cancelled=lambda: self._cancelled): self.finished.emit(self.scan_id, True); return
+        self.index.save()
+        self.finished.emit(self.scan_id, False)
+# <<<< ---- END Background Search Indexing ---- >>>>
+
+
+# <<<< ---- Background Asset Graph ---- >>>>
+class AssetGraphWorker(QObject):
+    """Builds the project's AssetGraph on a QThread, parsing only the .yy files that changed since it was last saved."""
+    finished = pyqtSignal(int, bool) # scan_id, cancelled
+
+    def __init__(self, scan_id, project_root):
+        super().__init__()
+        self.scan_id = scan_id; self.graph = AssetGraph(project_root)
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def run(self):
+        self.graph.load()
+        if not self.graph.build(is_cancelled=lambda: self._cancelled): self.finished.emit(self.scan_id, True); return
+        self.graph.save()
+        self.finished.emit(self.scan_id, False)
+# <<<< ---- END Background Asset Graph ---- >>>>
+
+
+# <<<< ---- Background Room Analytics ---- >>>>
+class RoomAnalyticsWorker(QObject):
+    """Loads every room of a project into one RoomInstanceTable on a QThread and analyzes them together."""
+    finished = pyqtSignal(int, str) # scan_id, report ("" if cancelled)
+
+    def __init__(self, scan_id, project_root):
+        super().__init__()
+        self.scan_id = scan_id; self.project_root = project_root
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def run(self):
+        start = time.perf_counter(); loaded = load_room_table(find_room_files(self.project_root), is_cancelled=lambda: self._cancelled)
+        if loaded is None: self.finished.emit(self.scan_id, ""); return
+        table, errors = loaded
+        self.finished.emit(self.scan_id, format_room_report(analyze_rooms(table), errors, time.perf_counter() - start))
+# <<<< ---- END Background Room Analytics ---- >>>>
+
+
+# <<<< ---- Sprite Image Loader ---- >>>>
+class SpriteImageLoader(QObject):
+    """Decodes and scales sprite frames on worker threads into an LRU of QImages bounded by SPRITE_CACHE_MAX_BYTES.
+
+    Results come back through signals on the GUI thread; nothing here blocks on a decode. Requests made for
+    an earlier selection (see begin()) are dropped before they start if they are still queued.
+    """
+    image_ready = pyqtSignal(str) # frame path; cached(path) now returns it, or failed(path) is True
+    frames_ready = pyqtSignal(str, list, float, str) # sprite folder, frame paths, fps, error message ('' on success)
+    _decoded = pyqtSignal(object, object, object, object) # key, QImage or None, source QSize, generation
+    _listed = pyqtSignal(str, list, float, str)
+
+    def __init__(self, parent=None, max_bytes=SPRITE_CACHE_MAX_BYTES):
+        super().__init__(parent)
+        self.max_bytes = max_bytes; self.target = QSize(256, 256)
+        self._images = OrderedDict(); self._bytes = 0 # {(path, width, height): (QImage, source QSize)}
+        self._frames = {}; self._failed = set(); self._pending = {}; self._generation = 0 # _pending: {key: generation of its queued decode}
+        self._pool = ThreadPoolExecutor(max_workers=SPRITE_DECODE_WORKERS, thread_name_prefix="sprite")
+        self._decoded.connect(self._on_decoded); self._listed.connect(self._on_listed)
+
+    def begin(self, target):
+        """Starts a new selection: queued work for earlier selections is skipped, and images are scaled to fit target."""
+        self._generation += 1; self.target = QSize(max(target.width(), 1), max(target.height(), 1))
+
+    def _key(self, path):
+        return (path, self.target.width(), self.target.height())
+
+    def cached(self, path):
+        """Returns (scaled QImage, source QSize) for an already decoded frame, or None."""
+        entry = self._images.get(self._key(path))
+        if entry is not None: self._images.move_to_end(self._key(path))
+        return entry
+
+    def failed(self, path):
+        return path in self._failed
+
+    def frames(self, sprite_folder_path):
+        """Returns the (frame paths, fps) listed earlier for a sprite folder, or None."""
+        return self._frames.get(sprite_folder_path)
+
+    def request(self, path):
+        key = self._key(path)
+        if key in self._images or self._pending.get(key) == self._generation or path in self._failed: return
+        self._pending[key] = self._generation; self._pool.submit(self._decode, key, self._generation) # A stale queued decode is skipped, so queue again
+
+    def request_frames(self, sprite_folder_path, sprite_name, first_frame=False):
+        """Lists a sprite's frames in the background (frames_ready), optionally decoding its first frame as well."""
+        if sprite_folder_path in self._frames:
+            if first_frame and self._frames[sprite_folder_path][0]: self.request(self._frames[sprite_folder_path][0][0])
+            return
+        self._pool.submit(self._list, sprite_folder_path, sprite_name, first_frame, self.target, self._generation)
+
+    def invalidate(self, sprite_folder_path):
+        """Forgets frame lists and images of a sprite folder that changed on disk."""
+        self._frames.pop(sprite_folder_path, None); prefix = os.path.join(sprite_folder_path, "")
+        self._failed = {path for path in self._failed if not path.startswith(prefix)}
+        for key in [key for key in self._images if key[0].startswith(prefix)]: self._bytes -= self._images.pop(key)[0].sizeInBytes()
+
+    def clear(self):
+        self._generation += 1; self._images.clear(); self._bytes = 0; self._frames.clear(); self._failed.clear()
+
+    def shutdown(self):
+        self._generation += 1; self._pool.shutdown(wait=False, cancel_futures=True)
+
+    # Worker thread side
+    def _decode_image(self, key):
+        with perf.span("image.decode"): reader = QImageReader(key[0]); source_size = reader.size(); image = reader.read()
+        if image.isNull(): return None, source_size
+        with perf.span("image.scale"):
+            if image.width() > key[1] or image.height() > key[2]: # Fit to the viewer once, here, instead of on every display
+                image = image.scaled(key[1], key[2], Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
+            return image.convertToFormat(QImage.Format.Format_ARGB32_Premultiplied), source_size # Premultiplied: the fastest format to paint
+
+    def _decode(self, key, generation):
+        if generation != self._generation: self._decoded.emit(key, None, None, generation); return # Stale: dropped unread
+        image, source_size = self._decode_image(key)
+        self._decoded.emit(key, image, source_size, generation)
+
+    def _list(self, sprite_folder_path, sprite_name, first_frame, target, generation):
+        if generation != self._generation: return
+        try: paths, fps = sprite_frames(sprite_folder_path, sprite_name)
+        except OSError as e: self._listed.emit(sprite_folder_path, [], 0.0, str(e)); return
+        self._listed.emit(sprite_folder_path, paths, fps, "")
+        if first_frame and paths: # Decoded in the same task so a prefetch costs one queue slot
+            key = (paths[0], target.width(), target.height()); image, source_size = self._decode_image(key)
+            self._decoded.emit(key, image, source_size, generation)
+
+    # GUI thread side
+    def _on_decoded(self, key, image, source_size, generation):
+        if self._pending.get(key) == generation: del self._pending[key]
+        if source_size is None: return # Skipped stale request
+        if image is None: self._failed.add(key[0])
+        elif key not in self._images:
+            self._images[key] = (image, source_size); self._bytes += image.sizeInBytes()
+            while self._bytes > self.max_bytes and len(self._images) > 1: self._bytes -= self._images.popitem(last=False)[1][0].sizeInBytes()
+        self.image_ready.emit(key[0])
+
+    def _on_listed(self, sprite_folder_path, paths, fps, error):
+        if not error: self._frames[sprite_folder_path] = (paths, fps)
+        self.frames_ready.emit(sprite_folder_path, paths, fps, error)
+# <<<< ---- END Sprite Image Loader ---- >>>>
+
+
+# <<<< ---- GML Editor Documents ---- >>>>
+GML_KEYWORDS = {"var", "globalvar", "if", "then", "else", "while", "do", "until", "for", "repeat", "switch", "case", "default", "break", "continue",
+                "return", "exit", "with", "function", "constructor", "new", "delete", "static", "enum", "try", "catch", "finally", "throw",
+                "and", "or", "not", "xor", "div", "mod", "begin", "end"}
+GML_CONSTANTS = {"true", "false", "undefined", "noone", "self", "other", "all", "global", "pi", "infinity", "NaN"}
+GML_TOKEN_RE = re.compile(r'(?P<comment>//.*)|(?P<block_comment>/\*)|(?P<string>@"[^"]*"?|@\'[^\']*\'?|"(?:[^"\\]|\\.)*"?|\'(?:[^\'\\]|\\.)*\'?)'
+                          r'|(?P<number>\$[0-9A-Fa-f]+|0x[0-9A-Fa-f]+|\d+(?:\.\d*)?|\.\d+)|(?P<macro>#\w+)|(?P<word>[A-Za-z_]\w*)(?P<call>\s*\()?')
+
+class GmlHighlighter(QSyntaxHighlighter):
+    """GML syntax colouring. Qt only calls highlightBlock for edited blocks (and the ones after them while a /* */ comment
+    state changes); blocks past highlight_limit are left plain until extend() reaches them, so a big file is coloured
+    a batch at a time from a timer instead of all at once when it is opened.
+    """
+    IN_BLOCK_COMMENT = 1
+
+    def __init__(self, document):
+        self.highlight_limit = EDITOR_HIGHLIGHT_BATCH_BLOCKS * 4 - 1 # Covers the first screens (and whole small files) right away
+        super().__init__(document)
+        def char_format(color, bold=False, italic=False):
+            fmt = QTextCharFormat(); fmt.setForeground(QColor(color))
+            if bold: fmt.setFontWeight(QFont.Weight.Bold)
+            if italic: fmt.setFontItalic(True)
+            return fmt
+        self.formats = {'comment': char_format("#3f7f3f", italic=True), 'string': char_format("#a31515"), 'number': char_format("#098658"),
+                        'macro': char_format("#795e26"), 'keyword': char_format("#0000ff", bold=True), 'constant': char_format("#0070c1"),
+                        'call': char_format("#795e26"), 'upper': char_format("#6f008a")}
+
+    def highlightBlock(self, text):
+        if self.currentBlock().blockNumber() > self.highlight_limit: return # Block state stays -1 until extend() gets here
+        formats = self.formats; pos = 0; length = len(text)
+        if self.previousBlockState() == self.IN_BLOCK_COMMENT:
+            end = text.find("*/")
+            if end < 0: self.setFormat(0, length, formats['comment']); self.setCurrentBlockState(self.IN_BLOCK_COMMENT); return
+            self.setFormat(0, end + 2, formats['comment']); pos = end + 2
+        self.setCurrentBlockState(0)
+        while pos < length:
+            match = GML_TOKEN_RE.search(text, pos)
+            if match is None: break
+            kind = match.lastgroup if match.lastgroup != 'call' else 'word'; start = match.start()
+            if kind == 'block_comment':
+                end = text.find("*/", match.end())
+                if end < 0: self.setFormat(start, length - start, formats['comment']); self.setCurrentBlockState(self.IN_BLOCK_COMMENT); return
+                self.setFormat(start, end + 2 - start, formats['comment']); pos = end + 2; continue
+            if kind == 'word':
+                word = match.group('word')
+                if word in GML_KEYWORDS: kind = 'keyword'
+                elif word in GML_CONSTANTS: kind = 'constant'
+                elif match.group('call'): kind = 'call'
+                elif word.isupper() and len(word) > 1: kind = 'upper' # Macros and enum members, by convention
+                else: pos = match.end(); continue
+                self.setFormat(start, len(word), formats[kind])
+            else: self.setFormat(start, match.end() - start, formats[kind])
+            pos = max(match.end(), pos + 1)
+
+    def extend(self, count=EDITOR_HIGHLIGHT_BATCH_BLOCKS):
+        """Colours the next count blocks past highlight_limit. Returns False once the whole document is coloured."""
+        document = self.document(); last_block = document.blockCount() - 1
+        if self.highlight_limit >= last_block: return False
+        first = self.highlight_limit + 1; self.highlight_limit += count
+        self.rehighlightBlock(document.findBlockByNumber(first)) # Carries on block by block while states change from -1
+        return self.highlight_limit < last_block
+
+class GmlDocument:
+    """A GML file's QTextDocument with its highlighter. Files over EDITOR_LAZY_LOAD_CHARS start with their first
+    EDITOR_LOAD_CHUNK_CHARS of whole lines; load_more() appends the rest (the editor stays read-only until loaded).
+    """
+    def __init__(self, text, font=None):
+        self.document = QTextDocument(); self.document.setDocumentLayout(QPlainTextDocumentLayout(self.document))
+        if font is not None: self.document.setDefaultFont(font)
+        self._text = None; self._pos = 0 # Full text and offset of the part not in the document yet
+        if len(text) > EDITOR_LAZY_LOAD_CHARS: self._text = text; text = self._next_chunk()
+        self.document.setUndoRedoEnabled(False); self.document.setPlainText(text)
+        self.document.setUndoRedoEnabled(self.loaded); self.document.setModified(False)
+        self.highlighter = GmlHighlighter(self.document) # Attached after the text, so it is coloured in one (deferred) pass
+
+    @property
+    def loaded(self):
+        return self._text is None
+
+    def _next_chunk(self):
+        text = self._text; start = self._pos; end = start + EDITOR_LOAD_CHUNK_CHARS
+        cut = text.rfind('\n', start, end) if end < len(text) else -1
+        if cut < 0 and end < len(text): cut = text.find('\n', end) # One very long line
+        if cut < 0: self._text = None; return text[start:]
+        self._pos = cut + 1; return text[start:cut]
+
+    def load_more(self):
+        """Appends the next chunk of lines. Returns True once the whole file is in the document."""
+        if self._text is not None:
+            cursor = QTextCursor(self.document); cursor.movePosition(QTextCursor.MoveOperation.End); cursor.insertText('\n' + self._next_chunk())
+            if self.loaded: self.document.setUndoRedoEnabled(True) # Loading is not undoable
+            self.document.setModified(False)
+        return self.loaded
+
+    def size(self):
+        return self.document.characterCount()
+
+class GmlDocumentCache:
+    """LRU of recently opened GmlDocuments, keyed by file path and dropped when the file's mtime or size no longer match."""
+    def __init__(self, max_documents=EDITOR_DOC_CACHE_SIZE, max_chars=EDITOR_DOC_CACHE_MAX_CHARS):
+        self.max_documents = max_documents; self.max_chars = max_chars
+        self._entries = OrderedDict() # {file_path: [GmlDocument, mtime_ns, size]}
+
+    def get(self, file_path, mtime_ns, size):
+        entry = self._entries.get(file_path)
+        if entry is None: return None
+        if entry[1] != mtime_ns or entry[2] != size: del self._entries[file_path]; return None
+        self._entries.move_to_end(file_path); return entry[0]
+
+    def put(self, file_path, gml_document, mtime_ns, size):
+        self._entries[file_path] = [gml_document, mtime_ns, size]; self._entries.move_to_end(file_path)
+        total = sum(entry[0].size() for entry in self._entries.values())
+        while len(self._entries) > 1 and (len(self._entries) > self.max_documents or total > self.max_chars):
+            total -= self._entries.popitem(last=False)[1][0].size() # Never the newest, which is the one on screen
+
+    def update(self, file_path, mtime_ns, size):
+        """Records that the cached document now matches the file on disk (after a save)."""
+        entry = self._entries.get(file_path)
+        if entry is not None: entry[1] = mtime_ns; entry[2] = size
+
+    def discard(self, file_path):
+        self._entries.pop(file_path, None)
+
+    def clear(self):
+        self._entries.clear()
+# <<<< ---- END GML Editor Documents ---- >>>>
+
+
+# <<<< ---- Batch Paste Dialog ---- >>>>
+class GmlBatchDialog(QDialog):
+    """Paste GML sections framed like an export, preview them as a diff, and accept to apply them all at once."""
+    def __init__(self, project_root, text="", parent=None):
+        super().__init__(parent)
+        self.project_root = project_root; self.changes = [] # Planned BatchChanges of the last preview
+        self.setWindowTitle("Paste & Apply GML Batch"); self.resize(900, 700)
+        layout = QVBoxLayout(self); font = QFont("Courier New")
+        layout.addWidget(QLabel("Paste GML sections (\"// ----- Start GML: ... -----\" / \"// ----- GML Path: ... -----\" headers, as in an export).\nText outside sections and YY sections are ignored; missing event files are created."))
+        self.paste_edit = QPlainTextEdit(); self.paste_edit.setFont(font); self.paste_edit.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap); self.paste_edit.setPlainText(text)
+        self.paste_edit.textChanged.connect(self.invalidate); layout.addWidget(self.paste_edit, 1)
+        preview_button = QPushButton("Preview Changes"); preview_button.clicked.connect(self.preview); layout.addWidget(preview_button)
+        self.diff_view = QPlainTextEdit(); self.diff_view.setFont(font); self.diff_view.setReadOnly(True); self.diff_view.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap); layout.addWidget(self.diff_view, 2)
+        self.buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Cancel); self.apply_button = self.buttons.addButton("Apply All", QDialogButtonBox.ButtonRole.AcceptRole)
+        self.buttons.accepted.connect(self.accept); self.buttons.rejected.connect(self.reject); layout.addWidget(self.buttons)
+        if text: self.preview()
+        else: self.invalidate()
+
+    def invalidate(self):
+        self.changes = []; self.apply_button.setEnabled(False)
+
+    def preview(self):
+        blocks = parse_gml_blocks(self.paste_edit.toPlainText())
+        if not blocks: self.invalidate(); self.diff_view.setPlainText("No GML sections found."); return
+        changes, unchanged, errors = plan_gml_batch(self.project_root, blocks)
+        self.diff_view.setPlainText(format_gml_batch_diff(changes, unchanged, errors))
+        self.changes = changes; self.apply_button.setEnabled(bool(changes))
+# <<<< ---- END Batch Paste Dialog ---- >>>>
+
 
 class GmlViewerApp(QMainWindow):
     def __init__(self):
         super().__init__()
         self.project_root_path = None
         # Stores tuples: (full_display_name, gml_file_path, relative_gml_path, asset_yy_path or None)
-        self.project_gml_files_details = [] # <<<< MODIFIED to store more info
+        self.project_gml_files_details = []
         self.current_file_path = None
         self.current_display_name = None
+        self._scan_id = 0; self._scan_thread = None; self._scan_worker = None # Background scan state
+        self._scan_category_nodes = {}; self._scan_asset_nodes = {}
+        self._scan_index = None # ScanIndex of the loaded project, kept current by the watcher
+        self.current_file_mtime = None # mtime_ns of current_file_path when it was loaded/saved
+        self._export_thread = None; self._export_worker = None # Background export state
+        self._chunk_tokens = DEFAULT_CHUNK_TOKENS # Last token budget used for chunked exports
+        self.project_watcher = ProjectWatcher(self)
+        self.project_watcher.folders_changed.connect(self.on_project_folders_changed); self.project_watcher.file_changed.connect(self.on_current_file_changed_on_disk)
+        self.sprite_loader = SpriteImageLoader(self)
+        self.sprite_loader.image_ready.connect(self.on_sprite_image_ready); self.sprite_loader.frames_ready.connect(self.on_sprite_frames_ready)
+        self._sprite_folder = None; self._sprite_name = None; self._sprite_frames = []; self._sprite_frame = 0 # Displayed sprite
+        self.sprite_timer = QTimer(self); self.sprite_timer.timeout.connect(self.advance_sprite_frame)
+        self.search_index = None; self._search_thread = None; self._search_worker = None # Ready GmlSearchIndex / background build
+        self._search_pending_paths = set() # Files saved or created while the index was being built
+        self._rooms_thread = None; self._rooms_worker = None # Background room analytics
+        self.asset_graph = None; self._graph_thread = None; self._graph_worker = None # Ready AssetGraph / background build
+        self._graph_pending_folders = set() # Asset folders that changed while the graph was being built
+        self.gml_documents = GmlDocumentCache(); self._gml_doc = None # GmlDocument of current_file_path
+        self.editor_timer = QTimer(self); self.editor_timer.timeout.connect(self.continue_gml_document) # Lazy loading / highlighting
+        self.search_timer = QTimer(self); self.search_timer.setSingleShot(True); self.search_timer.setInterval(SEARCH_DEBOUNCE_MS); self.search_timer.timeout.connect(self.run_search)
         self.initUI()
 
     def initUI(self):
@@ -34,8 +693,15 @@ class GmlViewerApp(QMainWindow):
         central_widget = QWidget(); self.setCentralWidget(central_widget)
         main_layout = QHBoxLayout(central_widget)
         left_pane_widget = QWidget(); left_layout = QVBoxLayout(left_pane_widget); left_layout.setContentsMargins(0,0,0,0)
-        self.tree_view = QTreeView(); self.model = QStandardItemModel(); self.tree_view.setModel(self.model)
-        self.tree_view.setHeaderHidden(True); self.tree_view.setEditTriggers(QTreeView.EditTrigger.NoEditTriggers)
+        search_layout = QHBoxLayout()
+        self.search_edit = QLineEdit(); self.search_edit.setPlaceholderText("Search project GML..."); self.search_edit.setClearButtonEnabled(True)
+        self.search_edit.textChanged.connect(lambda: self.search_timer.start()); self.search_edit.returnPressed.connect(self.run_search); search_layout.addWidget(self.search_edit)
+        self.search_identifier_check = QCheckBox("Identifier"); self.search_identifier_check.setToolTip("Match whole identifiers only (case-sensitive)"); self.search_identifier_check.toggled.connect(self.run_search); search_layout.addWidget(self.search_identifier_check)
+        left_layout.addLayout(search_layout)
+        self.search_results = QListWidget(); self.search_results.itemActivated.connect(self.open_search_hit); self.search_results.itemClicked.connect(self.open_search_hit); self.search_results.hide()
+        left_layout.addWidget(self.search_results)
+        self.tree_view = QTreeView(); self.model = ProjectTreeModel(self); self.tree_view.setModel(self.model)
+        self.tree_view.setHeaderHidden(True); self.tree_view.setEditTriggers(QTreeView.EditTrigger.NoEditTriggers); self.tree_view.setSelectionMode(QTreeView.SelectionMode.ExtendedSelection) # Multi-select for Export Selected
         self.tree_view.clicked.connect(self.on_tree_item_clicked)
         self.tree_view.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu); self.tree_view.customContextMenuRequested.connect(self.show_tree_context_menu)
         left_layout.addWidget(self.tree_view)
@@ -44,14 +710,24 @@ class GmlViewerApp(QMainWindow):
         self.export_button = QPushButton("Export All"); self.export_button.setEnabled(False); self.export_button.clicked.connect(self.export_all_gml); button_layout.addWidget(self.export_button) # <<<< Renamed button slightly
         left_layout.addLayout(button_layout)
         self.stacked_widget = QStackedWidget()
-        self.text_edit = QTextEdit(); self.text_edit.setFontFamily("Courier New"); self.text_edit.setLineWrapMode(QTextEdit.LineWrapMode.NoWrap); self.text_edit.setReadOnly(True)
+        self.text_edit = QPlainTextEdit(); self.text_edit.setFont(QFont("Courier New")); self.text_edit.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap); self.text_edit.setReadOnly(True)
+        self.info_document = QTextDocument(self); self.info_document.setDocumentLayout(QPlainTextDocumentLayout(self.info_document)); self.info_document.setDefaultFont(self.text_edit.font()) # Room/object info and messages
+        self.text_edit.setDocument(self.info_document)
         self.stacked_widget.addWidget(self.text_edit)
         self.image_label = QLabel("Select a Sprite asset to view the image."); self.image_label.setAlignment(Qt.AlignmentFlag.AlignCenter); self.image_label.setScaledContents(False)
-        self.stacked_widget.addWidget(self.image_label)
+        sprite_page = QWidget(); sprite_layout = QVBoxLayout(sprite_page); sprite_layout.setContentsMargins(0,0,0,0); sprite_layout.addWidget(self.image_label, 1)
+        self.sprite_controls = QWidget(); controls_layout = QHBoxLayout(self.sprite_controls); controls_layout.setContentsMargins(4,0,4,4)
+        self.sprite_play_button = QPushButton("Play"); self.sprite_play_button.setCheckable(True); self.sprite_play_button.toggled.connect(self.set_sprite_playing); controls_layout.addWidget(self.sprite_play_button)
+        self.sprite_frame_slider = QSlider(Qt.Orientation.Horizontal); self.sprite_frame_slider.valueChanged.connect(self.show_sprite_frame); controls_layout.addWidget(self.sprite_frame_slider, 1)
+        self.sprite_frame_label = QLabel(); controls_layout.addWidget(self.sprite_frame_label)
+        sprite_layout.addWidget(self.sprite_controls); self.sprite_controls.setEnabled(False) # Always shown, so the image area (and the cached image size) stays the same
+        self.stacked_widget.addWidget(sprite_page)
         splitter = QSplitter(Qt.Orientation.Horizontal); splitter.addWidget(left_pane_widget); splitter.addWidget(self.stacked_widget)
         splitter.setStretchFactor(0, 1); splitter.setStretchFactor(1, 2); splitter.setSizes([350, 750])
         main_layout.addWidget(splitter)
-        self.setup_menu()
+        self.setup_perf_panel(); self.setup_menu()
+        self.cancel_export_button = QPushButton("Cancel Export"); self.cancel_export_button.clicked.connect(lambda: self.cancel_export()); self.cancel_export_button.hide()
+        self.statusBar().addPermanentWidget(self.cancel_export_button)
         self.statusBar().showMessage("Ready. Open a GMS2 project folder.")
 
     def setup_menu(self):
@@ -66,8 +742,32 @@ class GmlViewerApp(QMainWindow):
         self.export_action_ref = export_action # Store reference if needed later
         self.export_action_ref.setEnabled(False) # Enable when project loaded
         file_menu.addAction(export_action)
+        export_changes_action = QAction("Export &Changes Since Last Export...", self); export_changes_action.triggered.connect(self.export_changes)
+        self.export_changes_action_ref = export_changes_action; self.export_changes_action_ref.setEnabled(False); file_menu.addAction(export_changes_action)
+        export_chunks_action = QAction("Export All in &Chunks (Token Budget)...", self); export_chunks_action.triggered.connect(self.export_in_chunks)
+        self.export_chunks_action_ref = export_chunks_action; self.export_chunks_action_ref.setEnabled(False); file_menu.addAction(export_chunks_action)
+        compact_yy_action = QAction("Compact YY Data in Exports", self); compact_yy_action.setCheckable(True); compact_yy_action.setToolTip("Drop default/noise fields from .yy JSON and summarise room instances")
+        self.compact_yy_action_ref = compact_yy_action; file_menu.addAction(compact_yy_action)
+        export_selected_action = QAction("Export Se&lected Assets...", self); export_selected_action.triggered.connect(self.export_selected)
+        self.export_selected_action_ref = export_selected_action; self.export_selected_action_ref.setEnabled(False); file_menu.addAction(export_selected_action)
+        watch_action = QAction("&Watch Project for Changes", self); watch_action.setCheckable(True); watch_action.setChecked(True); watch_action.toggled.connect(self.set_watching_enabled)
+        self.watch_action_ref = watch_action; file_menu.addAction(watch_action)
+        rescan_action = QAction("&Rescan Project (Ignore Cache)", self); rescan_action.setShortcut("Ctrl+Shift+R"); rescan_action.triggered.connect(self.rescan_project); file_menu.addAction(rescan_action)
+        batch_action = QAction("&Paste && Apply GML Batch...", self); batch_action.setShortcut("Ctrl+Shift+V"); batch_action.triggered.connect(self.paste_gml_batch)
+        batch_action.setEnabled(False); self.batch_action_ref = batch_action; file_menu.addAction(batch_action)
+        find_action = QAction("&Find in Project...", self); find_action.setShortcut("Ctrl+Shift+F"); find_action.triggered.connect(lambda: (self.search_edit.setFocus(), self.search_edit.selectAll())); file_menu.addAction(find_action)
+        room_analytics_action = QAction("Room &Analytics", self); room_analytics_action.setToolTip("Instance counts, density and out-of-bounds/stacked instances of every room, heaviest first")
+        room_analytics_action.triggered.connect(self.show_room_analytics); room_analytics_action.setEnabled(False); self.room_analytics_action_ref = room_analytics_action; file_menu.addAction(room_analytics_action)
+        unused_assets_action = QAction("&Unused Assets", self); unused_assets_action.setToolTip("Assets no other asset or GML code refers to")
+        unused_assets_action.triggered.connect(self.show_unused_assets); unused_assets_action.setEnabled(False); self.unused_assets_action_ref = unused_assets_action; file_menu.addAction(unused_assets_action)
         file_menu.addSeparator()
         exit_action = QAction("&Exit", self); exit_action.setShortcut("Ctrl+Q"); exit_action.triggered.connect(self.close); file_menu.addAction(exit_action)
+        view_menu = menu_bar.addMenu("&View")
+        perf_panel_action = self.perf_dock.toggleViewAction(); perf_panel_action.setText("&Performance Panel"); view_menu.addAction(perf_panel_action)
+        perf_record_action = QAction("&Record Performance Timings", self); perf_record_action.setCheckable(True); perf_record_action.setChecked(perf.enabled)
+        perf_record_action.setToolTip("Time scanning, clicks, .yy parsing, exports and image loading (small overhead while on)")
+        perf_record_action.toggled.connect(self.set_perf_recording); self.perf_record_action_ref = perf_record_action; view_menu.addAction(perf_record_action)
+        perf_save_action = QAction("&Save Performance Trace...", self); perf_save_action.triggered.connect(self.save_perf_trace); view_menu.addAction(perf_save_action)
 
     def open_project_folder(self):
         # (Open project folder logic remains the same)
@@ -76,153 +776,472 @@ class GmlViewerApp(QMainWindow):
             yyp_files = [f for f in os.listdir(folder_path) if f.endswith('.yyp')]
             if not yyp_files: QMessageBox.warning(self, "Not a GMS2 Project?", f"Folder missing .yyp file:\n{folder_path}")
             self.project_root_path = folder_path; self.setWindowTitle(f"VIBE2GML - {os.path.basename(folder_path)}")
-            self.statusBar().showMessage(f"Scanning project: {folder_path}..."); QApplication.processEvents()
-            self.scan_project(folder_path)
-            # Enable export button only if GML files were found
-            enable_export = bool(self.project_gml_files_details)
-            self.export_button.setEnabled(enable_export)
-            self.export_action_ref.setEnabled(enable_export) # Also enable menu item
-            found_items = self.model.rowCount() > 0
-            if not found_items: self.statusBar().showMessage(f"No assets or GML files found in {folder_path}"); QMessageBox.information(self, "Scan Complete", f"No GameMaker assets or .gml files were found in:\n{folder_path}")
-            else: self.statusBar().showMessage(f"Project loaded: {folder_path} - Found {len(self.project_gml_files_details)} GML files.")
+            self.statusBar().showMessage(f"Scanning project: {folder_path}...")
+            self.scan_project(folder_path) # Runs in the background; on_scan_finished enables export and reports results
 
 
     def scan_project(self, folder_path):
-        # Modified scan to store asset YY path with GML file details
+        # Resets the view and hands the directory walk to a ProjectScanWorker; results stream in via the on_scan_* slots
+        self.cancel_scan(); self.cancel_search_index(); self.cancel_room_analytics(); self.cancel_asset_graph(); self.project_watcher.stop(); self._scan_index = None
+        self.asset_graph = None; self.room_analytics_action_ref.setEnabled(False); self.unused_assets_action_ref.setEnabled(False); self.batch_action_ref.setEnabled(False)
+        self.search_index = None; self.search_results.clear(); self.search_results.hide()
         self.project_gml_files_details.clear() # Use the new list
-        self.model.clear(); self.text_edit.clear(); self.image_label.clear()
+        self.show_info_document(); self.gml_documents.clear()
+        self.model.clear(folder_path); self.text_edit.clear(); self.image_label.clear(); self.stop_sprite(); self.sprite_loader.clear()
         self.stacked_widget.setCurrentIndex(0); self.current_file_path = None; self.current_display_name = None
         self.save_button.setEnabled(False); self.save_action_ref.setEnabled(False); self.text_edit.setReadOnly(True)
-        self.export_button.setEnabled(False); self.export_action_ref.setEnabled(False) # Disable export initially
-
-        root_node = self.model.invisibleRootItem(); bold_font = QFont(); bold_font.setBold(True)
-        asset_categories = { "Objects": "objects", "Scripts": "scripts", "Rooms": "rooms", "Sprites": "sprites", "Notes": "notes", "Tile Sets": "tilesets", "Timelines": "timelines", "Fonts": "fonts", "Sounds": "sounds", "Extensions": "extensions" }
-        category_nodes = {}; asset_nodes = {} # {asset_folder_path: node}
-
-        # Pass 1: Create Category and Asset Folder Nodes
-        for display_name, folder_name in asset_categories.items():
-            category_folder_path = os.path.join(folder_path, folder_name)
-            if os.path.isdir(category_folder_path):
-                if display_name not in category_nodes: cat_node = QStandardItem(display_name); cat_node.setFont(bold_font); cat_node.setEditable(False); root_node.appendRow(cat_node); category_nodes[display_name] = cat_node
-                else: cat_node = category_nodes[display_name]
-                try:
-                    for asset_name in sorted(os.listdir(category_folder_path)):
-                        asset_folder_path = os.path.join(category_folder_path, asset_name)
-                        if os.path.isdir(asset_folder_path):
-                            asset_type_prefix = display_name[:-1] if display_name.endswith('s') else display_name; asset_display_name = f"{asset_type_prefix}: {asset_name}"
-                            asset_node = QStandardItem(asset_display_name); asset_node.setEditable(False); asset_node.setData(asset_folder_path, ASSET_FOLDER_PATH_ROLE)
-                            # <<<< Mark objects, rooms, sprites specifically >>>>
-                            item_type = "folder";
-                            if display_name == "Objects": item_type = "object_folder" # <<<< Specific type
-                            elif display_name == "Rooms": item_type = "room_folder"
-                            elif display_name == "Sprites": item_type = "sprite_folder"
-                            asset_node.setData(item_type, ITEM_TYPE_ROLE); asset_node.setData(os.path.relpath(asset_folder_path, folder_path), Qt.ItemDataRole.ToolTipRole)
-                            cat_node.appendRow(asset_node); asset_nodes[asset_folder_path] = asset_node
-                except OSError as e: print(f"Warning: Could not read directory {category_folder_path}: {e}")
-
-        # Pass 2: Find GML files and attach, storing related YY path
+        self.set_export_enabled(False) # Disable export initially
+        self._scan_category_nodes = {}; self._scan_asset_nodes = {} # {asset_folder_path: node}
+
+        self._scan_id += 1
+        self._scan_thread = QThread(self); self._scan_worker = ProjectScanWorker(self._scan_id, folder_path)
+        self._scan_worker.moveToThread(self._scan_thread)
+        self._scan_thread.started.connect(self._scan_worker.run)
+        self._scan_worker.assets_found.connect(self.on_scan_assets_found)
+        self._scan_worker.gml_batch_found.connect(self.on_scan_gml_batch)
+        self._scan_worker.progress.connect(self.on_scan_progress)
+        self._scan_worker.finished.connect(self.on_scan_finished)
+        self._scan_worker.finished.connect(self._scan_thread.quit)
+        self._scan_thread.finished.connect(self._scan_worker.deleteLater); self._scan_thread.finished.connect(self._scan_thread.deleteLater)
+        self._scan_thread.start()
+
+    def rescan_project(self):
+        """Drops the cached scan index for the open project and scans it from scratch."""
+        if not self.project_root_path: return
+        self.cancel_scan(); ScanIndex(self.project_root_path).clear(); GmlSearchIndex(self.project_root_path).clear(); AssetGraph(self.project_root_path).clear()
+        self.statusBar().showMessage(f"Rescanning project: {self.project_root_path}...")
+        self.scan_project(self.project_root_path)
+
+    def cancel_scan(self):
+        """Stops a running background scan (if any) and waits for its thread to exit."""
+        if self._scan_worker is None: return
+        worker, thread = self._scan_worker, self._scan_thread
+        self._scan_worker = None; self._scan_thread = None
+        worker.cancel()
+        try: thread.quit(); thread.wait()
+        except RuntimeError: pass # Thread object already deleted after a completed scan
+
+    def _get_category_node(self, display_name, label=None):
+        cat_node = self._scan_category_nodes.get(display_name)
+        if cat_node is None:
+            cat_node = self.model.add_child(self.model.root, label or display_name); self._scan_category_nodes[display_name] = cat_node
+        return cat_node
+
+    def _expand_node(self, node):
+        # Same as the old expandToDepth(0), but progressive: categories open as soon as they have rows
+        index = self.model.index_for_node(node)
+        if self.model.canFetchMore(index): self.model.fetchMore(index)
+        self.tree_view.expand(index)
+
+    @perf.traced("tree.add_assets")
+    def on_scan_assets_found(self, scan_id, display_name, assets):
+        if scan_id != self._scan_id: return # Stale signal from a cancelled scan
+        cat_node = self._get_category_node(display_name)
+        for asset_display_name, asset_folder_path, item_type in assets:
+            self._scan_asset_nodes[asset_folder_path] = self.model.add_child(cat_node, asset_display_name, item_type, asset_folder_path)
+        self._expand_node(cat_node)
+
+    @perf.traced("tree.add_gml_batch")
+    def on_scan_gml_batch(self, scan_id, records):
+        if scan_id != self._scan_id: return
         other_cat_node = None
-        for current_root, dirs, files in os.walk(folder_path, topdown=True):
-            relative_root = os.path.relpath(current_root, folder_path)
-            if relative_root != '.':
-                top_dir = relative_root.split(os.sep)[0].lower()
-                is_known_asset_root = top_dir in asset_categories.values()
-                if not is_known_asset_root and top_dir in ['options', 'datafiles', 'configs', '.git', '.vscode', 'temp']: dirs[:] = []; continue
-            for file in sorted(files):
-                if file.endswith(".gml"):
-                    file_path = os.path.join(current_root, file); relative_path = os.path.relpath(file_path, folder_path); parent_dir = os.path.dirname(file_path)
-                    parent_asset_node = asset_nodes.get(parent_dir); gml_display_name = os.path.splitext(file)[0]
-
-                    # Determine the path to the asset's main YY file (if applicable)
-                    asset_yy_path = None
-                    if parent_asset_node:
-                        parent_item_type = parent_asset_node.data(ITEM_TYPE_ROLE)
-                        # Only certain asset types have a primary YY file named after the asset folder
-                        if parent_item_type in ["object_folder", "room_folder", "sprite_folder", "folder"]: # Assuming 'folder' might be script etc.
-                             asset_name = os.path.basename(parent_dir)
-                             potential_yy_path = os.path.join(parent_dir, f"{asset_name}.yy")
-                             if os.path.isfile(potential_yy_path):
-                                 asset_yy_path = potential_yy_path
-
-                    if parent_asset_node:
-                        item_node = QStandardItem(gml_display_name); item_node.setEditable(False); item_node.setData(file_path, GML_FILE_PATH_ROLE); item_node.setData("file", ITEM_TYPE_ROLE); item_node.setData(relative_path, Qt.ItemDataRole.ToolTipRole)
-                        parent_asset_node.appendRow(item_node);
-                        full_display_name = f"{parent_asset_node.text()} / {gml_display_name}"
-                        # Store GML details along with associated asset YY path
-                        self.project_gml_files_details.append((full_display_name, file_path, relative_path, asset_yy_path)) # <<<< Added yy_path
-                    else: # GML file not in a direct known asset subfolder
-                         if other_cat_node is None:
-                             if "Other" not in category_nodes: other_cat_node = QStandardItem("Other GML"); other_cat_node.setFont(bold_font); other_cat_node.setEditable(False); root_node.appendRow(other_cat_node); category_nodes["Other"] = other_cat_node
-                             else: other_cat_node = category_nodes["Other"]
-                         item_node = QStandardItem(relative_path); item_node.setEditable(False); item_node.setData(file_path, GML_FILE_PATH_ROLE); item_node.setData("file", ITEM_TYPE_ROLE); item_node.setData(relative_path, Qt.ItemDataRole.ToolTipRole)
-                         other_cat_node.appendRow(item_node);
-                         # No clear associated asset YY path for 'Other' GML
-                         self.project_gml_files_details.append((relative_path, file_path, relative_path, None)) # <<<< Added None for yy_path
-
-        self.project_gml_files_details.sort() # Sort the detailed list
-        self.tree_view.expandToDepth(0)
+        for parent_dir, gml_display_name, file_path, relative_path, asset_yy_path in records:
+            parent_asset_node = self._scan_asset_nodes.get(parent_dir) if parent_dir else None
+            if parent_asset_node:
+                self.model.add_child(parent_asset_node, gml_display_name, "file", file_path) # Held until the asset is expanded
+            else: # GML file not in a direct known asset subfolder
+                other_cat_node = self._get_category_node("Other", "Other GML")
+                self.model.add_child(other_cat_node, relative_path, "file", file_path)
+        if other_cat_node: self._expand_node(other_cat_node)
+        self.model.refresh_child_indicators()
+
+    def on_scan_progress(self, scan_id, dirs_scanned, gml_found):
+        if scan_id != self._scan_id: return
+        self.statusBar().showMessage(f"Scanning project: {self.project_root_path}... {dirs_scanned} folders, {gml_found} GML files")
+
+    def on_scan_finished(self, scan_id, cancelled):
+        if scan_id != self._scan_id or cancelled: return
+        index = self._scan_worker.index; self.project_gml_files_details = self._scan_worker.details # Already sorted
+        self._scan_worker = None; self._scan_thread = None
+        self._scan_index = index
+        if self.watch_action_ref.isChecked(): self.start_watching()
+        folder_path = self.project_root_path
+        if self.project_gml_files_details: self.build_search_index()
+        self.room_analytics_action_ref.setEnabled(True); self.batch_action_ref.setEnabled(True); self.build_asset_graph()
+        # Enable export button only if GML files were found
+        enable_export = bool(self.project_gml_files_details)
+        self.set_export_enabled(enable_export) # Also enables the menu items
+        found_items = self.model.rowCount() > 0
+        if not found_items: self.statusBar().showMessage(f"No assets or GML files found in {folder_path}"); QMessageBox.information(self, "Scan Complete", f"No GameMaker assets or .gml files were found in:\n{folder_path}")
+        else: self.statusBar().showMessage(f"Project loaded: {folder_path} - Found {len(self.project_gml_files_details)} GML files. ({index.hits} of {index.hits + index.misses} folders from cache)")
+
+    # <<<< ---- Live Project Watching ---- >>>>
+    def set_watching_enabled(self, enabled):
+        if enabled: self.start_watching()
+        else: self.project_watcher.stop(); self.statusBar().showMessage("Stopped watching project for changes.")
+
+    def start_watching(self):
+        """Watches the project root, category folders and asset folders of the loaded project."""
+        if not self.project_root_path or self._scan_index is None: return
+        folders = [self.project_root_path] + [os.path.join(self.project_root_path, folder_name) for display_name, folder_name in ASSET_CATEGORIES.items() if display_name in self._scan_category_nodes]
+        folders += list(self._scan_asset_nodes)
+        self.project_watcher.watch_folders(folders); self.project_watcher.watch_file(self.current_file_path)
+
+    def on_project_folders_changed(self, folder_paths):
+        """Patches only the tree nodes and GML details of the folders that changed on disk."""
+        if not self.project_root_path or self._scan_index is None: return
+        category_folders = {os.path.join(self.project_root_path, folder_name): display_name for display_name, folder_name in ASSET_CATEGORIES.items()}
+        for folder_path in folder_paths:
+            if folder_path == self.project_root_path: self._refresh_categories()
+            elif folder_path in category_folders: self._refresh_category(category_folders[folder_path], folder_path)
+            elif folder_path in self._scan_asset_nodes: self.sprite_loader.invalidate(folder_path); self._refresh_asset(folder_path)
+        self.model.refresh_child_indicators(); self._scan_index.save()
+        enable_export = bool(self.project_gml_files_details)
+        self.set_export_enabled(enable_export)
+        self.statusBar().showMessage(f"Project updated from disk - {len(self.project_gml_files_details)} GML files.")
+
+    def _refresh_categories(self):
+        # New top-level asset folders (e.g. the first script ever created) get a category, in the usual order
+        row = 0
+        for display_name, folder_name in ASSET_CATEGORIES.items():
+            category_folder_path = os.path.join(self.project_root_path, folder_name)
+            if display_name in self._scan_category_nodes: row += 1; continue
+            if not os.path.isdir(category_folder_path): continue
+            self._scan_category_nodes[display_name] = self.model.add_child(self.model.root, display_name, row=row)
+            self.project_watcher.add_folder(category_folder_path); self._refresh_category(display_name, category_folder_path); row += 1
+
+    def _refresh_category(self, display_name, category_folder_path):
+        cat_node = self._scan_category_nodes.get(display_name)
+        if cat_node is None: return
+        try: asset_names = self._scan_index.listing(category_folder_path)[0]
+        except OSError: asset_names = [] # Category folder deleted
+        wanted = {os.path.join(category_folder_path, asset_name) for asset_name in asset_names}
+        for asset_node in [node for node in cat_node.children or () if node.path not in wanted]: self._remove_asset_node(asset_node)
+        asset_type_prefix, item_type = get_asset_kind(display_name)
+        for row, asset_name in enumerate(asset_names):
+            asset_folder_path = os.path.join(category_folder_path, asset_name)
+            if asset_folder_path in self._scan_asset_nodes: continue
+            self._scan_asset_nodes[asset_folder_path] = self.model.add_child(cat_node, f"{asset_type_prefix}: {asset_name}", item_type, asset_folder_path, row=row)
+            self.project_watcher.add_folder(asset_folder_path); self._refresh_asset(asset_folder_path)
+
+    def _remove_asset_node(self, asset_node):
+        removed_paths = {node.path for node in asset_node.children or ()}
+        self.project_gml_files_details = [detail for detail in self.project_gml_files_details if detail[1] not in removed_paths]
+        for file_path in removed_paths: self.update_search_index(file_path) # Gone from disk: dropped from the index
+        self.model.remove_child(asset_node); self._scan_asset_nodes.pop(asset_node.path, None); self.project_watcher.remove_folder(asset_node.path)
+        self.update_asset_graph(asset_node.path)
+
+    def _refresh_asset(self, asset_folder_path):
+        asset_node = self._scan_asset_nodes[asset_folder_path]
+        try: _, gml_files, has_asset_yy = self._scan_index.listing(asset_folder_path)
+        except OSError: return # Asset folder deleted; its category refresh removes the node
+        wanted = [os.path.join(asset_folder_path, file) for file in gml_files]; wanted_set = set(wanted)
+        existing = {node.path: node for node in asset_node.children or ()}
+        for path, node in existing.items():
+            if path not in wanted_set: self.model.remove_child(node); self.update_search_index(path)
+        for row, file_path in enumerate(wanted):
+            if file_path not in existing: self.model.add_child(asset_node, os.path.splitext(os.path.basename(file_path))[0], "file", file_path, row=row); self.update_search_index(file_path)
+        # Rebuild this asset's GML details; the asset YY may have appeared or gone too
+        asset_yy_path = os.path.join(asset_folder_path, f"{os.path.basename(asset_folder_path)}.yy") if has_asset_yy else None
+        stale_paths = set(existing) | wanted_set
+        self.project_gml_files_details = [detail for detail in self.project_gml_files_details if detail[1] not in stale_paths]
+        for file_path in wanted:
+            self.project_gml_files_details.append((f"{asset_node.text} / {os.path.splitext(os.path.basename(file_path))[0]}", file_path, os.path.relpath(file_path, self.project_root_path), asset_yy_path))
+        self.project_gml_files_details.sort(); self.update_asset_graph(asset_folder_path)
+
+    def on_current_file_changed_on_disk(self, file_path):
+        """Reloads the open GML file if GMS2 changed it, asking first when there are unsaved edits."""
+        if not file_path or file_path != self.current_file_path: return
+        if not os.path.isfile(file_path):
+            self.statusBar().showMessage(f"Warning: {os.path.basename(file_path)} was deleted or renamed on disk.")
+            QMessageBox.warning(self, "File Removed", f"The open GML file no longer exists on disk:\n{file_path}\n\nIts last contents are still in the editor."); return
+        if os.stat(file_path).st_mtime_ns == self.current_file_mtime: return # Our own save
+        if self.text_edit.document().isModified():
+            answer = QMessageBox.question(self, "File Changed on Disk", f"{os.path.basename(file_path)} was changed outside VIBE2GML (e.g. by GMS2).\n\nReload it and discard your unsaved edits?")
+            if answer != QMessageBox.StandardButton.Yes: self.statusBar().showMessage(f"Kept your edits; {os.path.basename(file_path)} differs from disk."); return
+        self.reload_current_gml()
+
+    def reload_current_gml(self):
+        scroll_value = self.text_edit.verticalScrollBar().value()
+        self.gml_documents.discard(self.current_file_path)
+        try: self.open_gml_document(self.current_file_path)
+        except (OSError, ValueError) as e: QMessageBox.warning(self, "File Read Error", f"Error reading GML file:\n{self.current_file_path}\n\n{e}"); return
+        self.set_editing_enabled(self._gml_doc.loaded); self.text_edit.verticalScrollBar().setValue(scroll_value)
+        self.update_search_index(self.current_file_path)
+        self.statusBar().showMessage(f"Reloaded {os.path.basename(self.current_file_path)} (changed on disk)")
+    # <<<< ---- END Live Project Watching ---- >>>>
+
+    # <<<< ---- Project Search ---- >>>>
+    def build_search_index(self):
+        """Indexes the loaded project's GML in the background; searches work once it finishes."""
+        self.cancel_search_index(); self._search_pending_paths = set()
+        self._search_thread = QThread(self); self._search_worker = SearchIndexWorker(self._scan_id, self.project_root_path, list(self.project_gml_files_details))
+        self._search_worker.moveToThread(self._search_thread)
+        self._search_thread.started.connect(self._search_worker.run)
+        self._search_worker.finished.connect(self.on_search_index_finished)
+        self._search_worker.finished.connect(self._search_thread.quit)
+        self._search_thread.finished.connect(self._search_worker.deleteLater); self._search_thread.finished.connect(self._search_thread.deleteLater)
+        self._search_thread.start()
+
+    def cancel_search_index(self):
+        if self._search_worker is None: return
+        worker, thread = self._search_worker, self._search_thread
+        self._search_worker = None; self._search_thread = None
+        worker.cancel()
+        try: thread.quit(); thread.wait()
+        except RuntimeError: pass
+
+    def on_search_index_finished(self, scan_id, cancelled):
+        if scan_id != self._scan_id or cancelled or self._search_worker is None: return
+        index = self._search_worker.index; self._search_worker = None; self._search_thread = None
+        self.search_index = index
+        for file_path in self._search_pending_paths: self.update_search_index(file_path)
+        self._search_pending_paths = set()
+        if self.search_edit.text(): self.run_search()
+
+    def update_search_index(self, file_path):
+        """Re-indexes a GML file that was saved, created, reloaded or deleted."""
+        if self.search_index is not None: self.search_index.update_file(file_path, os.path.relpath(file_path, self.project_root_path))
+        elif self._search_worker is not None: self._search_pending_paths.add(file_path) # Applied when the build finishes
+
+    def run_search(self):
+        self.search_timer.stop(); query = self.search_edit.text()
+        self.search_results.clear()
+        if not query.strip(): self.search_results.hide(); return
+        self.search_results.show()
+        if self.search_index is None:
+            self.search_results.addItem("(Search index is still being built...)" if self._search_worker is not None else "(Open a project to search)"); return
+        start = time.perf_counter(); hits = self.search_index.search(query, self.search_identifier_check.isChecked())
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        for hit in hits:
+            item = QListWidgetItem(f"{hit.relative_path}:{hit.line}: {hit.text.strip()}"); item.setToolTip(hit.text)
+            item.setData(Qt.ItemDataRole.UserRole, (hit.file_path, hit.line, hit.column, len(query.strip()) if self.search_identifier_check.isChecked() else len(query)))
+            self.search_results.addItem(item)
+        if not hits: self.search_results.addItem(f"(No matches for '{query}')")
+        limit_note = f" (first {len(hits)} shown)" if len(hits) >= SEARCH_MAX_RESULTS else ""
+        self.statusBar().showMessage(f"{len(hits)} matching lines for '{query}'{limit_note} - {elapsed_ms:.1f} ms")
+
+    @perf.traced("click.search_hit")
+    def open_search_hit(self, item):
+        """Selects the hit's GML file in the tree, opens it and highlights the match."""
+        hit = item.data(Qt.ItemDataRole.UserRole)
+        if not hit: return
+        file_path, line, column, length = hit
+        parent_node = self._scan_asset_nodes.get(os.path.dirname(file_path)) or self._scan_category_nodes.get("Other")
+        if parent_node is None: return
+        parent_index = self.model.index_for_node(parent_node)
+        if self.model.canFetchMore(parent_index): self.model.fetchMore(parent_index)
+        file_node = next((node for node in parent_node.children or () if node.path == file_path), None)
+        if file_node is None: self.statusBar().showMessage(f"{os.path.basename(file_path)} is no longer in the project tree."); return
+        index = self.model.index_for_node(file_node)
+        self.tree_view.expand(parent_index); self.tree_view.setCurrentIndex(index); self.tree_view.scrollTo(index)
+        self.on_tree_item_clicked(index)
+        if self.current_file_path != file_path: return
+        while self._gml_doc is not None and not self._gml_doc.loaded and self.text_edit.document().blockCount() < line: self._gml_doc.load_more()
+        block = self.text_edit.document().findBlockByNumber(line - 1)
+        if not block.isValid(): return
+        cursor = QTextCursor(block); cursor.movePosition(QTextCursor.MoveOperation.Right, QTextCursor.MoveMode.MoveAnchor, column)
+        cursor.movePosition(QTextCursor.MoveOperation.Right, QTextCursor.MoveMode.KeepAnchor, length)
+        self.text_edit.setTextCursor(cursor); self.text_edit.ensureCursorVisible(); self.text_edit.setFocus()
+    # <<<< ---- END Project Search ---- >>>>
+
+    # <<<< ---- Asset Dependencies ---- >>>>
+    def build_asset_graph(self):
+        """Builds the loaded project's dependency graph in the background; the object view and the dependency actions use it once ready."""
+        self.cancel_asset_graph(); self._graph_pending_folders = set()
+        self._graph_thread = QThread(self); self._graph_worker = AssetGraphWorker(self._scan_id, self.project_root_path)
+        self._graph_worker.moveToThread(self._graph_thread)
+        self._graph_thread.started.connect(self._graph_worker.run)
+        self._graph_worker.finished.connect(self.on_asset_graph_finished)
+        self._graph_worker.finished.connect(self._graph_thread.quit)
+        self._graph_thread.finished.connect(self._graph_worker.deleteLater); self._graph_thread.finished.connect(self._graph_thread.deleteLater)
+        self._graph_thread.start()
+
+    def cancel_asset_graph(self):
+        if self._graph_worker is None: return
+        worker, thread = self._graph_worker, self._graph_thread
+        self._graph_worker = None; self._graph_thread = None
+        worker.cancel()
+        try: thread.quit(); thread.wait()
+        except RuntimeError: pass
+
+    def on_asset_graph_finished(self, scan_id, cancelled):
+        if scan_id != self._scan_id or cancelled or self._graph_worker is None: return
+        graph = self._graph_worker.graph; self._graph_worker = None; self._graph_thread = None
+        self.asset_graph = graph; self.unused_assets_action_ref.setEnabled(True)
+        for asset_folder_path in self._graph_pending_folders: self.update_asset_graph(asset_folder_path)
+        self._graph_pending_folders = set()
 
+    def update_asset_graph(self, asset_folder_path):
+        """Re-reads one asset folder's .yy into the graph after it changed on disk (or drops the asset if it is gone)."""
+        if self.asset_graph is None:
+            if self._graph_worker is not None: self._graph_pending_folders.add(asset_folder_path) # Applied when the build finishes
+            return
+        asset_name = os.path.basename(asset_folder_path); category_folder = os.path.basename(os.path.dirname(asset_folder_path))
+        kind = next((display_name for display_name, folder_name in ASSET_CATEGORIES.items() if folder_name == category_folder), None)
+        if kind is None: return
+        if self.asset_graph.update_asset(kind, asset_name, os.path.join(asset_folder_path, f"{asset_name}.yy")): self.asset_graph.save()
+
+    def format_asset_dependencies(self, asset_yy_path):
+        """[Dependencies] section for the object view: inheritance chain, children, rooms and other assets using it."""
+        lines = ["\n[Dependencies]"]
+        if self.asset_graph is None: lines.append("  (Dependency graph is still being built...)"); return "\n".join(lines)
+        self.update_asset_graph(os.path.dirname(asset_yy_path)) # Catches .yy edits the folder watcher can't see
+        asset_name = os.path.basename(os.path.dirname(asset_yy_path)); graph = self.asset_graph
+        lines.append(f"  Inheritance: {' -> '.join(graph.inheritance_chain(asset_name))}")
+        lines.append(f"  Children: {', '.join(sorted(graph.children.get(asset_name, ()))) or '(None)'}")
+        lines.append(f"  Used in rooms: {', '.join(graph.users_of(asset_name, 'Rooms')) or '(None)'}")
+        other_users = [name for name in graph.users_of(asset_name) if graph.assets[name].kind != "Rooms" and graph.assets[name].parent != asset_name]
+        lines.append(f"  Used by: {', '.join(other_users) or '(None)'}")
+        return "\n".join(lines)
+
+    def show_unused_assets(self):
+        """Lists assets that no .yy file references and whose names don't appear in the project's GML."""
+        if self.asset_graph is None: return
+        referenced = self.search_index.postings if self.search_index is not None else ()
+        unused = self.asset_graph.unused(referenced)
+        lines = [f"Unused Assets: {len(unused)} of {len(self.asset_graph.assets)}", "=" * 70]
+        if self.search_index is None: lines.append("(GML search index still being built: names used only in code are listed too)")
+        lines += [f"{get_asset_kind(kind)[0]}: {name}" for kind, name in unused] or ["(None)"]
+        self.show_info_document(); self.set_editing_enabled(False); self.current_file_path = None; self.current_display_name = None; self.project_watcher.watch_file(None)
+        self.image_label.clear(); self.stop_sprite(); self.stacked_widget.setCurrentIndex(0)
+        self.text_edit.setPlainText("\n".join(lines)); self.statusBar().showMessage(lines[0])
+    # <<<< ---- END Asset Dependencies ---- >>>>
+
+    # <<<< ---- Performance Panel ---- >>>>
+    def setup_perf_panel(self):
+        """Diagnostics dock with the shared PerfTrace's per-phase timings and counters, plus a status bar readout while recording."""
+        self.perf_dock = QDockWidget("Performance", self); self.perf_dock.setObjectName("performance_dock")
+        panel = QWidget(); panel_layout = QVBoxLayout(panel); panel_layout.setContentsMargins(4,4,4,4)
+        perf_buttons = QHBoxLayout()
+        self.perf_record_button = QPushButton("Record"); self.perf_record_button.setCheckable(True); self.perf_record_button.setChecked(perf.enabled); self.perf_record_button.toggled.connect(self.set_perf_recording); perf_buttons.addWidget(self.perf_record_button)
+        perf_clear_button = QPushButton("Clear"); perf_clear_button.clicked.connect(lambda: (perf.clear(), self.refresh_perf_panel())); perf_buttons.addWidget(perf_clear_button)
+        perf_save_button = QPushButton("Save Trace..."); perf_save_button.setToolTip("Chrome trace JSON (chrome://tracing or ui.perfetto.dev), e.g. to attach to a bug report"); perf_save_button.clicked.connect(self.save_perf_trace); perf_buttons.addWidget(perf_save_button)
+        perf_buttons.addStretch(1); panel_layout.addLayout(perf_buttons)
+        self.perf_view = QPlainTextEdit(); self.perf_view.setReadOnly(True); self.perf_view.setFont(QFont("Courier New")); self.perf_view.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap); panel_layout.addWidget(self.perf_view)
+        self.perf_dock.setWidget(panel); self.addDockWidget(Qt.DockWidgetArea.BottomDockWidgetArea, self.perf_dock); self.perf_dock.hide()
+        self.perf_dock.visibilityChanged.connect(lambda visible: visible and self.refresh_perf_panel())
+        self.perf_status_label = QLabel(); self.statusBar().addPermanentWidget(self.perf_status_label); self.perf_status_label.setVisible(perf.enabled)
+        self.perf_timer = QTimer(self); self.perf_timer.setInterval(PERF_REFRESH_MS); self.perf_timer.timeout.connect(self.refresh_perf_panel)
+        if perf.enabled: self.perf_timer.start()
+
+    def set_perf_recording(self, enabled):
+        perf.enable(enabled); self.perf_record_button.setChecked(enabled); self.perf_record_action_ref.setChecked(enabled) # No-ops (no signal) when already in that state
+        self.perf_status_label.setVisible(enabled)
+        if enabled: self.perf_timer.start()
+        else: self.perf_timer.stop()
+        self.refresh_perf_panel()
+
+    def refresh_perf_panel(self):
+        latest = perf.latest
+        self.perf_status_label.setText("  ".join(f"{category} {latest[category][1] * 1000:.1f} ms" for category in PERF_STATUS_CATEGORIES if category in latest) or "Recording timings...")
+        if self.perf_dock.isVisible():
+            scroll = self.perf_view.verticalScrollBar().value(); self.perf_view.setPlainText(perf.format_summary()); self.perf_view.verticalScrollBar().setValue(scroll)
+
+    def save_perf_trace(self):
+        if not perf.events: QMessageBox.information(self, "Save Performance Trace", "No timings recorded yet. Turn on View > Record Performance Timings, reproduce the slow step, then save."); return
+        save_path, _ = QFileDialog.getSaveFileName(self, "Save Performance Trace", "vibe2gml_trace.json", "Trace Files (*.json);;All Files (*)")
+        if not save_path: return
+        try: perf.save_chrome_trace(save_path)
+        except OSError as e: QMessageBox.critical(self, "Save Failed", f"Could not save the trace:\n{save_path}\n\nError: {e}"); return
+        self.statusBar().showMessage(f"Saved performance trace ({len(perf.events)} events) to {save_path}")
+    # <<<< ---- END Performance Panel ---- >>>>
+
+    def closeEvent(self, event):
+        self.cancel_scan(); self.cancel_search_index(); self.cancel_room_analytics(); self.cancel_asset_graph(); self.cancel_export(wait=True); self.project_watcher.stop(); self.sprite_loader.shutdown()
+        super().closeEvent(event)
+
+
+    # <<<< ---- GML Editor ---- >>>>
+    @perf.traced("editor.open")
+    def open_gml_document(self, file_path):
+        """Shows file_path in the editor, reusing its cached document when the file is unchanged. Raises OSError/ValueError."""
+        st = os.stat(file_path)
+        gml_doc = self.gml_documents.get(file_path, st.st_mtime_ns, st.st_size)
+        if gml_doc is None:
+            gml_doc = GmlDocument(read_text(file_path), self.text_edit.font())
+        self.gml_documents.put(file_path, gml_doc, st.st_mtime_ns, st.st_size)
+        self._gml_doc = gml_doc; self.current_file_mtime = st.st_mtime_ns
+        self.text_edit.setDocument(gml_doc.document); self.text_edit.setReadOnly(True)
+        self.editor_timer.start()
+
+    def show_info_document(self):
+        """Leaves the current GML document (dropping it from the cache if it has unsaved edits) for the read-only info text."""
+        if self._gml_doc is not None and self._gml_doc.document.isModified() and self.current_file_path: self.gml_documents.discard(self.current_file_path)
+        self._gml_doc = None; self.editor_timer.stop()
+        if self.text_edit.document() is not self.info_document: self.text_edit.setDocument(self.info_document)
+
+    def set_editing_enabled(self, enabled):
+        self.text_edit.setReadOnly(not enabled); self.save_button.setEnabled(enabled); self.save_action_ref.setEnabled(enabled)
+
+    @perf.traced("editor.load_more")
+    def continue_gml_document(self):
+        # One timer tick: append the next chunk of a big file, else colour the next batch of lines
+        gml_doc = self._gml_doc
+        if gml_doc is None: self.editor_timer.stop(); return
+        if not gml_doc.loaded:
+            if gml_doc.load_more() and self.current_file_path: self.set_editing_enabled(True); self.statusBar().showMessage(f"Editing GML: {self.current_display_name} ({os.path.basename(self.current_file_path)})")
+        elif not gml_doc.highlighter.extend(): self.editor_timer.stop()
+    # <<<< ---- END GML Editor ---- >>>>
 
+    @perf.traced("click.tree")
     def on_tree_item_clicked(self, index: QModelIndex):
         # Modified to handle object_folder clicks
-        item = self.model.itemFromIndex(index)
-        if not item: return
-        item_type = item.data(ITEM_TYPE_ROLE); display_name = item.text()
+        if not index.isValid(): return
+        item_type = index.data(ITEM_TYPE_ROLE); display_name = index.data()
+        self.show_info_document()
         self.text_edit.setReadOnly(True); self.save_button.setEnabled(False); self.save_action_ref.setEnabled(False)
-        self.current_file_path = None; self.current_display_name = display_name; self.image_label.clear()
+        self.current_file_path = None; self.current_display_name = display_name; self.image_label.clear(); self.stop_sprite(); self.project_watcher.watch_file(None)
         self.stacked_widget.setCurrentIndex(0) # Default to text view
 
         if item_type == "file":
-            file_path = item.data(GML_FILE_PATH_ROLE)
+            file_path = index.data(GML_FILE_PATH_ROLE)
             if file_path and os.path.isfile(file_path):
                 try:
-                    with open(file_path, 'r', encoding='utf-8') as f: gml_content = f.read()
-                    self.text_edit.setPlainText(gml_content)
+                    self.open_gml_document(file_path)
                     # Automatic clipboard copy REMOVED based on user feedback
-                    self.text_edit.setReadOnly(False); self.current_file_path = file_path
-                    self.save_button.setEnabled(True); self.save_action_ref.setEnabled(True)
-                    self.statusBar().showMessage(f"Editing GML: {display_name} ({os.path.basename(file_path)})")
+                    self.current_file_path = file_path; self.project_watcher.watch_file(file_path)
+                    if self._gml_doc.loaded: self.set_editing_enabled(True); self.statusBar().showMessage(f"Editing GML: {display_name} ({os.path.basename(file_path)})")
+                    else: self.statusBar().showMessage(f"Loading GML: {display_name} ({os.path.basename(file_path)})...")
                 except Exception as e: error_msg = f"Error reading GML file:\n{file_path}\n\n{e}"; self.text_edit.setPlainText(error_msg); QMessageBox.warning(self, "File Read Error", error_msg); self.statusBar().showMessage(f"Error reading {os.path.basename(file_path)}")
             else: self.text_edit.clear(); self.statusBar().showMessage("Invalid GML file path selected.")
 
         elif item_type == "room_folder":
-            folder_path = item.data(ASSET_FOLDER_PATH_ROLE); room_name = display_name.split(": ")[-1]
+            folder_path = index.data(ASSET_FOLDER_PATH_ROLE); room_name = display_name.split(": ")[-1]
             room_yy_path = os.path.join(folder_path, f"{room_name}.yy"); self.display_room_info(room_yy_path)
             # Status bar set within display_room_info
 
         elif item_type == "object_folder": # <<<< ADDED Object Folder Handling
-            folder_path = item.data(ASSET_FOLDER_PATH_ROLE); object_name = display_name.split(": ")[-1]
+            folder_path = index.data(ASSET_FOLDER_PATH_ROLE); object_name = display_name.split(": ")[-1]
             object_yy_path = os.path.join(folder_path, f"{object_name}.yy"); self.display_object_info(object_yy_path) # Call new function
             self.statusBar().showMessage(f"Viewing Object: {object_name}")
 
         elif item_type == "sprite_folder":
             self.stacked_widget.setCurrentIndex(1) # Switch to image view *before* loading
-            folder_path = item.data(ASSET_FOLDER_PATH_ROLE); sprite_name = display_name.split(": ")[-1]
-            self.display_sprite_info(folder_path, sprite_name)
-            # Status bar set within display_sprite_info
+            folder_path = index.data(ASSET_FOLDER_PATH_ROLE); sprite_name = display_name.split(": ")[-1]
+            self.display_sprite_info(folder_path, sprite_name); self.prefetch_sprite_neighbours(index)
+            # Status bar set once the first frame is decoded
 
         elif item_type == "folder": # Generic folder (Script, Note, etc.)
-            folder_path = item.data(ASSET_FOLDER_PATH_ROLE)
+            folder_path = index.data(ASSET_FOLDER_PATH_ROLE)
             self.text_edit.setPlainText(f"Selected Asset Folder:\n{os.path.relpath(folder_path, self.project_root_path)}\n\n(Select a GML file to edit or right-click to create GML)")
             self.statusBar().showMessage(f"Selected folder: {display_name}")
         else: self.text_edit.clear(); self.statusBar().showMessage("Select an item from the tree.")
 
 
     # <<<< ---- Room Info Display Functions ---- >>>>
+    @perf.traced("view.room")
     def display_room_info(self, room_yy_path):
-        # (Unchanged)
         self.stacked_widget.setCurrentIndex(0) # Ensure text view is visible
         if not os.path.isfile(room_yy_path): error_msg = f"Room config file not found:\n{room_yy_path}"; self.text_edit.setPlainText(error_msg); self.statusBar().showMessage("Error: Room .yy not found."); QMessageBox.warning(self, "File Not Found", error_msg); return
         try:
-            with open(room_yy_path, 'r', encoding='utf-8') as f: file_content = f.read()
-            content_cleaned = re.sub(r",\s*([]}])", r"\1", file_content); room_data = json.loads(content_cleaned)
-            formatted_text = self.format_room_data(room_data); self.text_edit.setPlainText(formatted_text)
+            room_data = load_yy(room_yy_path)
+            formatted_text = self.format_room_data(room_data); self.text_edit.setPlainText(formatted_text) # Instance stats live in Room Analytics, off the click path
             self.statusBar().showMessage(f"Viewing Room: {os.path.basename(os.path.dirname(room_yy_path))}")
         except json.JSONDecodeError as e: error_msg = f"Error parsing room file:\n{room_yy_path}\n\nError: {e}\n\n(Check .yy file for syntax errors)"; self.text_edit.setPlainText(error_msg); self.statusBar().showMessage("Error: Failed to parse room .yy."); QMessageBox.warning(self, "JSON Parse Error", error_msg)
         except Exception as e: error_msg = f"An unexpected error occurred reading room file:\n{room_yy_path}\n\n{e}"; self.text_edit.setPlainText(error_msg); self.statusBar().showMessage("Error: Failed to read room .yy."); QMessageBox.critical(self, "Read Error", error_msg)
 
     def format_room_data(self, data):
-        # (Unchanged)
         output_lines = []; room_name = data.get('name', 'Unknown Room'); output_lines.append(f"{room_name}")
         layers = data.get('layers', []); layers_prefix = "├──" if data.get('roomSettings') or data.get('isPersistent') is not None else "└──"; output_lines.append(f"{layers_prefix} Layers ({len(layers)})")
         for i, layer in enumerate(layers):
@@ -231,8 +1250,7 @@ class GmlViewerApp(QMainWindow):
             if layer_type == "GMInstanceLayer":
                 instances = layer.get('instances', []); inst_prefix_connector = f"{layer_prefix_connector}    "; inst_is_last_in_layer = True; inst_prefix = f"{inst_prefix_connector}{'└──' if inst_is_last_in_layer else '├──'}"
                 if instances:
-                    output_lines.append(f"{inst_prefix} Instances ({len(instances)})"); instance_counts = Counter()
-                    for inst in instances: instance_counts[inst.get('objId', {}).get('name', 'UnknownObject')] += 1
+                    output_lines.append(f"{inst_prefix} Instances ({len(instances)})"); instance_counts = count_room_instances(instances)
                     sorted_objects = sorted(instance_counts.items()); obj_prefix_connector = f"{inst_prefix_connector}    "
                     for j, (obj_name, count) in enumerate(sorted_objects): is_last_obj = (j == len(sorted_objects) - 1); obj_prefix = f"{obj_prefix_connector}{'└──' if is_last_obj else '├──'}"; count_str = f" (x{count})" if count > 1 else ""; output_lines.append(f"{obj_prefix} {obj_name}{count_str}")
         room_settings = data.get('roomSettings', {}); view_settings = data.get('viewSettings', {}); creation_code_file = data.get('creationCodeFile', ''); is_persistent = data.get('isPersistent', False); has_properties = room_settings or view_settings or is_persistent is not None or creation_code_file
@@ -247,20 +1265,47 @@ class GmlViewerApp(QMainWindow):
              if creation_code_file: prop_items.append(f"Creation Code: {os.path.basename(creation_code_file)}")
              for k, prop_text in enumerate(prop_items): is_last_prop = (k == len(prop_items) - 1); prop_item_prefix = f"{prop_connector}{'└──' if is_last_prop else '├──'}"; output_lines.append(f"{prop_item_prefix} {prop_text}")
         return "\n".join(output_lines)
+
+    def show_room_analytics(self):
+        """Analyzes all rooms of the project in the background; the report replaces the text view when done."""
+        if not self.project_root_path: return
+        self.cancel_room_analytics()
+        self._rooms_thread = QThread(self); self._rooms_worker = RoomAnalyticsWorker(self._scan_id, self.project_root_path)
+        self._rooms_worker.moveToThread(self._rooms_thread)
+        self._rooms_thread.started.connect(self._rooms_worker.run)
+        self._rooms_worker.finished.connect(self.on_room_analytics_finished)
+        self._rooms_worker.finished.connect(self._rooms_thread.quit)
+        self._rooms_thread.finished.connect(self._rooms_worker.deleteLater); self._rooms_thread.finished.connect(self._rooms_thread.deleteLater)
+        self._rooms_thread.start(); self.statusBar().showMessage("Analyzing rooms...")
+
+    def cancel_room_analytics(self):
+        if self._rooms_worker is None: return
+        worker, thread = self._rooms_worker, self._rooms_thread
+        self._rooms_worker = None; self._rooms_thread = None
+        worker.cancel()
+        try: thread.quit(); thread.wait()
+        except RuntimeError: pass
+
+    def on_room_analytics_finished(self, scan_id, report):
+        if scan_id != self._scan_id or not report or self._rooms_worker is None: return
+        self._rooms_worker = None; self._rooms_thread = None
+        self.show_info_document(); self.set_editing_enabled(False); self.current_file_path = None; self.current_display_name = None; self.project_watcher.watch_file(None)
+        self.image_label.clear(); self.stop_sprite(); self.stacked_widget.setCurrentIndex(0)
+        self.text_edit.setPlainText(report); self.statusBar().showMessage(report.splitlines()[0])
     # <<<< ---- END Room Info Display Functions ---- >>>>
 
     # <<<< ---- ADDED Object Info Display Functions ---- >>>>
+    @perf.traced("view.object")
     def display_object_info(self, object_yy_path):
-        """Loads, parses (with cleaning), and displays formatted object info."""
+        """Loads (through the shared yy cache) and displays formatted object info."""
         self.stacked_widget.setCurrentIndex(0) # Ensure text view is visible
         if not os.path.isfile(object_yy_path):
             error_msg = f"Object configuration file not found:\n{object_yy_path}"
             self.text_edit.setPlainText(error_msg); self.statusBar().showMessage("Error: Object .yy file not found."); QMessageBox.warning(self, "File Not Found", error_msg)
             return
         try:
-            with open(object_yy_path, 'r', encoding='utf-8') as f: file_content = f.read()
-            content_cleaned = re.sub(r",\s*([]}])", r"\1", file_content); object_data = json.loads(content_cleaned)
-            formatted_text = self.format_object_data(object_data); self.text_edit.setPlainText(formatted_text)
+            object_data = load_yy(object_yy_path)
+            formatted_text = self.format_object_data(object_data) + self.format_asset_dependencies(object_yy_path); self.text_edit.setPlainText(formatted_text)
             self.statusBar().showMessage(f"Viewing Object: {object_data.get('name', 'Unknown')}")
         except json.JSONDecodeError as e: error_msg = f"Error parsing object file:\n{object_yy_path}\n\nError: {e}\n\n(Check .yy file for syntax errors)"; self.text_edit.setPlainText(error_msg); self.statusBar().showMessage("Error: Failed to parse object .yy."); QMessageBox.warning(self, "JSON Parse Error", error_msg)
         except Exception as e: error_msg = f"An unexpected error occurred reading object file:\n{object_yy_path}\n\n{e}"; self.text_edit.setPlainText(error_msg); self.statusBar().showMessage("Error: Failed to read object .yy."); QMessageBox.critical(self, "Read Error", error_msg)
@@ -274,12 +1319,9 @@ class GmlViewerApp(QMainWindow):
 
         # Basic Properties
         output_lines.append("\n[Properties]")
-        sprite_id = data.get('spriteId')
-        output_lines.append(f"  Sprite: {sprite_id.get('name', 'None') if sprite_id else 'None'}")
-        mask_id = data.get('spriteMaskId')
-        output_lines.append(f"  Mask: {mask_id.get('name', 'Same as Sprite') if mask_id else 'Same as Sprite'}")
-        parent_id = data.get('parentObjectId')
-        output_lines.append(f"  Parent: {parent_id.get('name', 'None') if parent_id else 'None'}")
+        output_lines.append(f"  Sprite: {yy_ref_name(data.get('spriteId'), 'None')}")
+        output_lines.append(f"  Mask: {yy_ref_name(data.get('spriteMaskId'), 'Same as Sprite')}")
+        output_lines.append(f"  Parent: {yy_ref_name(data.get('parentObjectId'), 'None')}")
         output_lines.append(f"  Visible: {data.get('visible', True)}")
         output_lines.append(f"  Solid: {data.get('solid', False)}")
         output_lines.append(f"  Persistent: {data.get('persistent', False)}")
@@ -327,43 +1369,95 @@ class GmlViewerApp(QMainWindow):
     # <<<< ---- END Object Info Display Functions ---- >>>>
 
 
+    # <<<< ---- Sprite Display ---- >>>>
+    @perf.traced("view.sprite")
     def display_sprite_info(self, sprite_folder_path, sprite_name):
-        # (Unchanged)
-        first_png = None
-        try:
-            for filename in sorted(os.listdir(sprite_folder_path)):
-                if filename.lower().endswith(".png"): first_png = os.path.join(sprite_folder_path, filename); break
-        except OSError as e: error_msg = f"Error accessing sprite folder:\n{sprite_folder_path}\n\n{e}"; self.stacked_widget.setCurrentIndex(0); self.text_edit.setPlainText(error_msg); self.statusBar().showMessage(f"Error reading sprite folder: {sprite_name}"); QMessageBox.warning(self, "Folder Error", error_msg); return
-        if first_png:
-            pixmap = QPixmap(first_png)
-            if pixmap.isNull(): error_msg = f"Failed to load image file:\n{first_png}"; self.stacked_widget.setCurrentIndex(0); self.text_edit.setPlainText(error_msg); self.statusBar().showMessage(f"Error loading image for sprite: {sprite_name}"); QMessageBox.warning(self, "Image Load Error", error_msg)
-            else:
-                label_size = self.image_label.size(); pixmap_size = pixmap.size(); scaled_pixmap = pixmap
-                if pixmap_size.width() > label_size.width() or pixmap_size.height() > label_size.height():
-                    scaled_pixmap = pixmap.scaled(label_size, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
-                self.image_label.setPixmap(scaled_pixmap); self.stacked_widget.setCurrentIndex(1)
-                self.statusBar().showMessage(f"Displaying sprite: {sprite_name} ({pixmap_size.width()}x{pixmap_size.height()}) - Frame: {os.path.basename(first_png)}")
-        else: self.stacked_widget.setCurrentIndex(0); self.text_edit.setPlainText(f"No .png image frames found in sprite folder:\n{sprite_folder_path}"); self.statusBar().showMessage(f"No .png found for sprite: {sprite_name}")
+        """Shows a sprite's first frame; listing and decoding its frames happen on the sprite loader's threads."""
+        self._sprite_folder = sprite_folder_path; self._sprite_name = sprite_name; self._sprite_frames = []; self._sprite_frame = 0
+        self.sprite_loader.begin(self.image_label.size())
+        listed = self.sprite_loader.frames(sprite_folder_path)
+        if listed: self.on_sprite_frames_ready(sprite_folder_path, listed[0], listed[1], "")
+        else: self.image_label.setText(f"Loading sprite: {sprite_name}..."); self.sprite_loader.request_frames(sprite_folder_path, sprite_name)
+
+    def on_sprite_frames_ready(self, sprite_folder_path, frame_paths, fps, error):
+        if sprite_folder_path != self._sprite_folder or self._sprite_frames: return # A prefetched neighbour, or already shown
+        sprite_name = self._sprite_name
+        if error: error_msg = f"Error accessing sprite folder:\n{sprite_folder_path}\n\n{error}"; self.stop_sprite(); self.stacked_widget.setCurrentIndex(0); self.text_edit.setPlainText(error_msg); self.statusBar().showMessage(f"Error reading sprite folder: {sprite_name}"); QMessageBox.warning(self, "Folder Error", error_msg); return
+        if not frame_paths: self.stop_sprite(); self.stacked_widget.setCurrentIndex(0); self.text_edit.setPlainText(f"No .png image frames found in sprite folder:\n{sprite_folder_path}"); self.statusBar().showMessage(f"No .png found for sprite: {sprite_name}"); return
+        self._sprite_frames = frame_paths; self.sprite_timer.setInterval(max(int(1000 / fps), 10))
+        self.sprite_frame_slider.blockSignals(True); self.sprite_frame_slider.setRange(0, len(frame_paths) - 1); self.sprite_frame_slider.setValue(0); self.sprite_frame_slider.blockSignals(False)
+        self.sprite_controls.setEnabled(len(frame_paths) > 1)
+        self.show_sprite_frame(0)
+
+    def show_sprite_frame(self, frame):
+        """Displays a frame if it is decoded, otherwise requests it (on_sprite_image_ready shows it), and decodes the next frames ahead."""
+        if not self._sprite_frames: return
+        self._sprite_frame = frame; path = self._sprite_frames[frame]; entry = self.sprite_loader.cached(path)
+        if entry is not None: perf.count("image.cache_hits"); self._set_sprite_image(*entry)
+        elif self.sprite_loader.failed(path): self._sprite_image_failed(path); return
+        else: self.sprite_loader.request(path)
+        frame_count = len(self._sprite_frames)
+        for ahead in range(1, min(SPRITE_PLAY_AHEAD, frame_count - 1) + 1): self.sprite_loader.request(self._sprite_frames[(frame + ahead) % frame_count])
+
+    @perf.traced("image.show")
+    def _set_sprite_image(self, image, source_size):
+        self.image_label.setPixmap(QPixmap.fromImage(image)); self.stacked_widget.setCurrentIndex(1) # Already scaled to fit by the loader
+        frame_count = len(self._sprite_frames); self.sprite_frame_label.setText(f"{self._sprite_frame + 1}/{frame_count}")
+        if not self.sprite_timer.isActive(): self.statusBar().showMessage(f"Displaying sprite: {self._sprite_name} ({source_size.width()}x{source_size.height()}) - Frame: {os.path.basename(self._sprite_frames[self._sprite_frame])}" + (f" ({self._sprite_frame + 1} of {frame_count})" if frame_count > 1 else ""))
+
+    def _sprite_image_failed(self, path):
+        sprite_name = self._sprite_name; self.stop_sprite()
+        error_msg = f"Failed to load image file:\n{path}"; self.stacked_widget.setCurrentIndex(0); self.text_edit.setPlainText(error_msg); self.statusBar().showMessage(f"Error loading image for sprite: {sprite_name}"); QMessageBox.warning(self, "Image Load Error", error_msg)
+
+    def on_sprite_image_ready(self, path):
+        if self._sprite_frames and path == self._sprite_frames[self._sprite_frame]: self.show_sprite_frame(self._sprite_frame)
+
+    def set_sprite_playing(self, playing):
+        if playing and len(self._sprite_frames) > 1: self.sprite_timer.start(); self.sprite_play_button.setText("Pause")
+        else: self.sprite_timer.stop(); self.sprite_play_button.setText("Play")
+
+    def advance_sprite_frame(self):
+        # Only moves on once the next frame is decoded, so a slow decode delays playback instead of freezing the window
+        if not self._sprite_frames: self.sprite_timer.stop(); return
+        next_frame = (self._sprite_frame + 1) % len(self._sprite_frames); path = self._sprite_frames[next_frame]
+        if self.sprite_loader.cached(path) is None and not self.sprite_loader.failed(path): self.sprite_loader.request(path); return
+        self.sprite_frame_slider.setValue(next_frame) # Calls show_sprite_frame
+
+    def stop_sprite(self):
+        """Stops playback and forgets the displayed sprite."""
+        self.sprite_play_button.setChecked(False); self.sprite_timer.stop(); self.sprite_controls.setEnabled(False); self.sprite_frame_label.clear()
+        self._sprite_folder = None; self._sprite_name = None; self._sprite_frames = []; self._sprite_frame = 0
+
+    def prefetch_sprite_neighbours(self, index):
+        """Lists the sprites next to index in the tree and decodes their first frame, so stepping through sprites shows them at once."""
+        for offset in range(1, SPRITE_PREFETCH_NEIGHBOURS + 1):
+            for row in (index.row() + offset, index.row() - offset):
+                sibling = index.siblingAtRow(row)
+                if sibling.isValid() and sibling.data(ITEM_TYPE_ROLE) == "sprite_folder":
+                    self.sprite_loader.request_frames(sibling.data(ASSET_FOLDER_PATH_ROLE), sibling.data().split(": ")[-1], first_frame=True)
+    # <<<< ---- END Sprite Display ---- >>>>
 
     def show_tree_context_menu(self, position: QPoint):
         # (Unchanged)
         index = self.tree_view.indexAt(position);
         if not index.isValid(): return
-        item = self.model.itemFromIndex(index);
-        if not item: return
-        item_type = item.data(ITEM_TYPE_ROLE)
+        item_type = index.data(ITEM_TYPE_ROLE)
         menu = QMenu()
         if item_type in ["folder", "room_folder", "sprite_folder", "object_folder"]: # Allow create in object folders too
             create_action = QAction("Create New GML File...", self)
             create_action.triggered.connect(lambda checked=False, idx=index: self.create_new_gml_file(idx))
             menu.addAction(create_action)
+        if self.export_selected_action_ref.isEnabled(): menu.addAction(self.export_selected_action_ref)
+        asset_name = os.path.basename(index.data(ASSET_FOLDER_PATH_ROLE) or "")
+        if self.asset_graph is not None and asset_name in self.asset_graph.assets and self._export_worker is None:
+            export_deps_action = QAction(f"Export {asset_name} With Dependencies...", self); export_deps_action.triggered.connect(lambda checked=False, name=asset_name: self.export_with_dependencies(name)); menu.addAction(export_deps_action)
         if not menu.isEmpty(): menu.exec(self.tree_view.viewport().mapToGlobal(position))
 
     def create_new_gml_file(self, index: QModelIndex):
         # (Unchanged)
-        parent_item = self.model.itemFromIndex(index); item_type = parent_item.data(ITEM_TYPE_ROLE) if parent_item else None
-        if not parent_item or item_type not in ["folder", "room_folder", "sprite_folder", "object_folder"]: QMessageBox.warning(self, "Error", "Cannot create GML file here. Select an asset folder."); return
-        asset_folder_path = parent_item.data(ASSET_FOLDER_PATH_ROLE)
+        parent_node = self.model.node_from_index(index) if index.isValid() else None; item_type = parent_node.item_type if parent_node else None
+        if not parent_node or item_type not in ["folder", "room_folder", "sprite_folder", "object_folder"]: QMessageBox.warning(self, "Error", "Cannot create GML file here. Select an asset folder."); return
+        asset_folder_path = parent_node.path
         if not asset_folder_path or not os.path.isdir(asset_folder_path): QMessageBox.critical(self, "Error", f"Invalid asset folder path: {asset_folder_path}"); return
         default_name = "NewEvent_0.gml"
         file_name, ok = QInputDialog.getText(self, "Create New GML File", "Enter filename:", text=default_name)
@@ -374,92 +1468,184 @@ class GmlViewerApp(QMainWindow):
             if os.path.exists(new_file_path): QMessageBox.warning(self, "File Exists", f"File '{file_name}' already exists."); return
             try:
                 with open(new_file_path, 'w', encoding='utf-8') as f: f.write(f"/// @description {os.path.splitext(file_name)[0]}\n\n// Add your code here\n")
+                self.project_watcher.note_own_writes([new_file_path])
                 gml_display_name = os.path.splitext(file_name)[0]
-                new_item = QStandardItem(gml_display_name); new_item.setEditable(False)
-                new_item.setData(new_file_path, GML_FILE_PATH_ROLE); new_item.setData("file", ITEM_TYPE_ROLE); new_item.setData(relative_path, Qt.ItemDataRole.ToolTipRole)
-                parent_item.appendRow(new_item)
+                new_node = self.model.add_child(parent_node, gml_display_name, "file", new_file_path)
+                self._expand_node(parent_node); self.model.refresh_child_indicators()
                 # Find asset YY path to store with new GML detail
                 asset_name = os.path.basename(asset_folder_path)
                 potential_yy_path = os.path.join(asset_folder_path, f"{asset_name}.yy")
                 asset_yy_path = potential_yy_path if os.path.isfile(potential_yy_path) else None
-                full_display_name = f"{parent_item.text()} / {gml_display_name}"
+                full_display_name = f"{parent_node.text} / {gml_display_name}"
                 self.project_gml_files_details.append((full_display_name, new_file_path, relative_path, asset_yy_path)); self.project_gml_files_details.sort()
-                self.export_button.setEnabled(True); self.export_action_ref.setEnabled(True) # Enable export
+                self.update_search_index(new_file_path)
+                self.set_export_enabled(True) # Enable export
                 self.statusBar().showMessage(f"Created file: {relative_path}")
-                self.tree_view.setCurrentIndex(new_item.index()); self.on_tree_item_clicked(new_item.index())
+                new_index = self.model.index_for_node(new_node); self.tree_view.setCurrentIndex(new_index); self.on_tree_item_clicked(new_index)
             except Exception as e: QMessageBox.critical(self, "Creation Failed", f"Could not create file:\n{new_file_path}\n\nError: {e}"); self.statusBar().showMessage(f"Failed to create {file_name}")
 
     def save_current_gml(self):
-        # (Unchanged)
         if self.current_file_path and os.path.isfile(self.current_file_path):
+            if os.stat(self.current_file_path).st_mtime_ns != self.current_file_mtime:
+                answer = QMessageBox.question(self, "File Changed on Disk", f"{os.path.basename(self.current_file_path)} was changed outside VIBE2GML since you opened it.\n\nOverwrite those changes?")
+                if answer != QMessageBox.StandardButton.Yes: self.statusBar().showMessage("Save cancelled; file changed on disk."); return
             try:
                 current_content = self.text_edit.toPlainText()
-                with open(self.current_file_path, 'w', encoding='utf-8') as f: f.write(current_content)
+                write_text_atomic(self.current_file_path, current_content) # Never leaves a truncated file behind
+                self.project_watcher.note_own_writes([self.current_file_path]) # The temp file and rename would otherwise read as an outside change
+                st = os.stat(self.current_file_path); self.current_file_mtime = st.st_mtime_ns; self.text_edit.document().setModified(False)
+                self.gml_documents.update(self.current_file_path, st.st_mtime_ns, st.st_size)
+                self.update_search_index(self.current_file_path)
                 self.statusBar().showMessage(f"Saved: {self.current_display_name} ({os.path.basename(self.current_file_path)})")
             except Exception as e: QMessageBox.critical(self, "Save Failed", f"Could not save file:\n{self.current_file_path}\n\nError: {e}"); self.statusBar().showMessage(f"Error saving {os.path.basename(self.current_file_path)}")
         elif self.save_button.isEnabled(): QMessageBox.warning(self, "Save Error", "No valid GML file loaded to save."); self.statusBar().showMessage("No GML file loaded to save.")
 
-    def export_all_gml(self):
+    def paste_gml_batch(self):
+        """Applies many pasted GML sections (e.g. an LLM answer) after a diff preview, writing them as one atomic batch."""
+        if not self.project_root_path or self._scan_index is None: return
+        clipboard = QApplication.clipboard().text()
+        dialog = GmlBatchDialog(self.project_root_path, clipboard if "// ----- GML Path:" in clipboard else "", self)
+        if dialog.exec() != QDialog.DialogCode.Accepted or not dialog.changes: return
+        changes = dialog.changes; targets = {change.file_path for change in changes}
+        if self.current_file_path in targets and self.text_edit.document().isModified():
+            answer = QMessageBox.question(self, "Unsaved Edits", f"The batch replaces {os.path.basename(self.current_file_path)}, which has unsaved edits.\n\nApply anyway and discard them?")
+            if answer != QMessageBox.StandardButton.Yes: self.statusBar().showMessage("Batch not applied."); return
+        try: apply_gml_batch(changes)
+        except (OSError, ValueError) as e: QMessageBox.critical(self, "Batch Not Applied", f"No files were changed:\n\n{e}"); self.statusBar().showMessage("Batch not applied."); return
+        self.project_watcher.note_own_writes(targets)
+        new_asset_folders = set()
+        for change in changes:
+            self.gml_documents.discard(change.file_path)
+            asset_folder_path = os.path.dirname(change.file_path)
+            if change.old_text is None and asset_folder_path in self._scan_asset_nodes: new_asset_folders.add(asset_folder_path) # Tree node, details and search index
+            else: self.update_search_index(change.file_path)
+        for asset_folder_path in new_asset_folders: self._refresh_asset(asset_folder_path)
+        self.model.refresh_child_indicators(); self._scan_index.save(); self.set_export_enabled(bool(self.project_gml_files_details))
+        if self.current_file_path in targets: self.reload_current_gml()
+        created = sum(change.old_text is None for change in changes)
+        self.statusBar().showMessage(f"Applied GML batch: {len(changes)} files ({created} new, {len(changes) - created} changed)")
+
+    def set_export_enabled(self, enabled):
+        self.export_button.setEnabled(enabled); self.export_action_ref.setEnabled(enabled); self.export_changes_action_ref.setEnabled(enabled)
+        self.export_chunks_action_ref.setEnabled(enabled); self.export_selected_action_ref.setEnabled(enabled)
+
+    def selected_gml_details(self):
+        """project_gml_files_details entries under the tree selection: whole categories, asset folders or single files."""
+        file_paths = set(); asset_folders = set()
+        for index in self.tree_view.selectionModel().selectedIndexes():
+            node = self.model.node_from_index(index)
+            for selected in (node.children or ()) if node.item_type is None else (node,): # A category selects all its rows, fetched or not
+                if selected.item_type == "file": file_paths.add(selected.path)
+                else: asset_folders.add(selected.path)
+        return [detail for detail in self.project_gml_files_details if detail[1] in file_paths or os.path.dirname(detail[1]) in asset_folders]
+
+    def ask_chunk_tokens(self, gml_details, title, allow_single_file=False, asset_order=None):
+        """Shows the estimated export size and asks for a per-chunk token budget. Returns None if cancelled, 0 for a single file."""
+        sizes = measure_export_plan(build_export_plan(self.project_root_path, gml_details, asset_order), self.compact_yy_action_ref.isChecked()); total_bytes = sum(sizes)
+        label = f"{len(gml_details)} GML files, about {estimate_tokens(total_bytes):,} tokens ({total_bytes / 1024:,.0f} KB).\n\nMax tokens per chunk file" + (" (0 = single file):" if allow_single_file else ":")
+        tokens, ok = QInputDialog.getInt(self, title, label, self._chunk_tokens if not allow_single_file else 0, 0 if allow_single_file else 1000, 10000000, 1000)
+        if not ok: return None
+        if tokens: self._chunk_tokens = tokens
+        return tokens
+
+    def export_in_chunks(self):
+        """Exports the whole project split into chunk files that each fit a token budget."""
+        if not self.project_gml_files_details or not self.project_root_path: return
+        chunk_tokens = self.ask_chunk_tokens(self.project_gml_files_details, "Export in Chunks")
+        if chunk_tokens is None: return
+        default_filename = f"{os.path.basename(self.project_root_path)}_export.txt"
+        save_path, _ = QFileDialog.getSaveFileName(self, "Export in Chunks (files are named <name>_partNN.txt)", default_filename, "Text Files (*.txt);;All Files (*)")
+        if save_path: self.start_export(list(self.project_gml_files_details), save_path, chunk_tokens=chunk_tokens)
+
+    def export_selected(self):
+        """Exports the GML files (and their .yy) under the selected tree rows, optionally chunked."""
+        gml_details = self.selected_gml_details()
+        if not gml_details: QMessageBox.information(self, "Export Selected", "Select one or more categories, assets or GML files in the tree first."); return
+        chunk_tokens = self.ask_chunk_tokens(gml_details, "Export Selected Assets", allow_single_file=True)
+        if chunk_tokens is None: return
+        default_filename = f"{os.path.basename(self.project_root_path)}_selection.txt"
+        save_path, _ = QFileDialog.getSaveFileName(self, "Export Selected Assets", default_filename, "Text Files (*.txt);;All Files (*)")
+        if save_path: self.start_export(gml_details, save_path, chunk_tokens=chunk_tokens or None, partial=True)
+
+    def export_with_dependencies(self, asset_name):
+        """Exports one asset plus every asset it depends on (parents, sprites, objects placed in a room...), dependencies first."""
+        graph = self.asset_graph
+        if graph is None or asset_name not in graph.assets: return
+        asset_order = [graph.assets[name].yy_path for name in graph.dependency_order(graph.dependencies([asset_name]))]
+        wanted = set(asset_order); gml_details = [detail for detail in self.project_gml_files_details if detail[3] in wanted]
+        chunk_tokens = self.ask_chunk_tokens(gml_details, f"Export {asset_name} With Dependencies ({len(asset_order)} assets)", allow_single_file=True, asset_order=asset_order)
+        if chunk_tokens is None: return
+        save_path, _ = QFileDialog.getSaveFileName(self, f"Export {asset_name} With Dependencies", f"{asset_name}_with_deps.txt", "Text Files (*.txt);;All Files (*)")
+        if save_path: self.start_export(gml_details, save_path, chunk_tokens=chunk_tokens or None, partial=True, asset_order=asset_order)
+
+    def export_changes(self):
+        """Exports only the GML/YY sections added, changed or removed since the last export of this project."""
+        self.export_all_gml(delta=True)
+
+    def export_all_gml(self, delta=False):
         # <<<< MODIFIED to include YY file content >>>>
+        delta = delta is True # Qt passes the 'checked' flag here when connected directly
         if not self.project_gml_files_details: # Check the detailed list
             QMessageBox.information(self, "Export Error", "No GML files found or loaded to export."); return
         if not self.project_root_path:
              QMessageBox.warning(self, "Export Error", "Project path is not set."); return
 
-        default_filename = f"{os.path.basename(self.project_root_path)}_export.txt" # Changed suggested name
-        save_path, _ = QFileDialog.getSaveFileName(self, "Export All GML & YY Data", default_filename, "Text Files (*.txt);;All Files (*)") # Changed dialog title
+        default_filename = f"{os.path.basename(self.project_root_path)}_{'changes' if delta else 'export'}.txt" # Changed suggested name
+        save_path, _ = QFileDialog.getSaveFileName(self, "Export GML & YY Changes" if delta else "Export All GML & YY Data", default_filename, "Text Files (*.txt);;All Files (*)") # Changed dialog title
 
-        if save_path:
-            exported_yy_files = set() # Keep track of yy files already exported
-            try:
-                with open(save_path, 'w', encoding='utf-8') as outfile:
-                    outfile.write(f"// GML and YY Data Export from Project: {self.project_root_path}\n")
-                    outfile.write(f"// Total GML Files Found: {len(self.project_gml_files_details)}\n") # Use count from detailed list
-                    outfile.write("=" * 70 + "\n\n")
-
-                    # Iterate through the detailed list
-                    for display_name, file_path, relative_path, asset_yy_path in self.project_gml_files_details:
-                        # --- Write GML File Info ---
-                        outfile.write(f"// ----- Start GML: {display_name} -----\n")
-                        outfile.write(f"// ----- GML Path: {relative_path} -----\n\n")
-                        try:
-                            with open(file_path, 'r', encoding='utf-8') as infile:
-                                outfile.write(infile.read())
-                        except Exception as read_err:
-                             outfile.write(f"// ***** ERROR READING GML FILE: {relative_path} *****\n")
-                             outfile.write(f"// ***** Error: {read_err} *****\n")
-                        outfile.write("\n\n" + "-" * 50 + "[End GML]" + "-" * (70-50-9) + "\n\n") # GML Separator
-
-                        # --- Write Associated YY File Info (if not already written) ---
-                        if asset_yy_path and os.path.isfile(asset_yy_path) and asset_yy_path not in exported_yy_files:
-                             relative_yy_path = os.path.relpath(asset_yy_path, self.project_root_path)
-                             outfile.write(f"// ----- Associated YY File: {os.path.basename(os.path.dirname(asset_yy_path))} -----\n") # Asset Name
-                             outfile.write(f"// ----- YY Path: {relative_yy_path} -----\n\n")
-                             try:
-                                 with open(asset_yy_path, 'r', encoding='utf-8') as yyfile:
-                                     # Optionally clean before writing? For now, write raw.
-                                     # yy_content = yyfile.read()
-                                     # yy_content_cleaned = re.sub(r",\s*([]}])", r"\1", yy_content)
-                                     # outfile.write(yy_content_cleaned)
-                                     outfile.write(yyfile.read()) # Write raw content
-                             except Exception as read_err:
-                                 outfile.write(f"// ***** ERROR READING YY FILE: {relative_yy_path} *****\n")
-                                 outfile.write(f"// ***** Error: {read_err} *****\n")
-                             outfile.write("\n\n" + "=" * 30 + "[End YY]" + "=" * (70-30-8) + "\n\n") # YY Separator
-                             exported_yy_files.add(asset_yy_path) # Mark as exported
-
-
-                self.statusBar().showMessage(f"Successfully exported GML & YY data to {save_path}")
-                QMessageBox.information(self, "Export Complete", f"All GML code and associated YY data exported successfully to:\n{save_path}")
-            except Exception as write_err:
-                QMessageBox.critical(self, "Export Failed", f"An error occurred while writing the export file:\n{write_err}"); self.statusBar().showMessage("Export failed.")
+        if save_path: self.start_export(list(self.project_gml_files_details), save_path, delta=delta) # Copied since the watcher may patch the details meanwhile
+
+    def start_export(self, gml_details, save_path, delta=False, chunk_tokens=None, partial=False, asset_order=None):
+        """Runs an export of gml_details on a background thread."""
+        if self._export_worker is not None: return
+        self.set_export_enabled(False)
+        self._export_thread = QThread(self); self._export_worker = ExportWorker(self.project_root_path, gml_details, save_path, delta, chunk_tokens, partial, self.compact_yy_action_ref.isChecked(), asset_order)
+        self._export_worker.moveToThread(self._export_thread)
+        self._export_thread.started.connect(self._export_worker.run)
+        self._export_worker.progress.connect(self.on_export_progress)
+        self._export_worker.finished.connect(self.on_export_finished)
+        self._export_worker.finished.connect(self._export_thread.quit)
+        self._export_thread.finished.connect(self._export_worker.deleteLater); self._export_thread.finished.connect(self._export_thread.deleteLater)
+        self.cancel_export_button.show(); self.statusBar().showMessage(f"Exporting to {save_path}...")
+        self._export_thread.start()
+
+    def cancel_export(self, wait=False):
+        if self._export_worker is None: return
+        self._export_worker.cancel(); self.statusBar().showMessage("Cancelling export...")
+        if wait: self._export_thread.quit(); self._export_thread.wait()
+
+    def on_export_progress(self, done, total):
+        self.statusBar().showMessage(f"Exporting... {done}/{total} sections ({done * 100 // max(total, 1)}%)")
+
+    def on_export_finished(self, save_path, error, cancelled):
+        worker = self._export_worker; result = worker.result; delta = worker.delta; chunk_tokens = worker.chunk_tokens
+        self._export_worker = None; self._export_thread = None; self.cancel_export_button.hide()
+        enable_export = bool(self.project_gml_files_details)
+        self.set_export_enabled(enable_export)
+        if cancelled: self.statusBar().showMessage("Export cancelled.")
+        elif error: QMessageBox.critical(self, "Export Failed", f"An error occurred while writing the export file:\n{error}"); self.statusBar().showMessage("Export failed.")
+        elif delta:
+            self.statusBar().showMessage(f"Exported changes to {save_path}: {result.added} added, {result.changed} changed, {result.removed} removed")
+            if result.sections: QMessageBox.information(self, "Export Complete", f"GML and YY changes since the last export ({result.added} added, {result.changed} changed, {result.removed} removed) exported to:\n{save_path}")
+            else: QMessageBox.information(self, "Export Complete", f"No changes since the last export.\n\nAn empty change file was written to:\n{save_path}")
+        elif chunk_tokens:
+            chunk_files = [path for path in result.files if not path.endswith(".json")]
+            self.statusBar().showMessage(f"Exported {len(chunk_files)} chunk files of up to ~{chunk_tokens} tokens next to {save_path}")
+            QMessageBox.information(self, "Export Complete", f"Exported {len(chunk_files)} chunk files (~{chunk_tokens:,} tokens max each):\n" + "\n".join(os.path.basename(path) for path in result.files) + f"\n\nin {os.path.dirname(save_path)}")
+        else:
+            self.statusBar().showMessage(f"Successfully exported GML & YY data to {save_path} ({result.reused} unchanged files reused from cache)")
+            QMessageBox.information(self, "Export Complete", f"All GML code and associated YY data exported successfully to:\n{save_path}")
 
 
 # --- Main Execution ---
-if __name__ == '__main__':
+def main():
     app = QApplication(sys.argv)
     app.setApplicationName("VIBE2GML")
     app.setOrganizationName("YourNameOrCompany")
     window = GmlViewerApp()
     window.show()
-    sys.exit(app.exec())
\ No newline at end of file
+    sys.exit(app.exec())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,265 @@
+# vibe2gml benchmarks: generates synthetic GMS2 projects and times scanning, .yy parsing and export headlessly.
+# Run through the command line (see vibe2gml.py bench --help); results are JSON so runs can be compared across versions.
+#
+#   python vibe2gml.py bench [--objects N] [--events N] [--rooms N] [--instances N] [--repeat N] [-o results.json] [--compare baseline.json]
+#   python vibe2gml.py bench --project <existing project>
+import os
+import gc
+import json
+import time
+import random
+import shutil
+import platform
+import tempfile
+import statistics
+import tracemalloc
+
+from vibe2gml_core import (ScanIndex, ExportCache, GmlSearchIndex, AssetGraph, scan_project, export_project, yy_cache, load_yy, find_assets,
+                           find_room_files, load_room_table, analyze_rooms, HAVE_NUMPY)
+
+BENCH_RESULTS_VERSION = 1
+BENCH_PHASES = ("scan_cold", "scan_warm", "yy_parse", "export", "export_cached", "export_compact", "search_index", "asset_graph", "rooms")
+BENCH_OUTPUT_PHASES = ("export", "export_cached", "export_compact") # Also record the export's size, so raw and compact mode can be compared
+BENCH_REGRESSION_THRESHOLD = 0.10 # Slower than the baseline by more than this fraction counts as a regression
+
+# Event file name, eventType, eventNum; objects get the first N, in this order
+BENCH_EVENTS = [("Create_0", 0, 0), ("Step_0", 3, 0), ("Draw_0", 8, 0), ("Destroy_0", 1, 0), ("CleanUp_0", 12, 0), ("Draw_64", 8, 64),
+                ("Step_1", 3, 1), ("Step_2", 3, 2)] + [(f"Alarm_{i}", 2, i) for i in range(12)] + [(f"Other_{10 + i}", 7, 10 + i) for i in range(16)]
+
+
+# <<<< ---- Synthetic Project Generator ---- >>>>
+def gms_yy_text(data):
+    """JSON as GMS2 writes .yy files: one top-level member per line, list items on their own lines, other objects inline, trailing commas everywhere."""
+    def value(item, indent):
+        if isinstance(item, dict): return "{" + "".join(f"{json.dumps(key)}:{value(v, indent)}," for key, v in item.items()) + "}"
+        if isinstance(item, list):
+            if not item: return "[]"
+            return "[\n" + "".join(f"{'  ' * (indent + 1)}{value(v, indent + 1)},\n" for v in item) + "  " * indent + "]"
+        return json.dumps(item)
+    return "{\n" + "".join(f"  {json.dumps(key)}:{value(v, 1)},\n" for key, v in data.items()) + "}"
+
+def _ref(folder, name):
+    return {"name": name, "path": f"{folder}/{name}/{name}.yy"}
+
+def _gml_text(rng, name, event, lines, objects, scripts):
+    """Plausible GML: assignments, conditions and calls to the project's scripts and objects."""
+    out = [f"/// @description {event}", f"// {name}: generated for benchmarks", ""]
+    for i in range(lines):
+        kind = i % 5
+        if kind == 0: out.append(f"var value_{i} = {scripts[rng.randrange(len(scripts))] if scripts else 'abs'}(x + {rng.randrange(100)}, y);")
+        elif kind == 1: out.append(f"if (instance_exists({objects[rng.randrange(len(objects))]})) {{ hp -= {rng.randrange(1, 10)}; }}")
+        elif kind == 2: out.append(f"speed = lerp(speed, {rng.random():.3f}, 0.1); // smooth")
+        elif kind == 3: out.append(f"global.score_{rng.randrange(20)} += value_{i - 3};")
+        else: out.append(f'show_debug_message("{name} {event} step {i}");')
+    return "\n".join(out) + "\n"
+
+def _write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8', newline='\n') as f: f.write(text)
+
+def generate_project(root, objects=200, events=4, rooms=10, instances=500, scripts=50, sprites=20, lines=40, seed=0):
+    """Writes a synthetic GMS2 project (GMS-style .yy files with trailing commas, a .yyp, GML events and room creation code) to root.
+
+    Objects get the first `events` of BENCH_EVENTS; about one in four has a parent. Returns the generator settings and file counts.
+    """
+    rng = random.Random(seed); name = os.path.basename(os.path.normpath(root)) or "bench"
+    object_names = [f"obj_bench_{i}" for i in range(objects)]; script_names = [f"scr_bench_{i}" for i in range(scripts)]
+    sprite_names = [f"spr_bench_{i}" for i in range(sprites)]; room_names = [f"rm_bench_{i}" for i in range(rooms)]
+    gml_files = yy_files = 0; resources = []
+    for sprite in sprite_names:
+        frames = [{"$GMSpriteFrame": "v1", "%Name": f"frame_{i}", "name": f"frame_{i}", "resourceType": "GMSpriteFrame", "resourceVersion": "2.0"} for i in range(4)]
+        _write(os.path.join(root, "sprites", sprite, f"{sprite}.yy"), gms_yy_text({
+            "$GMSprite": "v2", "%Name": sprite, "bboxMode": 0, "bbox_bottom": 31, "bbox_left": 0, "bbox_right": 31, "bbox_top": 0, "frames": frames,
+            "height": 32, "name": sprite, "origin": 4, "parent": {"name": "Sprites", "path": "folders/Sprites.yy"}, "resourceType": "GMSprite", "resourceVersion": "2.0",
+            "sequence": {"$GMSequence": "v1", "%Name": sprite, "playback": 1, "playbackSpeed": 30.0, "playbackSpeedType": 0, "length": 4.0, "name": sprite},
+            "textureGroupId": {"name": "Default", "path": "texturegroups/Default"}, "width": 32}))
+        yy_files += 1; resources.append(_ref("sprites", sprite))
+    for script in script_names:
+        folder = os.path.join(root, "scripts", script)
+        _write(os.path.join(folder, f"{script}.gml"), f"/// @function {script}(a, b)\nfunction {script}(a, b) {{\n" + "".join(f"    var t{i} = a * {i} + b;\n" for i in range(lines // 2)) + "    return a + b;\n}\n")
+        _write(os.path.join(folder, f"{script}.yy"), gms_yy_text({"$GMScript": "v1", "%Name": script, "isCompatibility": False, "isDnD": False, "name": script,
+                                                               "parent": {"name": "Scripts", "path": "folders/Scripts.yy"}, "resourceType": "GMScript", "resourceVersion": "2.0"}))
+        gml_files += 1; yy_files += 1; resources.append(_ref("scripts", script))
+    for i, obj in enumerate(object_names):
+        folder = os.path.join(root, "objects", obj); object_events = BENCH_EVENTS[:events]
+        for event, _, _ in object_events: _write(os.path.join(folder, f"{event}.gml"), _gml_text(rng, obj, event, lines, object_names, script_names)); gml_files += 1
+        parent = _ref("objects", object_names[rng.randrange(i)]) if i and rng.random() < 0.25 else None
+        _write(os.path.join(folder, f"{obj}.yy"), gms_yy_text({
+            "$GMObject": "", "%Name": obj,
+            "eventList": [{"$GMEvent": "v1", "%Name": "", "collisionObjectId": None, "eventNum": num, "eventType": kind, "isDnD": False, "name": "", "resourceType": "GMEvent", "resourceVersion": "2.0"}
+                          for _, kind, num in object_events],
+            "managed": True, "name": obj, "overriddenProperties": [], "parent": {"name": "Objects", "path": "folders/Objects.yy"}, "parentObjectId": parent, "persistent": False,
+            "physicsAngularDamping": 0.1, "physicsDensity": 0.5, "physicsFriction": 0.2, "physicsGroup": 1, "physicsKinematic": False, "physicsLinearDamping": 0.1,
+            "physicsObject": False, "physicsRestitution": 0.1, "physicsSensor": False, "physicsShape": 1, "physicsShapePoints": [], "physicsStartAwake": True,
+            "properties": [], "resourceType": "GMObject", "resourceVersion": "2.0", "solid": False,
+            "spriteId": _ref("sprites", sprite_names[i % len(sprite_names)]) if sprite_names else None, "spriteMaskId": None, "visible": True}))
+        yy_files += 1; resources.append(_ref("objects", obj))
+    for i, room in enumerate(room_names):
+        folder = os.path.join(root, "rooms", room); width, height = 1366 + 640 * (i % 4), 768 + 360 * (i % 4)
+        placed = [{"$GMRInstance": "v1", "%Name": f"inst_{i}_{k}", "colour": 4294967295, "frozen": False, "hasCreationCode": False, "ignore": False, "imageIndex": 0,
+                   "imageSpeed": 1.0, "inheritCode": False, "inheritedItemId": None, "inheritItemSettings": False, "isDnd": False, "name": f"inst_{i}_{k}",
+                   "objectId": _ref("objects", object_names[rng.randrange(len(object_names))]), "properties": [], "resourceType": "GMRInstance", "resourceVersion": "2.0",
+                   "rotation": 0.0, "scaleX": 1.0, "scaleY": 1.0, "x": float(rng.randrange(-16, width + 16)), "y": float(rng.randrange(-16, height + 16))}
+                  for k in range(instances if object_names else 0)]
+        has_code = i % 2 == 0
+        if has_code: _write(os.path.join(folder, "RoomCreationCode.gml"), _gml_text(rng, room, "RoomCreationCode", lines, object_names or ["noone"], script_names)); gml_files += 1
+        layer_defaults = {"depth": 0, "effectEnabled": True, "effectType": None, "gridX": 32, "gridY": 32, "hierarchyFrozen": False, "inheritLayerDepth": False,
+                          "inheritLayerSettings": False, "inheritSubLayers": True, "inheritVisibility": True, "layers": [], "properties": [], "resourceVersion": "2.0",
+                          "userdefinedDepth": False, "visible": True}
+        _write(os.path.join(folder, f"{room}.yy"), gms_yy_text({
+            "$GMRoom": "v1", "%Name": room, "creationCodeFile": f"rooms/{room}/RoomCreationCode.gml" if has_code else "", "inheritCode": False, "inheritCreationOrder": False,
+            "inheritLayers": False, "instanceCreationOrder": [{"name": inst["name"], "path": f"rooms/{room}/{room}.yy"} for inst in placed], "isDnd": False,
+            "layers": [dict({"$GMRInstanceLayer": "", "%Name": "Instances", "instances": placed, "name": "Instances", "resourceType": "GMRInstanceLayer"}, **layer_defaults),
+                       dict({"$GMRBackgroundLayer": "", "%Name": "Background", "animationFPS": 15.0, "animationSpeedType": 0, "colour": 4278190080, "hspeed": 0.0,
+                             "htiled": False, "name": "Background", "resourceType": "GMRBackgroundLayer", "spriteId": None, "stretch": False, "vspeed": 0.0, "vtiled": False,
+                             "x": 0, "y": 0}, **layer_defaults)],
+            "name": room, "parent": {"name": "Rooms", "path": "folders/Rooms.yy"}, "parentRoom": None,
+            "physicsSettings": {"inheritPhysicsSettings": False, "PhysicsWorld": False, "PhysicsWorldGravityX": 0.0, "PhysicsWorldGravityY": 10.0, "PhysicsWorldPixToMetres": 0.1},
+            "resourceType": "GMRoom", "resourceVersion": "2.0", "roomSettings": {"Height": height, "inheritRoomSettings": False, "persistent": False, "Width": width},
+            "sequenceId": None,
+            "views": [{"hborder": 32, "hport": 768, "hspeed": -1, "hview": 768, "inherit": False, "objectId": None, "vborder": 32, "visible": False, "vspeed": -1,
+                       "wport": 1366, "wview": 1366, "xport": 0, "xview": 0, "yport": 0, "yview": 0} for _ in range(8)],
+            "viewSettings": {"clearDisplayBuffer": True, "clearViewBackground": False, "enableViews": False, "inheritViewSettings": False}, "volume": 1.0}))
+        yy_files += 1; resources.append(_ref("rooms", room))
+    _write(os.path.join(root, "options", "main", "options_main.yy"), gms_yy_text({"$GMMainOptions": "v1", "%Name": "Main", "name": "Main", "option_gameguid": "00000000-0000-0000-0000-000000000000"}))
+    _write(os.path.join(root, f"{name}.yyp"), gms_yy_text({
+        "$GMProject": "v1", "%Name": name, "AudioGroups": [], "configs": {"children": [], "name": "Default"}, "defaultScriptType": 1,
+        "Folders": [{"$GMFolder": "", "%Name": folder, "folderPath": f"folders/{folder}.yy", "name": folder, "resourceType": "GMFolder", "resourceVersion": "2.0"}
+                    for folder in ("Objects", "Rooms", "Scripts", "Sprites")],
+        "isEcma": False, "LibraryEmitters": [], "MetaData": {"IDEVersion": "2024.8.1.171"}, "name": name, "resources": [{"id": ref} for ref in resources],
+        "resourceType": "GMProject", "resourceVersion": "2.0", "RoomOrderNodes": [{"roomId": _ref("rooms", room)} for room in room_names], "templateType": None,
+        "TextureGroups": []}))
+    return {"objects": objects, "events": events, "rooms": rooms, "instances": instances, "scripts": scripts, "sprites": sprites, "lines": lines, "seed": seed,
+            "gml_files": gml_files, "yy_files": yy_files + 1}
+
+def synthetic_room(name, instances, objects=32, width=4096, height=4096, seed=0):
+    """Parsed room .yy data with randomly placed instances, for benchmarks. About 1% are stacked and some are out of bounds."""
+    rng = random.Random(seed); n_layers = max(1, min(4, instances // 1000)); layers = [[] for _ in range(n_layers)]
+    for i in range(instances):
+        layer = layers[i % n_layers]
+        if i % 97 == 96 and layer: obj_name, x, y = layer[-1]["objId"]["name"], layer[-1]["x"], layer[-1]["y"] # Stacked on the previous one
+        else: obj_name, x, y = f"obj_{rng.randrange(objects)}", float(rng.randrange(-32, width + 32)), float(rng.randrange(-32, height + 32))
+        layer.append({"$GMRInstance": "v1", "name": f"inst_{i}", "objId": {"name": obj_name, "path": f"objects/{obj_name}/{obj_name}.yy"},
+                      "x": x, "y": y, "scaleX": 1.0, "scaleY": 1.0, "rotation": 0.0, "colour": 4294967295})
+    return {"name": name, "layers": [{"__type": "GMInstanceLayer", "name": f"Instances_{i}", "instances": layer} for i, layer in enumerate(layers)],
+            "roomSettings": {"Width": width, "Height": height}, "isPersistent": False}
+# <<<< ---- END Synthetic Project Generator ---- >>>>
+
+
+# <<<< ---- Benchmark Runner ---- >>>>
+def _folder_bytes(root):
+    return sum(entry.stat().st_size for folder, _, files in os.walk(root) for entry in os.scandir(folder) if entry.is_file())
+
+def _measure(run, repeat):
+    """(wall times of `repeat` runs, tracemalloc peak bytes of one extra run, files handled by the last run)."""
+    times = []
+    for _ in range(max(1, repeat)):
+        gc.collect(); start = time.perf_counter(); files = run(); times.append(time.perf_counter() - start)
+    gc.collect(); tracemalloc.start() # A separate run: tracing slows allocations down too much to time under it
+    try: run(); peak = tracemalloc.get_traced_memory()[1]
+    finally: tracemalloc.stop()
+    return times, peak, files
+
+def run_benchmarks(project_root, repeat=3, phases=BENCH_PHASES, work_dir=None, progress=None):
+    """Times each phase on project_root (read-only; exports and caches go to work_dir). Returns {phase: result dict}.
+
+    Caches are isolated through VIBE2GML_CACHE_DIR so the user's own scan/export caches are never touched or reused.
+    """
+    work_dir = work_dir or tempfile.mkdtemp(prefix="vibe2gml_bench_")
+    old_cache_dir = os.environ.get("VIBE2GML_CACHE_DIR"); os.environ["VIBE2GML_CACHE_DIR"] = os.path.join(work_dir, "cache")
+    export_path = os.path.join(work_dir, "export.txt")
+    try:
+        details = scan_project(project_root, ScanIndex(project_root)) # Also warms the OS file cache, so every phase starts from the same state
+        yy_paths = [yy_path for kind, _, yy_path in find_assets(project_root, ("Objects", "Rooms"))] # What display_object_info/display_room_info load
+
+        def scan_cold():
+            index = ScanIndex(project_root); index.clear(); return len(scan_project(project_root, index))
+        def scan_warm():
+            index = ScanIndex(project_root); index.load(); return len(scan_project(project_root, index))
+        def yy_parse():
+            yy_cache.clear()
+            for yy_path in yy_paths: load_yy(yy_path)
+            return len(yy_paths)
+        def export():
+            export_project(project_root, details, export_path); return len(details)
+        def export_cached():
+            cache = ExportCache(project_root); cache.open()
+            try: export_project(project_root, details, export_path, cache=cache); return len(details)
+            finally: cache.close()
+        def export_compact():
+            export_project(project_root, details, export_path, yy_compact=True); return len(details)
+        def search_index():
+            index = GmlSearchIndex(project_root); index.build(details); return len(index.files)
+        def asset_graph():
+            graph = AssetGraph(project_root); graph.build(); return len(graph.assets)
+        def rooms():
+            yy_cache.clear(); table, _ = load_room_table(find_room_files(project_root)); analyze_rooms(table); return len(table.rooms)
+
+        runners = {"scan_cold": scan_cold, "scan_warm": scan_warm, "yy_parse": yy_parse, "export": export, "export_cached": export_cached,
+                   "export_compact": export_compact, "search_index": search_index, "asset_graph": asset_graph, "rooms": rooms}
+        scan_warm(); export_cached() # Prime the scan index and export cache the warm phases reuse
+        results = {}
+        for phase in phases:
+            if progress: progress(phase)
+            times, peak, files = _measure(runners[phase], repeat); best = min(times)
+            results[phase] = {"best_s": round(best, 6), "median_s": round(statistics.median(times), 6), "runs_s": [round(t, 6) for t in times],
+                              "files": files, "files_per_s": round(files / best, 1) if best else None, "peak_mb": round(peak / (1024 * 1024), 2)}
+            if phase in BENCH_OUTPUT_PHASES: results[phase]["output_bytes"] = os.path.getsize(export_path)
+        yy_cache.clear()
+        return results
+    finally:
+        if old_cache_dir is None: os.environ.pop("VIBE2GML_CACHE_DIR", None)
+        else: os.environ["VIBE2GML_CACHE_DIR"] = old_cache_dir
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+def benchmark(project_root=None, repeat=3, phases=BENCH_PHASES, keep_dir=None, progress=None, **generator_settings):
+    """Benchmarks an existing project, or a generated one (in keep_dir if given, else a temp folder that is removed). Returns the results document."""
+    generated = project_root is None; temp_root = None
+    if generated:
+        if keep_dir: project_root = os.path.abspath(keep_dir)
+        else: temp_root = tempfile.mkdtemp(prefix="vibe2gml_project_"); project_root = os.path.join(temp_root, "bench_project")
+        if progress: progress("generate")
+        start = time.perf_counter(); project = generate_project(project_root, **generator_settings); project["generate_s"] = round(time.perf_counter() - start, 3)
+    else: project = {"path": os.path.abspath(project_root)}
+    try:
+        project["bytes"] = _folder_bytes(project_root)
+        phase_results = run_benchmarks(project_root, repeat, phases, progress=progress)
+    finally:
+        if temp_root: shutil.rmtree(temp_root, ignore_errors=True)
+    try: import resource; max_rss_mb = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024 if platform.system() == "Darwin" else 1024), 1) # ru_maxrss: bytes on macOS, KB elsewhere
+    except ImportError: max_rss_mb = None # Not available on Windows
+    return {"version": BENCH_RESULTS_VERSION, "created": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": platform.python_version(), "platform": platform.platform(),
+            "cpu_count": os.cpu_count(), "numpy": HAVE_NUMPY, "generated": generated, "project": project, "repeat": repeat, "max_rss_mb": max_rss_mb, "phases": phase_results}
+
+def format_results(results):
+    """Table of a results document."""
+    project = results["project"]
+    size = f"{project.get('gml_files', '?')} GML, {project.get('yy_files', '?')} .yy" if results["generated"] else project.get("path", "")
+    lines = [f"vibe2gml benchmark - {size}, {project['bytes'] / (1024 * 1024):.1f} MB - Python {results['python']}, best of {results['repeat']}",
+             f"{'phase':<15}{'best ms':>10}{'median ms':>11}{'files':>8}{'files/s':>11}{'peak MB':>9}{'output MB':>11}"]
+    for phase, result in results["phases"].items():
+        output = f"{result['output_bytes'] / (1024 * 1024):>11.2f}" if "output_bytes" in result else ""
+        lines.append(f"{phase:<15}{result['best_s'] * 1000:>10.1f}{result['median_s'] * 1000:>11.1f}{result['files']:>8}{result['files_per_s'] or 0:>11.0f}{result['peak_mb']:>9.1f}{output}")
+    if results.get("max_rss_mb"): lines.append(f"Process peak RSS: {results['max_rss_mb']} MB")
+    return "\n".join(lines)
+
+def compare_results(baseline, results, threshold=BENCH_REGRESSION_THRESHOLD):
+    """(report lines, regressed phases) for phases present in both documents.
+
+    A phase regresses when it got slower than the baseline by more than threshold; an export phase also when
+    its output grew by more than threshold (reported as "<phase> size").
+    """
+    lines = [f"{'phase':<15}{'baseline ms':>12}{'now ms':>10}{'change':>9}{'size':>9}"]; regressions = []
+    for phase, result in results["phases"].items():
+        old = baseline.get("phases", {}).get(phase)
+        if not old or not old.get("best_s"): continue
+        change = result["best_s"] / old["best_s"] - 1; flags = []
+        if change > threshold: regressions.append(phase); flags.append("REGRESSION")
+        size = ""
+        if old.get("output_bytes") and "output_bytes" in result:
+            size_change = result["output_bytes"] / old["output_bytes"] - 1; size = f"{size_change:>+9.0%}"
+            if size_change > threshold: regressions.append(f"{phase} size"); flags.append("LARGER")
+        lines.append(f"{phase:<15}{old['best_s'] * 1000:>12.1f}{result['best_s'] * 1000:>10.1f}{change:>+9.0%}{size:>9}" + "".join(f"  {flag}" for flag in flags))
+    if baseline.get("project", {}).get("gml_files") != results["project"].get("gml_files"): lines.append("(Note: the baseline was run on a different project size)")
+    return lines, regressions
+# <<<< ---- END Benchmark Runner ---- >>>>
@@ -0,0 +1,1365 @@
+# vibe2gml core: project scanning, .yy loading and export without any Qt dependency.
+# Used by the GUI (vibe2gml_01_alpha.py) and the command line (vibe2gml.py).
+import os
+import json # Used for Room/Object parsing
+import re # Used for cleaning JSON
+import time
+import threading
+import hashlib # Used for cache file names and export content hashes
+import functools # Used for performance trace decorators
+import shutil
+import difflib # Used for batch apply previews
+import sqlite3 # Used for the export section cache
+from array import array # Used for room instance columns
+from collections import Counter, OrderedDict, deque, namedtuple # Used for Room instance counting / yy cache / export
+from concurrent.futures import ThreadPoolExecutor
+from itertools import accumulate, repeat # Used for yy trailing comma stripping
+
+# Tree category display name -> project sub folder
+ASSET_CATEGORIES = { "Objects": "objects", "Scripts": "scripts", "Rooms": "rooms", "Sprites": "sprites", "Notes": "notes", "Tile Sets": "tilesets", "Timelines": "timelines", "Fonts": "fonts", "Sounds": "sounds", "Extensions": "extensions" }
+SKIPPED_TOP_DIRS = ['options', 'datafiles', 'configs', '.git', '.vscode', 'temp'] # Never searched for GML
+SCAN_BATCH_SIZE = 200 # GML records per batch sent from the scan worker to the tree
+
+def decode_text(data, errors='strict'):
+    """UTF-8 bytes to text with universal newlines, as a text mode read would give. Raises UnicodeDecodeError."""
+    text = data.decode('utf-8', errors)
+    if '\r' in text: text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
+
+def read_text(path, errors='strict'):
+    """Same result as open(path, encoding='utf-8').read(), but decoded in one pass (several times faster on big files). Raises OSError/UnicodeDecodeError."""
+    with open(path, 'rb') as f: return decode_text(f.read(), errors)
+
+def find_assets(project_root, categories=None):
+    """(category display name, asset name, .yy path) of every <category>/<name>/<name>.yy asset, by category then name."""
+    assets = []
+    for display_name, folder_name in ASSET_CATEGORIES.items():
+        if categories is not None and display_name not in categories: continue
+        category_folder_path = os.path.join(project_root, folder_name)
+        try: names = sorted(entry.name for entry in os.scandir(category_folder_path) if entry.is_dir())
+        except OSError: continue
+        for name in names:
+            yy_path = os.path.join(category_folder_path, name, f"{name}.yy")
+            if os.path.isfile(yy_path): assets.append((display_name, name, yy_path))
+    return assets
+
+def get_asset_kind(display_name):
+    """Returns (asset display prefix, ITEM_TYPE_ROLE value) for assets in a tree category."""
+    asset_type_prefix = display_name[:-1] if display_name.endswith('s') else display_name
+    item_type = "folder"
+    if display_name == "Objects": item_type = "object_folder"
+    elif display_name == "Rooms": item_type = "room_folder"
+    elif display_name == "Sprites": item_type = "sprite_folder"
+    return asset_type_prefix, item_type
+
+
+# <<<< ---- Performance Trace ---- >>>>
+PERF_MAX_EVENTS = 200000 # Trace events kept for save_chrome_trace (oldest dropped first); phase totals cover every span
+PERF_ENV_VAR = "VIBE2GML_PERF" # Set to 1 to record from startup
+
+PerfPhase = namedtuple('PerfPhase', 'name calls total_s max_s')
+
+class _NullSpan:
+    __slots__ = ()
+    def __enter__(self): return self
+    def __exit__(self, *exc_info): return False
+
+_NULL_SPAN = _NullSpan()
+
+class _Span:
+    __slots__ = ('trace', 'name', 'args', 'start')
+    def __init__(self, trace, name, args):
+        self.trace = trace; self.name = name; self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter(); return self
+
+    def __exit__(self, *exc_info):
+        self.trace.record(self.name, self.start, time.perf_counter(), self.args); return False
+
+class PerfTrace:
+    """Opt-in timings of hot paths (scan, .yy parsing, export, clicks, image decoding) and counters, for the diagnostics panel and bug reports.
+
+    Disabled (the default), span() returns a shared no-op context manager and count()/traced functions return after one
+    attribute check. Enabled, each span adds to its phase totals and to a bounded event list that save_chrome_trace()
+    writes in the Chrome trace format (chrome://tracing, ui.perfetto.dev). Thread-safe.
+    """
+    def __init__(self, max_events=PERF_MAX_EVENTS):
+        self.enabled = False; self._lock = threading.Lock(); self._origin = time.perf_counter()
+        self.events = deque(maxlen=max_events); self.dropped = 0 # (name, thread id, start, end, args or None); events pushed out by newer ones
+        self.phases = {} # {name: [calls, total_s, max_s]}
+        self.counters = {} # {name: value}
+        self.latest = {} # {category (name up to the first '.'): (name, seconds) of its most recent span}
+        self._threads = {} # {thread id: thread name}
+
+    def enable(self, enabled=True):
+        self.enabled = enabled
+
+    def clear(self):
+        with self._lock: self.events.clear(); self.phases.clear(); self.counters.clear(); self._threads.clear(); self.latest.clear(); self.dropped = 0
+
+    def span(self, name, **args):
+        """Context manager timing its block as phase name; args (JSON values) are attached to the trace event."""
+        return _Span(self, name, args or None) if self.enabled else _NULL_SPAN
+
+    def traced(self, name):
+        """Decorator timing every call of a function as phase name while recording is enabled."""
+        def decorate(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled: return func(*args, **kwargs)
+                with _Span(self, name, None): return func(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def count(self, name, n=1):
+        if not self.enabled: return
+        with self._lock: self.counters[name] = self.counters.get(name, 0) + n
+
+    def record(self, name, start, end, args=None):
+        """Adds a finished span (perf_counter start/end)."""
+        thread = threading.current_thread(); elapsed = end - start
+        with self._lock:
+            phase = self.phases.get(name)
+            if phase is None: self.phases[name] = [1, elapsed, elapsed]
+            else: phase[0] += 1; phase[1] += elapsed; phase[2] = max(phase[2], elapsed)
+            if len(self.events) == self.events.maxlen: self.dropped += 1
+            self.events.append((name, thread.ident, start, end, args)); self.latest[name.split('.', 1)[0]] = (name, elapsed)
+            if thread.ident not in self._threads: self._threads[thread.ident] = thread.name
+
+    def summary(self):
+        """(PerfPhase per phase, most total time first; copy of the counters)."""
+        with self._lock: phases = [PerfPhase(name, *values) for name, values in self.phases.items()]; counters = dict(self.counters)
+        return sorted(phases, key=lambda phase: -phase.total_s), counters
+
+    def format_summary(self):
+        phases, counters = self.summary()
+        if not phases and not counters: return "No timings recorded yet." if self.enabled else "Recording is off."
+        lines = [f"{'phase':<28}{'calls':>8}{'total ms':>11}{'mean ms':>10}{'max ms':>10}"]
+        lines += [f"{phase.name:<28}{phase.calls:>8}{phase.total_s * 1000:>11.1f}{phase.total_s * 1000 / phase.calls:>10.2f}{phase.max_s * 1000:>10.1f}" for phase in phases]
+        if counters: lines += ["", f"{'counter':<28}{'value':>8}"] + [f"{name:<28}{value:>8}" for name, value in sorted(counters.items())]
+        return "\n".join(lines)
+
+    def chrome_trace(self):
+        """The recorded spans as a Chrome trace document: complete ("X") events in microseconds since the trace started, per thread."""
+        pid = os.getpid()
+        with self._lock: events = list(self.events); threads = dict(self._threads); counters = dict(self.counters); dropped = self.dropped
+        trace_events = [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}} for tid, name in threads.items()]
+        for name, tid, start, end, args in events:
+            event = {"name": name, "cat": name.split(".")[0], "ph": "X", "pid": pid, "tid": tid, "ts": round((start - self._origin) * 1e6, 1), "dur": round((end - start) * 1e6, 1)}
+            if args: event["args"] = args
+            trace_events.append(event)
+        if counters: trace_events.append({"name": "counters", "ph": "C", "pid": pid, "tid": 0, "ts": round((time.perf_counter() - self._origin) * 1e6, 1), "args": counters})
+        return {"traceEvents": trace_events, "displayTimeUnit": "ms", "otherData": {"app": "vibe2gml", "dropped_events": dropped}}
+
+    def save_chrome_trace(self, path):
+        """Writes chrome_trace() as JSON to path. Raises OSError."""
+        write_text_atomic(path, json.dumps(self.chrome_trace()))
+
+perf = PerfTrace() # Shared by the core, the GUI and the command line
+perf.enable(os.environ.get(PERF_ENV_VAR, "0") not in ("", "0"))
+# <<<< ---- END Performance Trace ---- >>>>
+
+
+# <<<< ---- YY Loading Layer ---- >>>>
+YY_TRAILING_COMMA_RE = re.compile(rb",(?=\s*[]}])") # GMS2 writes a comma after the last member of every object/array
+YY_STRING_OR_TRAILING_COMMA_RE = re.compile(rb'("[^"\\]*(?:\\.[^"\\]*)*")|,(?=\s*[]}])') # Slower; for sources with escaped quotes
+YY_CACHE_MAX_ENTRIES = 512
+YY_CACHE_MAX_BYTES = 128 * 1024 * 1024 # Sum of source .yy sizes kept parsed in memory
+
+def parse_yy(data):
+    """Parses .yy bytes, tolerating GMS trailing commas. Raises json.JSONDecodeError.
+
+    Tries the C JSON decoder as-is first (it fails fast, at the first trailing comma), then strips the
+    trailing commas found by a lookahead-only pattern, skipping any inside strings (see _strip_trailing_commas).
+    json.loads on bytes also accepts a UTF-8 BOM and skips a separate decode copy.
+    """
+    with perf.span("yy.json_as_is"):
+        try: return json.loads(data)
+        except json.JSONDecodeError: pass
+    with perf.span("yy.strip_commas"): data = _strip_trailing_commas(data)
+    with perf.span("yy.json"): return json.loads(data)
+
+def _strip_trailing_commas(data):
+    """Drops trailing commas, leaving ", }" and ", ]" inside strings alone.
+
+    A comma is inside a string when an odd number of quotes precede it, so the pieces between matches are
+    quote-counted in C and only joined comma by comma when one of them is odd. That only holds without escaped
+    quotes; sources with any go through a regex that walks every string.
+    """
+    if b'\\"' in data: return YY_STRING_OR_TRAILING_COMMA_RE.sub(rb"\1", data)
+    pieces = YY_TRAILING_COMMA_RE.split(data)
+    parities = [quotes & 1 for quotes in accumulate(map(bytes.count, pieces[:-1], repeat(b'"')))]
+    if not any(parities): return b"".join(pieces)
+    joined = [pieces[0]]
+    for in_string, piece in zip(parities, pieces[1:]): joined.append(b"," + piece if in_string else piece)
+    return b"".join(joined)
+
+class YyCache:
+    """Thread-safe LRU of parsed .yy files keyed on path and validated by (mtime, size).
+
+    Returned dicts are shared between callers and must be treated as read-only.
+    """
+    def __init__(self, max_entries=YY_CACHE_MAX_ENTRIES, max_bytes=YY_CACHE_MAX_BYTES):
+        self.max_entries = max_entries; self.max_bytes = max_bytes
+        self._entries = OrderedDict() # {path: ((mtime_ns, size), data)}
+        self._total_bytes = 0; self._lock = threading.Lock()
+        self.hits = 0; self.misses = 0
+
+    def load(self, path, store=True):
+        """Returns the parsed content of path. Raises OSError or json.JSONDecodeError.
+
+        store=False still returns a cached parse but doesn't keep a new one, for passes over every .yy of a
+        project that would otherwise evict what the views keep reusing.
+        """
+        st = os.stat(path); key = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry and entry[0] == key: self._entries.move_to_end(path); self.hits += 1; perf.count("yy.cache_hits"); return entry[1]
+        with perf.span("yy.read"):
+            with open(path, 'rb') as f: source = f.read()
+        data = parse_yy(source); perf.count("yy.bytes_parsed", len(source)) # Parsed outside the lock so threads don't serialise
+        with self._lock:
+            self.misses += 1
+            if not store: return data
+            old = self._entries.pop(path, None)
+            if old: self._total_bytes -= old[0][1]
+            self._entries[path] = (key, data); self._total_bytes += st.st_size
+            while self._entries and (len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes):
+                _, (old_key, _) = self._entries.popitem(last=False); self._total_bytes -= old_key[1]
+        return data
+
+    def clear(self):
+        with self._lock: self._entries.clear(); self._total_bytes = 0
+
+yy_cache = YyCache() # Shared by the room/object views, the export and any other .yy readers
+
+def load_yy(path, store=True):
+    """Parsed .yy file through the shared cache (see YyCache.load). Raises OSError or json.JSONDecodeError."""
+    return yy_cache.load(path, store)
+# <<<< ---- END YY Loading Layer ---- >>>>
+
+
+# <<<< ---- Sprite Frames ---- >>>>
+SPRITE_DEFAULT_FPS = 15.0
+SPRITE_GAME_SPEED = 60 # Assumed game speed for sprites whose playback speed is in frames per game frame
+
+@perf.traced("image.list_frames")
+def sprite_frames(sprite_folder_path, sprite_name):
+    """Returns (frame .png paths in playback order, frames per second) for a sprite folder. Raises OSError.
+
+    Frames are ordered by the sprite's .yy frame list; without a readable .yy, the folder's .png files are used in name order.
+    """
+    png_names = sorted(name for name in os.listdir(sprite_folder_path) if name.lower().endswith(".png"))
+    fps = SPRITE_DEFAULT_FPS; ordered = []
+    try: data = load_yy(os.path.join(sprite_folder_path, f"{sprite_name}.yy"))
+    except (OSError, ValueError): data = None
+    if isinstance(data, dict):
+        by_stem = {os.path.splitext(name)[0]: name for name in png_names}
+        for frame in data.get('frames') or []:
+            if not isinstance(frame, dict): continue
+            name = by_stem.get(frame.get('name') or frame.get('%Name'))
+            if name: ordered.append(name)
+        sequence = data.get('sequence') or {}
+        speed = sequence.get('playbackSpeed') if isinstance(sequence, dict) else None
+        if isinstance(speed, (int, float)) and speed > 0: fps = float(speed) * (SPRITE_GAME_SPEED if sequence.get('playbackSpeedType') == 1 else 1)
+    return [os.path.join(sprite_folder_path, name) for name in (ordered or png_names)], fps
+# <<<< ---- END Sprite Frames ---- >>>>
+
+# <<<< ---- Compact YY Serializer ---- >>>>
+YY_NOISE_KEYS = {"resourceType", "resourceVersion", "%Name", "parent", "tags", "instanceCreationOrder"} # Plus every "$GM..." version marker
+# Values GMS2 writes for untouched settings, per resourceType; fields equal to these are dropped
+YY_TYPE_DEFAULTS = {
+    "GMObject": {"managed": True, "persistent": False, "solid": False, "visible": True, "physicsObject": False, "physicsSensor": False, "physicsShape": 1,
+                 "physicsDensity": 0.5, "physicsRestitution": 0.1, "physicsGroup": 1, "physicsLinearDamping": 0.1, "physicsAngularDamping": 0.1,
+                 "physicsFriction": 0.2, "physicsStartAwake": True, "physicsKinematic": False},
+    "GMEvent": {"isDnD": False, "eventNum": 0},
+    "GMRInstance": {"colour": 4294967295, "frozen": False, "hasCreationCode": False, "ignore": False, "imageIndex": 0, "imageSpeed": 1.0, "inheritCode": False,
+                    "inheritItemSettings": False, "isDnd": False, "rotation": 0.0, "scaleX": 1.0, "scaleY": 1.0},
+    "GMRView": {"inherit": False, "visible": False, "xview": 0, "yview": 0, "wview": 1366, "hview": 768, "xport": 0, "yport": 0, "wport": 1366, "hport": 768,
+                "hborder": 32, "vborder": 32, "hspeed": -1, "vspeed": -1},
+}
+YY_LAYER_DEFAULTS = {"visible": True, "userdefinedDepth": False, "inheritLayerDepth": False, "inheritLayerSettings": False, "inheritVisibility": True,
+                     "inheritSubLayers": True, "gridX": 32, "gridY": 32, "hierarchyFrozen": False, "effectEnabled": True}
+YY_INSTANCE_KEYS = {"name", "objId", "objectId", "x", "y"} # An instance with nothing beyond these is only counted
+
+def yy_ref_name(ref, default=None):
+    """Name of a {"name": ..., "path": ...} resource reference."""
+    return ref.get('name', default) if isinstance(ref, dict) else default
+
+def count_room_instances(instances):
+    """Counter of object name -> instance count (rooms use 'objId', newer GMS versions 'objectId')."""
+    instance_counts = Counter()
+    for inst in instances: instance_counts[yy_ref_name(inst.get('objId') or inst.get('objectId'), 'UnknownObject')] += 1
+    return instance_counts
+
+def _compact_yy_value(value, item_type=""):
+    if isinstance(value, list):
+        return [item for item in (_compact_yy_value(item, item_type) for item in value) if item not in (None, [], {})]
+    if not isinstance(value, dict): return value
+    if value.keys() <= {"name", "path"} and "name" in value: return value["name"] # Resource reference -> just its name
+    resource_type = value.get("resourceType") or next((key[1:] for key in value if key.startswith("$GM")), item_type)
+    defaults = YY_TYPE_DEFAULTS.get(resource_type) or (YY_LAYER_DEFAULTS if resource_type.startswith("GMR") and resource_type.endswith("Layer") else {})
+    if resource_type == "GMRView" and not value.get("visible"): return None # The 8 unused view slots every room carries
+    physics = value.get("physicsObject", True)
+    compact = {}
+    for key, item in value.items():
+        if key in YY_NOISE_KEYS or key.startswith("$") or (not physics and key.startswith("physics")): continue
+        if key in defaults and item == defaults[key]: continue
+        if key == "instances" and isinstance(item, list):
+            # Same aggregation as the room view: counts per object, keeping only instances with their own settings
+            compact["instanceCounts"] = dict(sorted(count_room_instances(item).items()))
+            item = [inst for inst in map(_compact_yy_value, item) if any(k not in YY_INSTANCE_KEYS for k in inst)]
+            if item: compact[key] = item
+            continue
+        if key == "views" and isinstance(item, list) and resource_type == "GMRoom":
+            # Current GMS2 writes views untyped. Invisible slots are dropped, so each kept view says which view_camera[n] it is
+            item = [{"index": n, **view} for n, view in enumerate(_compact_yy_value(view, "GMRView") for view in item) if isinstance(view, dict)]
+            if item: compact[key] = item
+            continue
+        item = _compact_yy_value(item)
+        if item not in (None, [], {}, ""): compact[key] = item
+    return compact
+
+def compact_yy(data):
+    """Parsed .yy data with noise and default-valued fields removed and room instances aggregated."""
+    return _compact_yy_value(data)
+
+def compact_yy_text(data):
+    """Minified compact JSON for parsed .yy data."""
+    return json.dumps(compact_yy(data), separators=(',', ':'), ensure_ascii=False) + "\n"
+
+def compact_yy_file_text(path):
+    """Minified compact JSON for a .yy file, parsed through the shared yy cache. Raises OSError or json.JSONDecodeError."""
+    return compact_yy_text(load_yy(path))
+# <<<< ---- END Compact YY Serializer ---- >>>>
+
+
+# <<<< ---- Export Engine ---- >>>>
+EXPORT_STREAM_THRESHOLD = 1024 * 1024 # Files bigger than this are copied in chunks instead of being read ahead
+EXPORT_CHUNK_SIZE = 256 * 1024
+EXPORT_READ_AHEAD = 32 # Sections read ahead of the writer; with the threshold above this bounds memory to ~32 MB
+EXPORT_MAX_WORKERS = min(8, (os.cpu_count() or 2) * 2)
+EXPORT_BYTES_PER_TOKEN = 4 # Rough average for GML/JSON text with common LLM tokenizers
+EXPORT_GML_END = "\n\n" + "-" * 50 + "[End GML]" + "-" * (70-50-9) + "\n\n" # GML Separator
+EXPORT_YY_END = "\n\n" + "=" * 30 + "[End YY]" + "=" * (70-30-8) + "\n\n" # YY Separator
+
+# kind is "GML" or "YY"; header/footer are the framing written around the file's content
+ExportSection = namedtuple('ExportSection', ['kind', 'header', 'path', 'relative_path', 'footer'])
+# Sections written, (for cached exports) how many were added/changed/removed/reused since the last export, and the files written
+ExportResult = namedtuple('ExportResult', ['sections', 'added', 'changed', 'removed', 'reused', 'files'])
+
+class ExportCancelled(Exception):
+    pass
+
+def export_header(project_root, gml_count, chunk=None):
+    """Export file header; chunk is (chunk number, chunk count, estimated tokens) for chunked exports."""
+    chunk_line = f"// Chunk {chunk[0]} of {chunk[1]} (~{chunk[2]} tokens)\n" if chunk else ""
+    return f"// GML and YY Data Export from Project: {project_root}\n// Total GML Files Found: {gml_count}\n{chunk_line}" + "=" * 70 + "\n\n"
+
+def estimate_tokens(n_bytes):
+    return -(-n_bytes // EXPORT_BYTES_PER_TOKEN)
+
+def measure_export_plan(plan, yy_compact=False):
+    """Byte size of every section: framing plus the file size from a stat, so sizing never reads the project.
+
+    With yy_compact the .yy sections are compacted to be measured (parsed through the shared yy cache,
+    which the export then reuses), since compaction can shrink a room to a tiny fraction of its size.
+    """
+    sizes = []
+    for section in plan:
+        try: file_size = len(compact_yy_file_text(section.path).encode('utf-8')) if yy_compact and section.kind == "YY" else os.stat(section.path).st_size
+        except (OSError, ValueError): file_size = 0
+        sizes.append(len(section.header.encode('utf-8')) + file_size + len(section.footer.encode('utf-8')))
+    return sizes
+
+def plan_chunks(plan, sizes, max_tokens, header_bytes=0):
+    """Splits the plan into [start, end) ranges of at most max_tokens each, in order, counting header_bytes of chunk header per chunk.
+
+    Sections of one asset (its GML files and .yy, which share a folder and are adjacent in the plan)
+    always stay in the same chunk; an asset bigger than the budget gets a chunk of its own.
+    """
+    chunks = []; start = 0; chunk_bytes = 0; max_bytes = max_tokens * EXPORT_BYTES_PER_TOKEN - header_bytes; i = 0
+    while i < len(plan):
+        group_dir = os.path.dirname(plan[i].path); group_end = i; group_bytes = 0
+        while group_end < len(plan) and os.path.dirname(plan[group_end].path) == group_dir: group_bytes += sizes[group_end]; group_end += 1
+        if chunk_bytes and chunk_bytes + group_bytes > max_bytes: chunks.append((start, i)); start = i; chunk_bytes = 0
+        chunk_bytes += group_bytes; i = group_end
+    if start < len(plan) or not chunks: chunks.append((start, len(plan)))
+    return chunks
+
+def chunk_file_paths(save_path, count):
+    stem, ext = os.path.splitext(save_path)
+    return [f"{stem}_part{n:02d}{ext or '.txt'}" for n in range(1, count + 1)]
+
+def _yy_export_section(project_root, asset_yy_path):
+    relative_yy_path = os.path.relpath(asset_yy_path, project_root)
+    return ExportSection("YY", f"// ----- Associated YY File: {os.path.basename(os.path.dirname(asset_yy_path))} -----\n// ----- YY Path: {relative_yy_path} -----\n\n", asset_yy_path, relative_yy_path, EXPORT_YY_END)
+
+@perf.traced("export.plan")
+def build_export_plan(project_root, gml_details, asset_order=None):
+    """Ordered export sections: each GML file followed by its asset's .yy the first time that .yy is seen.
+
+    asset_order (asset .yy paths, e.g. from AssetGraph.dependency_order) groups the sections per asset in that
+    order instead; listed assets without GML files still get their .yy section. Other GML files come last.
+    """
+    if asset_order is not None:
+        listed = set(asset_order); details_by_yy = {}
+        for detail in gml_details:
+            if detail[3] in listed: details_by_yy.setdefault(detail[3], []).append(detail)
+        plan = []
+        for asset_yy_path in asset_order:
+            if asset_yy_path in details_by_yy: plan += build_export_plan(project_root, details_by_yy[asset_yy_path])
+            elif os.path.isfile(asset_yy_path): plan.append(_yy_export_section(project_root, asset_yy_path))
+        return plan + build_export_plan(project_root, [detail for detail in gml_details if detail[3] not in listed])
+    plan = []; exported_yy_files = set() # Keep track of yy files already exported
+    for display_name, file_path, relative_path, asset_yy_path in gml_details:
+        plan.append(ExportSection("GML", f"// ----- Start GML: {display_name} -----\n// ----- GML Path: {relative_path} -----\n\n", file_path, relative_path, EXPORT_GML_END))
+        if asset_yy_path and os.path.isfile(asset_yy_path) and asset_yy_path not in exported_yy_files:
+            plan.append(_yy_export_section(project_root, asset_yy_path))
+            exported_yy_files.add(asset_yy_path) # Mark as exported
+    return plan
+
+EXPORT_CACHE_VERSION = "2" # 2: bodies are no longer stored (unchanged files are copied from disk undecoded)
+EXPORT_REMOVED_BODY = "// ***** REMOVED SINCE LAST EXPORT *****\n"
+EXPORT_ERROR_SHA1 = "unreadable" # Cached in place of the SHA-1 of a file the export could not read, so a delta leaves it out until it changes
+EXPORT_RAW_COPY = os.linesep == "\n" # Unchanged files without '\r' can be copied byte for byte (text mode would write them the same)
+
+class ExportCache:
+    """SQLite store of the sections written by a project's last export: stat key and SHA-1.
+
+    Lets the next export copy unchanged files without decoding or hashing them (a delta export skips them
+    after a stat), and tells a delta export what was added, changed or removed since. The connection
+    belongs to the thread that opened it.
+    """
+    def __init__(self, project_root):
+        self.project_root = os.path.abspath(project_root)
+        self.path = os.path.join(get_cache_dir(), "export_cache", f"{project_cache_key(self.project_root)}.sqlite")
+        self._db = None
+
+    def open(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._db = sqlite3.connect(self.path)
+        self._db.executescript("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);"
+                               "CREATE TABLE IF NOT EXISTS sections (path TEXT PRIMARY KEY, kind TEXT, header TEXT, footer TEXT, mtime_ns INTEGER, size INTEGER, sha1 TEXT);")
+        if self._meta('version') != EXPORT_CACHE_VERSION: # Older layouts are dropped, not migrated: the next export rebuilds the cache
+            self._db.executescript("DROP TABLE sections; CREATE TABLE sections (path TEXT PRIMARY KEY, kind TEXT, header TEXT, footer TEXT, mtime_ns INTEGER, size INTEGER, sha1 TEXT);")
+            self._db.execute("INSERT OR REPLACE INTO meta VALUES ('version', ?)", (EXPORT_CACHE_VERSION,)); self._db.commit()
+
+    def close(self):
+        if self._db: self._db.close(); self._db = None
+
+    def _meta(self, key):
+        row = self._db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def last_export_time(self):
+        value = self._meta('last_export'); return float(value) if value else None
+
+    def load_keys(self):
+        """{path: (mtime_ns, size, sha1)} for every section of the last export."""
+        return {path: (mtime_ns, size, sha1) for path, mtime_ns, size, sha1 in self._db.execute("SELECT path, mtime_ns, size, sha1 FROM sections")}
+
+    def put(self, section, mtime_ns, size, sha1):
+        self._db.execute("INSERT OR REPLACE INTO sections VALUES (?, ?, ?, ?, ?, ?, ?)", (section.path, section.kind, section.header, section.footer, mtime_ns, size, sha1))
+
+    def removed_sections(self, current_paths):
+        """(header, footer) of sections in the last export that are no longer part of the project."""
+        return [(header, footer) for path, header, footer in self._db.execute("SELECT path, header, footer FROM sections ORDER BY path") if path not in current_paths]
+
+    def commit(self, current_paths, known_paths=None):
+        """Drops sections no longer in the export and stamps the export time; known_paths (from an earlier load_keys()) saves re-reading the keys."""
+        self._db.executemany("DELETE FROM sections WHERE path = ?", [(path,) for path in (self.load_keys() if known_paths is None else known_paths) if path not in current_paths])
+        self._db.execute("INSERT OR REPLACE INTO meta VALUES ('last_export', ?)", (repr(time.time()),)); self._db.commit()
+
+    def rollback(self):
+        if self._db: self._db.rollback()
+
+def _read_section_file(path, hash_content=False):
+    """Worker task: (content, stat, sha1) for one section file.
+
+    content is None when the file is large enough to be streamed by the writer instead.
+    """
+    with open(path, 'rb') as f:
+        st = os.fstat(f.fileno())
+        if st.st_size > EXPORT_STREAM_THRESHOLD: return None, st, None
+        content = decode_text(f.read())
+    return content, st, hashlib.sha1(content.encode('utf-8')).hexdigest() if hash_content else None
+
+def _read_unchanged_file(path, size):
+    """Undecoded bytes of a file unchanged since the last export (so known to be valid UTF-8), or None if it is big enough to be streamed."""
+    if size > EXPORT_STREAM_THRESHOLD: return None
+    with open(path, 'rb') as f: return f.read()
+
+def _stream_file(path, outfile, is_cancelled, hasher=None):
+    """Copies a large file to outfile (if any) in chunks, feeding hasher. A file that fails to read or decode partway is taken back out of outfile."""
+    start = outfile.tell() if outfile else None
+    try:
+        with open(path, 'r', encoding='utf-8') as infile:
+            for chunk in iter(lambda: infile.read(EXPORT_CHUNK_SIZE), ''):
+                if is_cancelled(): raise ExportCancelled()
+                if outfile: outfile.write(chunk)
+                if hasher: hasher.update(chunk.encode('utf-8'))
+    except (OSError, ValueError): # The section gets the error marker alone, as when the whole file is read at once
+        if outfile: outfile.seek(start); outfile.truncate()
+        raise
+
+@perf.traced("export")
+def export_project(project_root, gml_details, save_path, progress=None, is_cancelled=None, cache=None, delta=False, chunk_tokens=None, update_cache=True, yy_compact=False, asset_order=None):
+    """Writes the GML + YY export for gml_details to save_path. Returns an ExportResult; raises ExportCancelled or OSError.
+
+    Files are read concurrently on a thread pool, a bounded window ahead of the writer, and written in
+    plan order so the output is identical to a sequential export. Large files are streamed in chunks.
+    The export goes to .part files that only replace the targets once everything is written.
+
+    With an ExportCache, unchanged files are copied without being decoded or hashed again (a delta export
+    only stats them), and the cache is then updated to this export (unless update_cache is False, e.g. for
+    partial exports). delta=True (requires cache) writes only the sections added, changed or removed since the last export, with
+    the same framing. chunk_tokens splits the output into <name>_partNN files under that estimated token
+    budget each, plus a <name>_manifest.json listing what each chunk holds. yy_compact writes .yy sections
+    as compact JSON (see compact_yy); the cache and delta bookkeeping still track the raw files. asset_order
+    is passed to build_export_plan (dependency-ordered exports).
+    """
+    if delta and chunk_tokens: raise ValueError("Delta exports cannot be chunked.")
+    plan = build_export_plan(project_root, gml_details, asset_order); total = len(plan)
+    if chunk_tokens:
+        header_bytes = len(export_header(project_root, total, (total, total, chunk_tokens)).encode('utf-8')) # No chunk has a wider header: its counts are at most the plan's
+        sizes = measure_export_plan(plan, yy_compact); chunks = plan_chunks(plan, sizes, chunk_tokens, header_bytes); targets = chunk_file_paths(save_path, len(chunks))
+    else: sizes = None; chunks = [(0, total)]; targets = [save_path]
+    is_cancelled = is_cancelled or (lambda: False); update_cache = update_cache and cache is not None
+    known = cache.load_keys() if cache else {}
+    since = cache.last_export_time() if cache else None
+    pool = ThreadPoolExecutor(max_workers=EXPORT_MAX_WORKERS); pending = deque(); next_submit = 0
+    written = added = changed = reused = 0; removed_sections = []
+
+    def write_body(outfile, section, body):
+        # body is the text, the undecoded bytes of an unchanged file, or None to stream the file from disk
+        if yy_compact and section.kind == "YY":
+            try: body = compact_yy_file_text(section.path)
+            except ValueError: pass # Unparseable .yy: exported raw
+        if body is None: _stream_file(section.path, outfile, is_cancelled)
+        elif isinstance(body, str): outfile.write(body)
+        elif EXPORT_RAW_COPY and b'\r' not in body: outfile.buffer.write(body) # outfile is write-through, so this lands in order
+        else: outfile.write(decode_text(body))
+
+    try:
+        for chunk_number, ((start, end), target) in enumerate(zip(chunks, targets), 1):
+            with open(f"{target}.part", 'w', encoding='utf-8') as outfile:
+                outfile.reconfigure(write_through=True) # Text goes straight to the byte buffer, so raw copies can be interleaved
+                if chunk_tokens: outfile.write(export_header(project_root, sum(1 for section in plan[start:end] if section.kind == "GML"), (chunk_number, len(chunks), estimate_tokens(header_bytes + sum(sizes[start:end])))))
+                elif not delta: outfile.write(export_header(project_root, len(gml_details)))
+                for i in range(start, end):
+                    section = plan[i]
+                    while next_submit < total and next_submit < i + EXPORT_READ_AHEAD:
+                        path = plan[next_submit].path
+                        if path not in known: pending.append(pool.submit(_read_section_file, path, cache is not None)) # Cached paths are stat'ed by the writer
+                        next_submit += 1
+                    if is_cancelled(): raise ExportCancelled()
+                    previous = known.get(section.path); header_written = False
+                    try:
+                        if previous: # In the last export: a stat here tells whether it needs reading at all
+                            st = os.stat(section.path)
+                            if previous[0] == st.st_mtime_ns and previous[1] == st.st_size and (delta or previous[2] != EXPORT_ERROR_SHA1): # Unreadable last time: read (and fail) again
+                                reused += 1
+                                if delta: continue
+                                outfile.write(section.header); header_written = True
+                                write_body(outfile, section, _read_unchanged_file(section.path, st.st_size))
+                                outfile.write(section.footer); written += 1
+                                continue
+                            content, st, sha1 = _read_section_file(section.path, True) # Changed: few enough to read here
+                        else: content, st, sha1 = pending.popleft().result()
+                        if content is None and cache is not None: # Large file: hash it first so a delta can skip it
+                            hasher = hashlib.sha1(); _stream_file(section.path, None, is_cancelled, hasher); sha1 = hasher.hexdigest()
+                        if update_cache: cache.put(section, st.st_mtime_ns, st.st_size, sha1)
+                        if delta and previous and previous[2] == sha1: reused += 1; continue # Touched but identical
+                        if previous: changed += 1
+                        elif cache is not None: added += 1
+                        outfile.write(section.header); header_written = True
+                        write_body(outfile, section, content)
+                        outfile.write(section.footer); written += 1
+                    except (OSError, ValueError) as read_err: # ValueError covers bad UTF-8
+                        if not header_written: outfile.write(section.header)
+                        outfile.write(f"// ***** ERROR READING {section.kind} FILE: {section.relative_path} *****\n")
+                        outfile.write(f"// ***** Error: {read_err} *****\n")
+                        outfile.write(section.footer); written += 1
+                        if update_cache:
+                            try: st = os.stat(section.path); cache.put(section, st.st_mtime_ns, st.st_size, EXPORT_ERROR_SHA1)
+                            except OSError: pass # Gone: nothing to compare the next export with
+                    finally:
+                        if progress: progress(i + 1, total)
+                if delta:
+                    removed_sections = cache.removed_sections({section.path for section in plan})
+                    for header, footer in removed_sections: outfile.write(header + EXPORT_REMOVED_BODY + footer); written += 1
+        if delta: # The summary header needs the counts, so it is written in front of the finished body
+            summary_path = f"{save_path}.part2"
+            with open(summary_path, 'w', encoding='utf-8') as outfile, open(f"{save_path}.part", 'r', encoding='utf-8') as body_file:
+                outfile.write(f"// GML and YY Delta Export from Project: {project_root}\n")
+                outfile.write(f"// Changes since last export{time.strftime(' (%Y-%m-%d %H:%M:%S)', time.localtime(since)) if since else ''}: {added} added, {changed} changed, {len(removed_sections)} removed\n")
+                outfile.write("=" * 70 + "\n\n")
+                shutil.copyfileobj(body_file, outfile, EXPORT_CHUNK_SIZE)
+            os.replace(summary_path, f"{save_path}.part")
+        for target in targets: os.replace(f"{target}.part", target)
+        if chunk_tokens: # Sized from the files as written, not the plan's estimate
+            manifest = {'project': project_root, 'max_tokens': chunk_tokens, 'bytes_per_token': EXPORT_BYTES_PER_TOKEN, 'chunks': [
+                {'file': os.path.basename(target), 'bytes': file_bytes, 'tokens': estimate_tokens(file_bytes),
+                 'assets': list(dict.fromkeys(os.path.dirname(section.relative_path) or section.relative_path for section in plan[start:end]))}
+                for (start, end), target, file_bytes in zip(chunks, targets, map(os.path.getsize, targets))]}
+            manifest_path = f"{os.path.splitext(save_path)[0]}_manifest.json"
+            with open(manifest_path, 'w', encoding='utf-8') as f: json.dump(manifest, f, indent=2)
+            targets = targets + [manifest_path]
+        if update_cache: cache.commit({section.path for section in plan}, known)
+    except BaseException:
+        if cache is not None: cache.rollback()
+        for path in [f"{target}.part" for target in targets] + [f"{save_path}.part2"]:
+            try: os.remove(path)
+            except OSError: pass
+        raise
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+    perf.count("export.sections", written); perf.count("export.sections_reused", reused)
+    return ExportResult(written, added, changed, len(removed_sections), reused, targets)
+# <<<< ---- END Export Engine ---- >>>>
+
+
+# <<<< ---- Persistent Scan Index ---- >>>>
+SCAN_INDEX_VERSION = 1
+SCAN_INDEX_RACY_SECONDS = 2.0 # Folders modified this recently are re-listed next time (coarse mtime filesystems)
+
+def get_cache_dir():
+    """Per-user cache folder for vibe2gml data (LOCALAPPDATA on Windows, XDG cache elsewhere; VIBE2GML_CACHE_DIR overrides both)."""
+    if os.environ.get("VIBE2GML_CACHE_DIR"): return os.environ["VIBE2GML_CACHE_DIR"]
+    base = os.environ.get("LOCALAPPDATA") or os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "vibe2gml")
+
+def project_cache_key(project_root):
+    """Stable file name stem for a project's cache files."""
+    return hashlib.sha1(os.path.normcase(os.path.abspath(project_root)).encode('utf-8')).hexdigest()[:16]
+
+class ScanIndex:
+    """On-disk cache of a project's folder listings, keyed by each folder's mtime.
+
+    A folder's mtime changes whenever an entry is added, removed or renamed inside it, so an
+    unchanged mtime means the cached subfolders, .gml names and <asset>.yy presence are still valid
+    and the folder does not need to be listed again.
+    """
+    def __init__(self, project_root):
+        self.project_root = os.path.abspath(project_root)
+        self.path = os.path.join(get_cache_dir(), "scan_index", f"{project_cache_key(self.project_root)}.json")
+        self.dirs = {} # {relative_dir: [mtime_ns or None, subdirs, gml_files, has_asset_yy]}
+        self._seen = set(); self.hits = 0; self.misses = 0
+
+    def load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f: data = json.load(f)
+            if data.get('version') == SCAN_INDEX_VERSION and data.get('root') == self.project_root: self.dirs = data.get('dirs', {})
+        except (OSError, ValueError): self.dirs = {} # Missing or corrupt index: full scan
+
+    @perf.traced("scan.index_save")
+    def save(self):
+        """Writes only the folders visited by this scan, so deleted folders drop out of the index."""
+        data = {'version': SCAN_INDEX_VERSION, 'root': self.project_root, 'dirs': {k: v for k, v in self.dirs.items() if k in self._seen}}
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f: json.dump(data, f, separators=(',', ':'))
+            os.replace(tmp_path, self.path)
+        except OSError as e: print(f"Warning: Could not write scan index {self.path}: {e}")
+
+    def clear(self):
+        self.dirs = {}
+        try: os.remove(self.path)
+        except OSError: pass
+
+    def listing(self, dir_path):
+        """Returns (sorted subfolder names, sorted .gml names, has <folder>.yy) for dir_path. Raises OSError."""
+        key = os.path.relpath(dir_path, self.project_root); self._seen.add(key)
+        mtime_ns = os.stat(dir_path).st_mtime_ns
+        cached = self.dirs.get(key)
+        if cached and cached[0] == mtime_ns: self.hits += 1; return cached[1], cached[2], cached[3]
+        self.misses += 1; subdirs = []; gml_files = []; has_asset_yy = False
+        asset_yy_name = f"{os.path.basename(dir_path)}.yy"
+        with os.scandir(dir_path) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    if not entry.is_symlink(): subdirs.append(entry.name) # Like os.walk, never follow folder links
+                elif entry.name.endswith(".gml"): gml_files.append(entry.name)
+                elif entry.name == asset_yy_name and entry.is_file(): has_asset_yy = True
+        subdirs.sort(); gml_files.sort()
+        is_racy = time.time() - mtime_ns / 1e9 < SCAN_INDEX_RACY_SECONDS
+        self.dirs[key] = [None if is_racy else mtime_ns, subdirs, gml_files, has_asset_yy]
+        return subdirs, gml_files, has_asset_yy
+# <<<< ---- END Persistent Scan Index ---- >>>>
+
+
+# <<<< ---- GML Search Index ---- >>>>
+SEARCH_INDEX_VERSION = 1
+SEARCH_MAX_RESULTS = 500
+SEARCH_SLICE_CHARS = 64 * 1024
+GML_IDENTIFIER_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+
+SearchHit = namedtuple('SearchHit', ['file_path', 'relative_path', 'line', 'column', 'text']) # line is 1-based, column 0-based
+
+class IndexedGmlFile:
+    __slots__ = ('relative_path', 'mtime_ns', 'size', 'text', 'lower', 'identifiers')
+
+    def __init__(self, relative_path, mtime_ns, size, text):
+        self.relative_path = relative_path; self.mtime_ns = mtime_ns; self.size = size
+        self.text = text; self.lower = text.lower() # lower() never adds or drops newlines, so line numbers agree
+        identifiers = set(); pos = 0; length = len(text)
+        while pos < length: # In slices: one regex call over a huge file would hold the GIL (and stall a GUI thread) throughout
+            end = text.find('\n', pos + SEARCH_SLICE_CHARS); end = length if end < 0 else end
+            identifiers.update(GML_IDENTIFIER_RE.findall(text, pos, end)); pos = end + 1
+        self.identifiers = frozenset(identifiers)
+
+    def line_at(self, pos, line_no, text=None):
+        """The line containing pos in text (self.text by default); line_no is used when offsets of lower and text differ."""
+        text = self.text if text is None else text
+        if len(self.lower) != len(self.text) and text is self.lower: return self.text.split('\n')[line_no - 1] # Rare: lower() changed a length
+        line_end = text.find('\n', pos)
+        return self.text[text.rfind('\n', 0, pos) + 1:line_end if line_end >= 0 else len(text)]
+
+class GmlSearchIndex:
+    """In-memory search over a project's GML files.
+
+    Whole identifiers are looked up in an inverted index ({identifier: {file_path}}) and then located in just those
+    files; substrings are found case-insensitively in each file's lower-cased text. load()/save() optionally keep the
+    file texts in the cache folder, so files whose mtime and size are unchanged are not read again on the next build().
+    """
+    def __init__(self, project_root):
+        self.project_root = os.path.abspath(project_root)
+        self.path = os.path.join(get_cache_dir(), "search_index", f"{project_cache_key(self.project_root)}.json")
+        self.files = {} # {file_path: IndexedGmlFile}
+        self.postings = {} # {identifier: {file_path}}
+        self._stored = {}; self.reused = 0 # {relative_path: [mtime_ns, size, text]} from load(), used by build()
+        self._order = None # file_paths sorted by relative path, rebuilt after changes
+
+    def load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f: data = json.load(f)
+            if data.get('version') == SEARCH_INDEX_VERSION and data.get('root') == self.project_root: self._stored = data.get('files', {})
+        except (OSError, ValueError): self._stored = {}
+
+    @perf.traced("search.save")
+    def save(self):
+        data = {'version': SEARCH_INDEX_VERSION, 'root': self.project_root, 'files': {f.relative_path: [f.mtime_ns, f.size, f.text] for f in self.files.values()}}
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f: json.dump(data, f, separators=(',', ':'))
+            os.replace(tmp_path, self.path)
+        except OSError as e: print(f"Warning: Could not write search index {self.path}: {e}")
+
+    def clear(self):
+        self.files = {}; self.postings = {}; self._stored = {}; self._order = None
+        try: os.remove(self.path)
+        except OSError: pass
+
+    @staticmethod
+    def _read(file_path):
+        st = os.stat(file_path)
+        return st.st_mtime_ns, st.st_size, read_text(file_path, errors='replace')
+
+    @perf.traced("search.build")
+    def build(self, gml_details, is_cancelled=None):
+        """Indexes every GML file in gml_details, reading only files that changed since load(). Returns False if cancelled."""
+        self.files = {}; self.postings = {}; self._order = None; self.reused = 0; to_read = []
+        for detail in gml_details:
+            file_path, relative_path = detail[1], detail[2]
+            stored = self._stored.get(relative_path)
+            try: st = os.stat(file_path)
+            except OSError: continue
+            if stored and stored[0] == st.st_mtime_ns and stored[1] == st.st_size: self._add(file_path, relative_path, *stored); self.reused += 1
+            else: to_read.append((file_path, relative_path))
+        self._stored = {}
+        with ThreadPoolExecutor(max_workers=EXPORT_MAX_WORKERS) as pool: # Many small files: overlap the open/read latency
+            for (file_path, relative_path), future in zip(to_read, [pool.submit(self._read, file_path) for file_path, _ in to_read]):
+                if is_cancelled and is_cancelled(): pool.shutdown(wait=False, cancel_futures=True); return False
+                try: self._add(file_path, relative_path, *future.result())
+                except OSError: continue # Deleted or unreadable since the scan
+        return True
+
+    def update_file(self, file_path, relative_path):
+        """Re-indexes one file after it was saved or created; drops it if it can no longer be read."""
+        try: mtime_ns, size, text = self._read(file_path)
+        except OSError: self.remove_file(file_path); return
+        self._add(file_path, relative_path, mtime_ns, size, text)
+
+    def remove_file(self, file_path):
+        indexed = self.files.pop(file_path, None)
+        if indexed is None: return
+        self._order = None
+        for name in indexed.identifiers:
+            files = self.postings.get(name)
+            if files is not None:
+                files.discard(file_path)
+                if not files: del self.postings[name]
+
+    def _add(self, file_path, relative_path, mtime_ns, size, text):
+        if file_path in self.files: self.remove_file(file_path)
+        indexed = self.files[file_path] = IndexedGmlFile(relative_path, mtime_ns, size, text); self._order = None
+        postings = self.postings
+        for name in indexed.identifiers:
+            files = postings.get(name)
+            if files is None: postings[name] = {file_path}
+            else: files.add(file_path)
+
+    def _ordered(self, file_paths=None):
+        if self._order is None: self._order = sorted(self.files, key=lambda path: self.files[path].relative_path)
+        return self._order if file_paths is None else [path for path in self._order if path in file_paths]
+
+    def _collect(self, file_paths, haystack, find_next, limit):
+        # find_next(indexed, text, start) -> next match offset in text or -1; reports one hit per line
+        hits = []
+        for file_path in file_paths:
+            indexed = self.files[file_path]; text = haystack(indexed); pos = find_next(indexed, text, 0)
+            line_no = 1; line_start = 0
+            while pos >= 0:
+                line_no += text.count('\n', line_start, pos); line_start = text.rfind('\n', 0, pos) + 1
+                hits.append(SearchHit(file_path, indexed.relative_path, line_no, pos - line_start, indexed.line_at(pos, line_no, text)))
+                if len(hits) >= limit: return hits
+                line_end = text.find('\n', pos)
+                if line_end < 0: break
+                pos = find_next(indexed, text, line_end + 1)
+        return hits
+
+    def find_identifier(self, name, limit=SEARCH_MAX_RESULTS):
+        """Lines where name occurs as a whole identifier (case-sensitive, like GML), in relative path order."""
+        files = self.postings.get(name)
+        if not files: return []
+        pattern = re.compile(rf"(?<![A-Za-z0-9_]){re.escape(name)}(?![A-Za-z0-9_])")
+        def find_next(indexed, text, start):
+            match = pattern.search(text, start)
+            return match.start() if match else -1
+        return self._collect(self._ordered(files), lambda indexed: indexed.text, find_next, limit)
+
+    def find_substring(self, query, limit=SEARCH_MAX_RESULTS):
+        """Lines containing query, ignoring case, in relative path order."""
+        needle = query.lower()
+        if not needle: return []
+        return self._collect(self._ordered(), lambda indexed: indexed.lower, lambda indexed, text, start: text.find(needle, start), limit)
+
+    @perf.traced("search.query")
+    def search(self, query, identifier=False, limit=SEARCH_MAX_RESULTS):
+        return self.find_identifier(query.strip(), limit) if identifier else self.find_substring(query, limit)
+# <<<< ---- END GML Search Index ---- >>>>
+
+# <<<< ---- Room Analytics ---- >>>>
+try: import numpy as np # Optional: vectorizes the room statistics (same results without it)
+except ImportError: np = None
+HAVE_NUMPY = np is not None
+
+ROOM_DEFAULT_SIZE = (1366, 768) # GMS2's default room size, used when a room has no roomSettings
+ROOM_DENSITY_CELL = 256 # Density grid cell size in room pixels
+ROOM_DENSITY_MAX_SIDE = 64 # Cells per grid side at most; very large rooms get bigger cells
+ROOM_DENSITY_SHADES = " .:-=+*#%@" # Density map characters, empty to peak cell
+
+# layer_counts / object_counts: {name: instances}, objects most used first; out_of_bounds: instances outside the room;
+# stacked: extra instances of an object on the same layer and position as another; density: rows of per-cell instance
+# counts for cell x cell pixel cells (out-of-bounds instances excluded); peak: (count, column, row) of the densest cell
+RoomStats = namedtuple('RoomStats', 'name yy_path width height instances layer_counts object_counts out_of_bounds stacked cell density peak')
+
+def find_room_files(project_root):
+    """Sorted .yy paths of the project's rooms (rooms/<name>/<name>.yy)."""
+    return [yy_path for _, _, yy_path in find_assets(project_root, ("Rooms",))]
+
+class RoomInstanceTable:
+    """Room instances as parallel columns (room, layer, object, x, y, scale_x, scale_y), for any number of rooms.
+
+    Rooms, layers and objects are stored once and referenced by integer codes; layer codes are per room.
+    Columns are typed arrays, so analyze_rooms can view them as NumPy arrays without copying.
+    """
+    def __init__(self):
+        self.rooms = [] # (name, yy_path, width, height) per room code
+        self.layers = [] # (room code, layer name) per layer code
+        self.objects = []; self._object_codes = {} # Object name per object code
+        self.room = array('q'); self.layer = array('q'); self.object = array('q') # Codes
+        self.x = array('d'); self.y = array('d'); self.scale_x = array('d'); self.scale_y = array('d')
+
+    def __len__(self):
+        return len(self.x)
+
+    def _object_code(self, name):
+        code = self._object_codes.get(name)
+        if code is None: code = self._object_codes[name] = len(self.objects); self.objects.append(name)
+        return code
+
+    def add_room(self, data, yy_path=""):
+        """Appends the instances of parsed room .yy data, including those on nested layers. Returns the room code."""
+        room_code = len(self.rooms); settings = data.get('roomSettings') or {}
+        name = data.get('name') or os.path.splitext(os.path.basename(yy_path))[0]
+        self.rooms.append((name, yy_path, int(settings.get('Width') or ROOM_DEFAULT_SIZE[0]), int(settings.get('Height') or ROOM_DEFAULT_SIZE[1])))
+        pending = list(reversed(data.get('layers') or []))
+        while pending:
+            layer = pending.pop(); pending.extend(reversed(layer.get('layers') or []))
+            instances = layer.get('instances')
+            if not instances: continue
+            layer_code = len(self.layers); self.layers.append((room_code, layer.get('name', f"Unnamed Layer {layer_code}")))
+            self.room.extend([room_code] * len(instances)); self.layer.extend([layer_code] * len(instances))
+            self.object.extend([self._object_code(yy_ref_name(inst.get('objId') or inst.get('objectId'), 'UnknownObject')) for inst in instances])
+            self.x.extend([inst.get('x') or 0 for inst in instances]); self.y.extend([inst.get('y') or 0 for inst in instances])
+            self.scale_x.extend([inst.get('scaleX', 1.0) for inst in instances]); self.scale_y.extend([inst.get('scaleY', 1.0) for inst in instances])
+        return room_code
+
+@perf.traced("rooms.load")
+def load_room_table(room_yy_paths, is_cancelled=None):
+    """Parses rooms through the shared yy cache into one RoomInstanceTable, reading ahead on a thread pool.
+
+    Returns (table, [(yy_path, error message)] for rooms that couldn't be read), or None if cancelled.
+    """
+    def load(path):
+        try: return load_yy(path), None
+        except (OSError, ValueError) as e: return None, str(e)
+    table = RoomInstanceTable(); errors = []
+    with ThreadPoolExecutor(max_workers=EXPORT_MAX_WORKERS) as pool:
+        for path, (data, error) in zip(room_yy_paths, pool.map(load, room_yy_paths)):
+            if is_cancelled and is_cancelled(): return None
+            if error is not None: errors.append((path, error))
+            else: table.add_room(data, path)
+    return table, errors
+
+def _room_grid(width, height):
+    """(cell size, columns, rows) of a room's density grid."""
+    cell = max(ROOM_DENSITY_CELL, -(-max(width, height) // ROOM_DENSITY_MAX_SIDE))
+    return cell, max(1, -(-width // cell)), max(1, -(-height // cell))
+
+def _stacked_layers_numpy(layer, obj, x, y, n_objects):
+    """Layer code of every instance repeating the (layer, object, x, y) of another."""
+    xi = x.astype(np.int64); yi = y.astype(np.int64)
+    if len(x) and (xi == x).all() and (yi == y).all():
+        xi -= xi.min(); yi -= yi.min(); span = (int(xi.max()) + 1) * (int(yi.max()) + 1)
+        if (int(layer.max()) + 1) * n_objects * span < 2 ** 63: # Whole-pixel positions (the usual case): one int64 sort key
+            keys = np.sort((layer * n_objects + obj) * span + yi * (int(xi.max()) + 1) + xi)
+            return keys[1:][keys[1:] == keys[:-1]] // (n_objects * span)
+    order = np.lexsort((y, x, obj, layer)) # Equal rows end up adjacent
+    layer, obj, x, y = layer[order], obj[order], x[order], y[order]
+    return layer[1:][(layer[1:] == layer[:-1]) & (obj[1:] == obj[:-1]) & (x[1:] == x[:-1]) & (y[1:] == y[:-1])]
+
+def _room_counts_numpy(table, grids, offsets):
+    room, layer, obj = (np.frombuffer(column, np.int64) for column in (table.room, table.layer, table.object))
+    x = np.frombuffer(table.x, np.float64); y = np.frombuffer(table.y, np.float64)
+    n_rooms = len(table.rooms); n_objects = max(1, len(table.objects))
+    layer_counts = np.bincount(layer, minlength=len(table.layers))
+    keys, counts = np.unique(room * n_objects + obj, return_counts=True) # Sparse (room, object) counts
+    room_objects = zip((keys // n_objects).tolist(), (keys % n_objects).tolist(), counts.tolist())
+    width = np.array([r[2] for r in table.rooms], np.float64)[room]; height = np.array([r[3] for r in table.rooms], np.float64)[room]
+    outside = (x < 0) | (y < 0) | (x >= width) | (y >= height)
+    out_of_bounds = np.bincount(room[outside], minlength=n_rooms)
+    inside = ~outside; room_in = room[inside]
+    cell = np.array([g[0] for g in grids], np.float64)[room_in]; columns = np.array([g[1] for g in grids], np.intp)[room_in]
+    flat = np.asarray(offsets[:-1], np.intp)[room_in] + (y[inside] // cell).astype(np.intp) * columns + (x[inside] // cell).astype(np.intp)
+    density = np.bincount(flat, minlength=offsets[-1])
+    stacked = np.bincount(np.array([room for room, _ in table.layers], np.int64)[_stacked_layers_numpy(layer, obj, x, y, n_objects)], minlength=n_rooms)
+    return layer_counts.tolist(), room_objects, out_of_bounds.tolist(), stacked.tolist(), density.tolist()
+
+def _room_counts_python(table, grids, offsets):
+    n_rooms = len(table.rooms)
+    layer_counts = [0] * len(table.layers); room_objects = Counter(); positions = Counter()
+    out_of_bounds = [0] * n_rooms; density = [0] * offsets[-1]
+    for room, layer, obj, x, y in zip(table.room, table.layer, table.object, table.x, table.y):
+        layer_counts[layer] += 1; room_objects[room, obj] += 1; positions[layer, obj, x, y] += 1
+        _, _, width, height = table.rooms[room]
+        if x < 0 or y < 0 or x >= width or y >= height: out_of_bounds[room] += 1; continue
+        cell, columns, _ = grids[room]; density[offsets[room] + int(y // cell) * columns + int(x // cell)] += 1
+    stacked = [0] * n_rooms
+    for (layer, _, _, _), count in positions.items():
+        if count > 1: stacked[table.layers[layer][0]] += count - 1
+    return layer_counts, ((room, obj, count) for (room, obj), count in room_objects.items()), out_of_bounds, stacked, density
+
+@perf.traced("rooms.analyze")
+def analyze_rooms(table, vectorized=None):
+    """RoomStats for every room of a RoomInstanceTable, in table order, computed in one pass over all instances.
+
+    vectorized picks the NumPy (True) or pure-Python (False) path; by default NumPy is used when installed.
+    """
+    if vectorized is None: vectorized = HAVE_NUMPY
+    if vectorized and not HAVE_NUMPY: raise RuntimeError("NumPy is not installed")
+    grids = [_room_grid(width, height) for _, _, width, height in table.rooms]
+    offsets = [0] # Start of each room's grid in the flat density counts
+    for _, columns, rows in grids: offsets.append(offsets[-1] + columns * rows)
+    layer_counts, room_objects, out_of_bounds, stacked, density = (_room_counts_numpy if vectorized else _room_counts_python)(table, grids, offsets)
+    per_layer = [{} for _ in table.rooms]; per_object = [{} for _ in table.rooms]
+    for (room, layer_name), count in zip(table.layers, layer_counts): per_layer[room][layer_name] = per_layer[room].get(layer_name, 0) + count
+    for room, obj, count in room_objects: per_object[room][table.objects[obj]] = count
+    stats = []
+    for room, (name, yy_path, width, height) in enumerate(table.rooms):
+        cell, columns, rows = grids[room]; cells = density[offsets[room]:offsets[room + 1]]
+        peak = max(range(len(cells)), key=cells.__getitem__)
+        object_counts = dict(sorted(per_object[room].items(), key=lambda item: (-item[1], item[0])))
+        stats.append(RoomStats(name, yy_path, width, height, sum(per_layer[room].values()), per_layer[room], object_counts, out_of_bounds[room], stacked[room],
+                               cell, [cells[row * columns:(row + 1) * columns] for row in range(rows)], (cells[peak], peak % columns, peak // columns)))
+    return stats
+
+def format_room_stats(stats, top_objects=8):
+    """Text summary of one room's RoomStats, with a character density map."""
+    lines = [f"{stats.name} ({stats.width}x{stats.height}): {stats.instances} instances, {stats.out_of_bounds} out of bounds, {stats.stacked} stacked"]
+    if stats.layer_counts: lines.append("    Layers: " + ", ".join(f"{name} {count}" for name, count in stats.layer_counts.items()))
+    if stats.object_counts:
+        shown = list(stats.object_counts.items())[:top_objects]; more = len(stats.object_counts) - len(shown)
+        lines.append("    Objects: " + ", ".join(f"{name} x{count}" for name, count in shown) + (f" (+{more} more)" if more else ""))
+    peak, column, row = stats.peak
+    if peak:
+        lines.append(f"    Density ({stats.cell}px cells, peak {peak} at column {column}, row {row}):")
+        top = len(ROOM_DENSITY_SHADES) - 1
+        for cells in stats.density: lines.append("    |" + "".join(ROOM_DENSITY_SHADES[-(-count * top // peak)] for count in cells) + "|")
+    return "\n".join(lines)
+
+def format_room_report(room_stats, errors=(), elapsed=None, top_rooms=None):
+    """Project room report, heaviest rooms first."""
+    rooms = sorted(room_stats, key=lambda stats: (-stats.instances, stats.name))
+    total = sum(stats.instances for stats in rooms); objects = len({name for stats in rooms for name in stats.object_counts})
+    timing = f" in {elapsed * 1000:.0f} ms" if elapsed is not None else ""
+    lines = [f"Room Analytics: {len(rooms)} rooms, {total} instances of {objects} objects ({'NumPy' if HAVE_NUMPY else 'pure Python'}{timing})",
+             f"Out of bounds: {sum(stats.out_of_bounds for stats in rooms)}, stacked: {sum(stats.stacked for stats in rooms)}", "=" * 70]
+    for stats in rooms[:top_rooms]: lines += [format_room_stats(stats), ""]
+    for path, error in errors: lines.append(f"Could not read {path}: {error}")
+    return "\n".join(lines).rstrip() + "\n"
+# <<<< ---- END Room Analytics ---- >>>>
+
+# <<<< ---- Asset Dependency Graph ---- >>>>
+ASSET_GRAPH_VERSION = 1
+ASSET_REF_FOLDERS = set(ASSET_CATEGORIES.values()) # A {"name", "path": "<folder>/<asset>/<asset>.yy"} reference into these is an asset dependency
+ASSET_ENTRY_KINDS = {"Rooms", "Scripts", "Notes", "Extensions"} # Used by the game or IDE without being referenced from other .yy files
+
+# kind: tree category display name ("Objects", ...); parent: parent object/room name or None; refs: sorted names of the assets it references (parent included)
+AssetInfo = namedtuple('AssetInfo', 'name kind yy_path parent refs')
+
+def yy_asset_refs(data):
+    """(parent object/room name or None, set of asset names referenced anywhere in parsed .yy data)."""
+    refs = set(); pending = [data]
+    while pending:
+        value = pending.pop()
+        if isinstance(value, list): pending.extend(item for item in value if isinstance(item, (dict, list))); continue
+        path = value.get('path')
+        if isinstance(path, str) and path.endswith('.yy'):
+            parts = path.split('/')
+            if len(parts) == 3 and parts[0] in ASSET_REF_FOLDERS: refs.add(parts[1]); continue # Asset name from the path: inherited room items name the instance instead
+        pending.extend(item for item in value.values() if isinstance(item, (dict, list)))
+    parent = data.get('parentObjectId') or data.get('parentRoom')
+    parent = parent.get('path', '').split('/')[1] if isinstance(parent, dict) and parent.get('path', '').count('/') == 2 else None
+    return parent, refs
+
+class AssetGraph:
+    """Project-wide dependency graph of the assets' .yy files: what each asset references, and the reverse.
+
+    Queries are dict/set lookups: users (assets referencing an asset), children (direct child objects/rooms)
+    and unreferenced (assets nothing references) are kept current as assets are added, updated or removed.
+    load()/save() keep each asset's record in the cache folder with its .yy's (mtime, size), so build() only
+    parses .yy files that changed since.
+    """
+    def __init__(self, project_root):
+        self.project_root = os.path.abspath(project_root)
+        self.path = os.path.join(get_cache_dir(), "asset_graph", f"{project_cache_key(self.project_root)}.json")
+        self.assets = {} # {name: AssetInfo}
+        self.users = {} # {name: {names of assets referencing it}}, also for referenced names that have no asset
+        self.children = {} # {name: {names of assets whose parent it is}}
+        self.unreferenced = set() # Asset names with no users
+        self._stat = {} # {name: (mtime_ns, size)} of the .yy each record was read from
+        self._stored = {}; self.parsed = 0 # {relative yy path: [mtime_ns, size, kind, name, parent, refs]} from load(); .yy files parsed by build()
+
+    def load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f: data = json.load(f)
+            if data.get('version') == ASSET_GRAPH_VERSION and data.get('root') == self.project_root: self._stored = data.get('assets', {})
+        except (OSError, ValueError): self._stored = {}
+
+    @perf.traced("deps.save")
+    def save(self):
+        assets = {os.path.relpath(info.yy_path, self.project_root): [*self._stat[name], info.kind, name, info.parent, list(info.refs)] for name, info in self.assets.items()}
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f: json.dump({'version': ASSET_GRAPH_VERSION, 'root': self.project_root, 'assets': assets}, f, separators=(',', ':'))
+            os.replace(tmp_path, self.path)
+        except OSError as e: print(f"Warning: Could not write asset graph {self.path}: {e}")
+
+    def clear(self):
+        self.assets = {}; self.users = {}; self.children = {}; self.unreferenced = set(); self._stat = {}; self._stored = {}
+        try: os.remove(self.path)
+        except OSError: pass
+
+    @staticmethod
+    def _read(yy_path):
+        st = os.stat(yy_path); parent, refs = yy_asset_refs(load_yy(yy_path, store=False)) # A build reads every .yy: not kept, so the views' entries survive it
+        return (st.st_mtime_ns, st.st_size), parent, refs
+
+    @perf.traced("deps.build")
+    def build(self, is_cancelled=None):
+        """Adds every asset of the project, parsing (on a thread pool) only .yy files that changed since load(). Returns False if cancelled."""
+        self.assets = {}; self.users = {}; self.children = {}; self.unreferenced = set(); self._stat = {}; self.parsed = 0; to_read = []
+        for kind, name, yy_path in find_assets(self.project_root):
+            stored = self._stored.get(os.path.relpath(yy_path, self.project_root))
+            try: st = os.stat(yy_path)
+            except OSError: continue
+            if stored and stored[0] == st.st_mtime_ns and stored[1] == st.st_size and stored[3] == name: self._add(AssetInfo(name, kind, yy_path, stored[4], tuple(stored[5])), (st.st_mtime_ns, st.st_size))
+            else: to_read.append((kind, name, yy_path))
+        self._stored = {}
+        with ThreadPoolExecutor(max_workers=EXPORT_MAX_WORKERS) as pool:
+            for (kind, name, yy_path), future in zip(to_read, [pool.submit(self._read, yy_path) for _, _, yy_path in to_read]):
+                if is_cancelled and is_cancelled(): pool.shutdown(wait=False, cancel_futures=True); return False
+                try: stat, parent, refs = future.result()
+                except (OSError, ValueError): continue # Deleted or unparsable since the listing
+                refs.discard(name); self._add(AssetInfo(name, kind, yy_path, parent, tuple(sorted(refs))), stat); self.parsed += 1
+        return True
+
+    def update_asset(self, kind, name, yy_path):
+        """Re-reads one asset's .yy if it changed (or is new); drops the asset if the .yy is gone or unreadable. Returns True if the graph changed."""
+        try: st = os.stat(yy_path)
+        except OSError: return self.remove_asset(name)
+        if name in self.assets and self._stat.get(name) == (st.st_mtime_ns, st.st_size): return False
+        try: stat, parent, refs = self._read(yy_path)
+        except (OSError, ValueError): return self.remove_asset(name)
+        refs.discard(name); self._add(AssetInfo(name, kind, yy_path, parent, tuple(sorted(refs))), stat)
+        return True
+
+    def remove_asset(self, name):
+        info = self.assets.pop(name, None)
+        if info is None: return False
+        del self._stat[name]; self.unreferenced.discard(name)
+        for ref in info.refs:
+            users = self.users.get(ref)
+            if users is not None:
+                users.discard(name)
+                if not users: del self.users[ref]; self.unreferenced.update({ref} & self.assets.keys())
+        if info.parent: self.children.get(info.parent, set()).discard(name)
+        return True
+
+    def _add(self, info, stat):
+        self.remove_asset(info.name)
+        self.assets[info.name] = info; self._stat[info.name] = stat
+        for ref in info.refs: self.users.setdefault(ref, set()).add(info.name); self.unreferenced.discard(ref)
+        if info.parent: self.children.setdefault(info.parent, set()).add(info.name)
+        if info.name not in self.users: self.unreferenced.add(info.name)
+
+    def inheritance_chain(self, name):
+        """[name, parent, grandparent, ...] up to the root object/room (stops at cycles)."""
+        chain = [name]
+        while (info := self.assets.get(chain[-1])) and info.parent and info.parent not in chain: chain.append(info.parent)
+        return chain
+
+    def users_of(self, name, kind=None):
+        """Sorted names of the assets referencing name, optionally only those of one kind ("Rooms" for the rooms using an object)."""
+        return sorted(user for user in self.users.get(name, ()) if kind is None or self.assets[user].kind == kind)
+
+    def dependencies(self, names):
+        """names plus every asset they reference, directly or indirectly (parents included)."""
+        found = set(); pending = [name for name in names if name in self.assets]
+        while pending:
+            name = pending.pop()
+            if name in found: continue
+            found.add(name); pending.extend(ref for ref in self.assets[name].refs if ref in self.assets)
+        return found
+
+    def dependency_order(self, names):
+        """names sorted so every asset comes after the assets it references (cycles broken arbitrarily, ties by name)."""
+        names = set(names) & self.assets.keys(); ordered = []; state = {} # name -> 1 visiting, 2 done
+        for start in sorted(names):
+            if start in state: continue
+            stack = [(start, iter(sorted(ref for ref in self.assets[start].refs if ref in names)))]; state[start] = 1
+            while stack:
+                name, refs = stack[-1]; ref = next(refs, None)
+                if ref is None: stack.pop(); state[name] = 2; ordered.append(name)
+                elif ref not in state: state[ref] = 1; stack.append((ref, iter(sorted(r for r in self.assets[ref].refs if r in names))))
+        return ordered
+
+    def unused(self, referenced=()):
+        """Sorted (kind, name) of assets no .yy references and whose name isn't in referenced (e.g. identifiers used in GML); rooms, scripts, notes and extensions are never reported."""
+        return sorted((self.assets[name].kind, name) for name in self.unreferenced if self.assets[name].kind not in ASSET_ENTRY_KINDS and name not in referenced)
+# <<<< ---- END Asset Dependency Graph ---- >>>>
+
+# <<<< ---- Batch GML Apply ---- >>>>
+GML_BLOCK_START_RE = re.compile(r"^// ----- Start GML: (.*?) -----[ \t]*$", re.M)
+GML_BLOCK_PATH_RE = re.compile(r"// ----- GML Path: (.*?) -----[ \t]*(?:\n|$)")
+GML_BLOCK_END_RE = re.compile(r"^-{10,}\[End GML\]-*[ \t]*$", re.M)
+YY_BLOCK_START_RE = re.compile(r"^// ----- Associated YY File: .*$", re.M) # YY sections in a pasted blob are skipped, never written
+EXPORT_ERROR_MARKER_RE = re.compile(r"^// \*{5} ERROR READING \w+ FILE: .* \*{5}$", re.M) # What export_project writes for a file it could not read
+
+GmlBlock = namedtuple('GmlBlock', 'display_name relative_path text')
+# old_text, mtime_ns and old_bytes are None for files the batch creates; mtime_ns is re-checked right before writing,
+# old_bytes (the file exactly as it was, whatever its newlines or encoding) is what a rollback restores
+BatchChange = namedtuple('BatchChange', 'relative_path file_path old_text new_text mtime_ns old_bytes')
+
+def _gml_block_text(body, framed):
+    """Code of one pasted GML section. framed: it ended at an [End GML] line, so the export's exact framing can be undone."""
+    if body.startswith('\n'): body = body[1:] # Blank line after the header
+    lines = body.split('\n'); fenced = lines[0].startswith('```') # LLMs like to wrap code in Markdown fences
+    if fenced: lines = lines[1:next((i for i, line in enumerate(lines) if i and line.strip() == '```'), len(lines))] # Prose after the closing fence is dropped
+    if framed and not fenced:
+        body = '\n'.join(lines)
+        return body[:-2] if body.endswith('\n\n') else body
+    while lines and lines[-1].strip() in ('', '```'): lines.pop()
+    return '\n'.join(lines) + '\n' if lines else ''
+
+def parse_gml_blocks(blob):
+    """GmlBlocks of a pasted export or LLM answer, framed like export_project's GML sections.
+
+    A section is a "// ----- Start GML: <name> -----" line, a "// ----- GML Path: <path> -----" line and the code
+    up to its [End GML] line, the next section or the end of the text. Text outside sections is ignored.
+    """
+    blob = blob.replace('\r\n', '\n').replace('\r', '\n'); blocks = []
+    starts = list(GML_BLOCK_START_RE.finditer(blob))
+    boundaries = sorted([match.start() for match in starts] + [match.start() for match in YY_BLOCK_START_RE.finditer(blob)] + [len(blob)])
+    for match in starts:
+        path_match = GML_BLOCK_PATH_RE.match(blob, match.end() + 1)
+        if not path_match: continue
+        limit = next(pos for pos in boundaries if pos > match.start())
+        end_match = GML_BLOCK_END_RE.search(blob, path_match.end(), limit)
+        body = blob[path_match.end():end_match.start() if end_match else limit]
+        blocks.append(GmlBlock(match.group(1).strip(), path_match.group(1).strip(), _gml_block_text(body, end_match is not None)))
+    return blocks
+
+def resolve_gml_path(project_root, relative_path):
+    """Absolute path for a pasted GML Path (either slash style), or None unless it names a .gml file inside project_root."""
+    parts = [part for part in relative_path.replace('\\', '/').split('/') if part not in ('', '.')]
+    if not parts or '..' in parts or relative_path.startswith(('/', '\\')) or ':' in parts[0] or not parts[-1].lower().endswith('.gml'): return None
+    return os.path.join(project_root, *parts)
+
+@perf.traced("batch.plan")
+def plan_gml_batch(project_root, blocks):
+    """Compares GmlBlocks with the files on disk. Returns (changes, unchanged relative paths, error messages).
+
+    Missing files are created, but only in folders that exist (e.g. a new event of an existing object).
+    When a file appears more than once the last section wins. Sections holding an export error marker
+    instead of code are rejected, so a pasted export never overwrites a file with it.
+    """
+    planned = {}; errors = []
+    for block in blocks:
+        if EXPORT_ERROR_MARKER_RE.search(block.text): errors.append(f"{block.relative_path}: section holds an export read error, not code"); continue
+        file_path = resolve_gml_path(project_root, block.relative_path)
+        if file_path is None: errors.append(f"{block.relative_path}: not a .gml file inside the project"); continue
+        relative_path = os.path.relpath(file_path, project_root)
+        if not os.path.isdir(os.path.dirname(file_path)): errors.append(f"{relative_path}: folder {os.path.dirname(relative_path)} does not exist"); continue
+        try:
+            with open(file_path, 'rb') as f: mtime_ns = os.fstat(f.fileno()).st_mtime_ns; old_bytes = f.read()
+            old_text = decode_text(old_bytes, errors='replace')
+        except FileNotFoundError: mtime_ns = old_text = old_bytes = None
+        except OSError as e: errors.append(f"{relative_path}: {e}"); continue
+        planned[os.path.normcase(file_path)] = BatchChange(relative_path, file_path, old_text, block.text, mtime_ns, old_bytes)
+    changes = [change for change in planned.values() if change.old_text != change.new_text]
+    return changes, [change.relative_path for change in planned.values() if change.old_text == change.new_text], errors
+
+def _remove_quietly(path):
+    try: os.remove(path)
+    except OSError: pass
+
+def _write_temp(path, data):
+    """Writes text (UTF-8, platform newlines) or bytes (as they are) to path + '.tmp'. Returns the temp path."""
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, 'wb') if isinstance(data, bytes) else open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(data); f.flush(); os.fsync(f.fileno()) # On disk before the rename makes it visible
+    except OSError: _remove_quietly(tmp_path); raise
+    return tmp_path
+
+def write_text_atomic(path, text):
+    """Writes text like open(path, 'w', encoding='utf-8') would, via a temp file renamed over path, so path is never left half-written. Raises OSError."""
+    os.replace(_write_temp(path, text), path)
+
+@perf.traced("batch.apply")
+def apply_gml_batch(changes):
+    """Writes planned BatchChanges as one transaction. Raises OSError or ValueError, leaving the files as they were.
+
+    Every file is written to a temp file first; only when all are on disk do the renames replace (or create) the
+    targets, back to back, so GMS2 sees one burst of changes. A file changed on disk since plan_gml_batch fails the
+    batch before anything is written; a failing rename restores the files already replaced, byte for byte.
+    """
+    for change in changes:
+        try: mtime_ns = os.stat(change.file_path).st_mtime_ns
+        except FileNotFoundError: mtime_ns = None
+        if mtime_ns != change.mtime_ns: raise ValueError(f"{change.relative_path} changed on disk since the preview")
+    tmp_paths = []
+    try:
+        for change in changes: tmp_paths.append(_write_temp(change.file_path, change.new_text))
+    except OSError:
+        for tmp_path in tmp_paths: _remove_quietly(tmp_path)
+        raise
+    replaced = []
+    try:
+        for change, tmp_path in zip(changes, tmp_paths): os.replace(tmp_path, change.file_path); replaced.append(change)
+    except OSError:
+        for change in replaced: # Roll back
+            if change.old_bytes is None: _remove_quietly(change.file_path)
+            else:
+                try: os.replace(_write_temp(change.file_path, change.old_bytes), change.file_path)
+                except OSError: pass
+        for tmp_path in tmp_paths[len(replaced):]: _remove_quietly(tmp_path)
+        raise
+
+def format_gml_batch_diff(changes, unchanged=(), errors=()):
+    """Summary plus a unified diff of every change, for the preview before apply_gml_batch."""
+    created = sum(change.old_text is None for change in changes)
+    lines = [f"{len(changes)} files to write: {created} new, {len(changes) - created} changed, {len(unchanged)} unchanged" + (f", {len(errors)} skipped" if errors else "")]
+    lines += [f"Skipped: {error}" for error in errors] + [f"Unchanged: {path}" for path in unchanged] + [""]
+    for change in changes:
+        path = change.relative_path.replace(os.sep, '/')
+        lines.extend(line.rstrip('\n') for line in difflib.unified_diff((change.old_text or '').splitlines(True), change.new_text.splitlines(True),
+                                                                        '/dev/null' if change.old_text is None else f"a/{path}", f"b/{path}"))
+        lines.append("")
+    return "\n".join(lines)
+# <<<< ---- END Batch GML Apply ---- >>>>
+
+# <<<< ---- Project Scanner ---- >>>>
+@perf.traced("scan")
+def scan_project(folder_path, index=None, on_assets=None, on_gml_batch=None, on_progress=None, is_cancelled=None):
+    """Walks a GMS2 project folder and returns its sorted GML details, or None if cancelled.
+
+    Details are (full_display_name, gml_file_path, relative_gml_path, asset_yy_path or None) tuples, as
+    used by export_project. The optional callbacks stream the scan for the GUI tree:
+    on_assets(category display name, [(asset_display_name, asset_folder_path, item_type)]),
+    on_gml_batch([(parent_dir or None, gml_display_name, file_path, relative_path, asset_yy_path)]) and
+    on_progress(folders scanned, GML files found). index is a loaded ScanIndex (one is loaded when omitted);
+    it is saved when the scan completes.
+    """
+    asset_names = {}; details = []; dirs_scanned = 0; gml_found = 0
+    if index is None: index = ScanIndex(folder_path); index.load()
+
+    # Pass 1: Category and Asset Folder records
+    with perf.span("scan.assets"):
+        for display_name, folder_name in ASSET_CATEGORIES.items():
+            if is_cancelled and is_cancelled(): return None
+            category_folder_path = os.path.join(folder_path, folder_name)
+            if not os.path.isdir(category_folder_path): continue
+            asset_type_prefix, item_type = get_asset_kind(display_name)
+            assets = []
+            try:
+                for asset_name in index.listing(category_folder_path)[0]:
+                    asset_folder_path = os.path.join(category_folder_path, asset_name)
+                    asset_display_name = f"{asset_type_prefix}: {asset_name}"
+                    assets.append((asset_display_name, asset_folder_path, item_type))
+                    asset_names[asset_folder_path] = asset_display_name
+            except OSError as e: print(f"Warning: Could not read directory {category_folder_path}: {e}")
+            if on_assets: on_assets(display_name, assets)
+
+    # Pass 2: GML files, with the asset's main YY file resolved alongside (sorted, top-down walk through the index)
+    with perf.span("scan.walk"):
+        batch = []; pending_dirs = [folder_path]
+        while pending_dirs:
+            if is_cancelled and is_cancelled(): return None
+            current_root = pending_dirs.pop()
+            relative_root = os.path.relpath(current_root, folder_path)
+            if relative_root != '.':
+                top_dir = relative_root.split(os.sep)[0].lower()
+                is_known_asset_root = top_dir in ASSET_CATEGORIES.values()
+                if not is_known_asset_root and top_dir in SKIPPED_TOP_DIRS: continue
+            try: subdirs, gml_files, has_asset_yy = index.listing(current_root)
+            except OSError: continue # Same as os.walk: unreadable folders are skipped
+            dirs_scanned += 1
+            pending_dirs.extend(os.path.join(current_root, d) for d in reversed(subdirs))
+            parent_dir = current_root if current_root in asset_names else None
+            asset_yy_path = os.path.join(parent_dir, f"{os.path.basename(parent_dir)}.yy") if parent_dir and has_asset_yy else None
+            for file in gml_files:
+                file_path = os.path.join(current_root, file); relative_path = os.path.relpath(file_path, folder_path)
+                gml_display_name = os.path.splitext(file)[0]
+                batch.append((parent_dir, gml_display_name, file_path, relative_path, asset_yy_path)); gml_found += 1
+                if parent_dir: details.append((f"{asset_names[parent_dir]} / {gml_display_name}", file_path, relative_path, asset_yy_path))
+                else: details.append((relative_path, file_path, relative_path, None)) # No clear associated asset YY path for 'Other' GML
+            if len(batch) >= SCAN_BATCH_SIZE:
+                if on_gml_batch: on_gml_batch(batch)
+                batch = []
+                if on_progress: on_progress(dirs_scanned, gml_found)
+        if batch and on_gml_batch: on_gml_batch(batch)
+        if on_progress: on_progress(dirs_scanned, gml_found)
+    perf.count("scan.folders", dirs_scanned); perf.count("scan.gml_files", gml_found)
+    index.save()
+    details.sort()
+    return details
+# <<<< ---- END Project Scanner ---- >>>>